@@ -4,7 +4,7 @@ Main FastAPI application for Email Spam Classifier API.
 Provides RESTful endpoints for email spam classification.
 """
 
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -14,9 +14,11 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from api.routers import classify, health
+from api.routers import admin, campaigns, classify, explain, health
 from api.middleware.cors import setup_cors
 from api.middleware.auth import get_api_key
+from api.services.engine import InferenceEngine
+from src.config.runtime import apply_runtime_limits, server_worker_index
 from src.config.settings import settings
 from src.utils.logger import setup_logging, get_logger
 
@@ -35,17 +37,26 @@ async def lifespan(app: FastAPI):
     """
     Lifespan events for the API.
     
-    Handles startup and shutdown events.
+    Handles startup and shutdown events. Models are loaded and warmed up
+    here, so missing or corrupt artifacts abort startup instead of failing
+    the first request.
     """
     # Startup
     logger.info(f"Starting {settings.APP_NAME} API v1.0.0")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Model path: {settings.MODEL_PATH}")
+    apply_runtime_limits(server_worker_index())
+    
+    engine = InferenceEngine.create()
+    await engine.start()
+    app.state.engine = engine
     
     yield
     
     # Shutdown
     logger.info("Shutting down API")
+    app.state.engine = None
+    await engine.stop()
 
 
 # Create FastAPI application
@@ -62,8 +73,14 @@ app = FastAPI(
 # Setup CORS
 setup_cors(app)
 
+# Expose Prometheus metrics (request stats plus batcher gauges) at /metrics
+Instrumentator().instrument(app).expose(app, include_in_schema=False)
+
 # Include routers
 app.include_router(classify.router)
+app.include_router(explain.router)
+app.include_router(campaigns.router)
+app.include_router(admin.router)
 app.include_router(health.router)
 
 
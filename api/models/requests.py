@@ -75,3 +75,35 @@ class BatchClassifyRequest(BaseModel):
                 ]
             }
         }
+
+
+class ExplainRequest(BaseModel):
+    """Request model for explaining a single email's classification."""
+    
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        description="Email text to explain"
+    )
+    top_k: int = Field(
+        10,
+        ge=1,
+        le=50,
+        description="Maximum number of tokens returned per direction"
+    )
+    
+    @validator('text')
+    def validate_text(cls, v):
+        """Validate email text."""
+        if not v or not v.strip():
+            raise ValueError("Email text cannot be empty")
+        return v
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "URGENT: Your account has been suspended! Click here to verify.",
+                "top_k": 5
+            }
+        }
@@ -5,7 +5,7 @@ Defines Pydantic models for API responses.
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
@@ -57,12 +57,21 @@ class BatchClassificationItem(BaseModel):
     result: ClassificationResult = Field(..., description="Classification result")
 
 
+class BatchClassificationError(BaseModel):
+    """Email in a batch that could not be classified."""
+    
+    id: str = Field(..., description="Email identifier")
+    error: str = Field(..., description="Error type")
+    message: str = Field(..., description="Error message")
+
+
 class BatchClassificationResponse(BaseModel):
     """Response for batch classification."""
     
     results: List[BatchClassificationItem] = Field(..., description="Classification results")
     total_processed: int = Field(..., description="Number of emails processed")
     processing_time_ms: float = Field(..., description="Total processing time")
+    errors: List[BatchClassificationError] = Field(default=[], description="Emails that failed validation")
     
     class Config:
         json_schema_extra = {
@@ -87,7 +96,86 @@ class BatchClassificationResponse(BaseModel):
                     }
                 ],
                 "total_processed": 1,
-                "processing_time_ms": 15.5
+                "processing_time_ms": 15.5,
+                "errors": []
+            }
+        }
+
+
+class TokenContribution(BaseModel):
+    """A token and how much it moved the spam probability."""
+    
+    token: str = Field(..., description="Vocabulary token")
+    contribution: float = Field(..., description="Drop in spam probability if the token were removed")
+    offsets: List[List[int]] = Field(default=[], description="[start, end) character spans in the submitted text")
+
+
+class ExplanationResult(BaseModel):
+    """Token-level explanation of a classification."""
+    
+    is_spam: bool = Field(..., description="Whether the email is spam")
+    spam_probability: float = Field(..., ge=0, le=1, description="Probability of being spam")
+    spam_tokens: List[TokenContribution] = Field(..., description="Tokens pushing towards spam, strongest first")
+    ham_tokens: List[TokenContribution] = Field(..., description="Tokens pushing towards ham, strongest first")
+    processing_time_ms: float = Field(..., description="Time taken to compute the explanation")
+    model_version: str = Field(..., description="Version of the model used")
+    cached: bool = Field(..., description="Whether the explanation was served from cache")
+    
+    model_config = {
+        "protected_namespaces": (),  # Disable protected namespace warnings
+        "json_schema_extra": {
+            "example": {
+                "is_spam": True,
+                "spam_probability": 0.97,
+                "spam_tokens": [{"token": "urgent", "contribution": 0.12, "offsets": [[0, 6]]}],
+                "ham_tokens": [{"token": "account", "contribution": -0.03, "offsets": [[12, 19]]}],
+                "processing_time_ms": 0.4,
+                "model_version": "2.0",
+                "cached": False
+            }
+        }
+    }
+
+
+class CampaignCluster(BaseModel):
+    """A cluster of near-identical recent spam."""
+    
+    cluster_id: int = Field(..., description="Cluster identifier")
+    size: float = Field(..., description="Recent messages, decayed by age")
+    total_messages: int = Field(..., description="Messages since the cluster was first seen")
+    first_seen: datetime = Field(..., description="Arrival of the first message")
+    last_seen: datetime = Field(..., description="Arrival of the latest message")
+    exemplar: str = Field(..., description="Cleaned text of the first message (truncated)")
+    fingerprint: str = Field(..., description="Centroid SimHash of the recent members (hex)")
+
+
+class CampaignsResponse(BaseModel):
+    """Most active spam campaigns."""
+    
+    clusters: List[CampaignCluster] = Field(..., description="Active clusters, largest first")
+    tracked_clusters: int = Field(..., description="Clusters currently tracked")
+    max_clusters: int = Field(..., description="Configured cluster capacity")
+    window_seconds: float = Field(..., description="Idle time after which a cluster is forgotten")
+    memory_bytes: int = Field(..., description="Approximate memory held by the detector")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "clusters": [
+                    {
+                        "cluster_id": 42,
+                        "size": 4870.3,
+                        "total_messages": 5012,
+                        "first_seen": "2024-01-01T10:00:00",
+                        "last_seen": "2024-01-01T10:14:59",
+                        "exemplar": "congratulations! you have won a free cruise, call 0PHONE now",
+                        "fingerprint": "9f3a6c01d2e4b857"
+                    }
+                ],
+                "tracked_clusters": 318,
+                "max_clusters": 1000,
+                "window_seconds": 3600.0,
+                "memory_bytes": 104512
             }
         }
 
@@ -107,6 +195,28 @@ class HealthResponse(BaseModel):
         }
 
 
+class ModelVersionInfo(BaseModel):
+    """A model version resident in memory."""
+    
+    version: str = Field(..., description="Model version")
+    fingerprint: str = Field(..., description="Hash of the loaded artifacts")
+    footprint_bytes: int = Field(..., description="Estimated resident size in bytes")
+    loaded_at: datetime = Field(..., description="When this version was loaded")
+    is_default: bool = Field(..., description="Whether this is the default version")
+
+
+class RuntimeInfo(BaseModel):
+    """Effective CPU thread and affinity limits of the serving process."""
+    
+    cpu_count: int = Field(..., description="Cores shared by the deployment")
+    scoring_workers: int = Field(..., description="Threads or processes scoring at once across all API workers")
+    threads_per_worker: int = Field(..., description="torch/BLAS/OpenMP threads per scoring worker")
+    thread_pools: Dict[str, int] = Field(default={}, description="Threads of each loaded OpenMP/BLAS library")
+    torch_threads: Optional[int] = Field(None, description="torch intra-op threads (null if torch is not loaded here)")
+    torch_interop_threads: Optional[int] = Field(None, description="torch inter-op threads (null if torch is not loaded here)")
+    cpu_affinity: Optional[List[int]] = Field(None, description="Cores this process may run on")
+
+
 class InfoResponse(BaseModel):
     """API information response."""
     
@@ -115,6 +225,9 @@ class InfoResponse(BaseModel):
     model_version: str = Field(..., description="Model version")
     model_loaded: bool = Field(..., description="Whether model is loaded")
     supported_features: List[str] = Field(..., description="Supported features")
+    available_versions: List[str] = Field(default=[], description="Versions that can be requested")
+    resident_versions: List[ModelVersionInfo] = Field(default=[], description="Versions currently loaded")
+    runtime: Optional[RuntimeInfo] = Field(None, description="CPU thread and affinity limits in effect")
     
     model_config = {
         "protected_namespaces": (),  # Disable protected namespace warnings
@@ -124,7 +237,47 @@ class InfoResponse(BaseModel):
                 "app_name": "Email Spam Classifier",
                 "model_version": "1.0",
                 "model_loaded": True,
-                "supported_features": ["single", "batch"]
+                "supported_features": ["single", "batch"],
+                "available_versions": ["2.0", "1.0"],
+                "resident_versions": [
+                    {
+                        "version": "2.0",
+                        "fingerprint": "3f2a9c1d04be",
+                        "footprint_bytes": 412000,
+                        "loaded_at": "2025-11-28T20:52:00Z",
+                        "is_default": True
+                    }
+                ],
+                "runtime": {
+                    "cpu_count": 8,
+                    "scoring_workers": 4,
+                    "threads_per_worker": 2,
+                    "thread_pools": {"blas:openblas": 2},
+                    "torch_threads": None,
+                    "torch_interop_threads": None,
+                    "cpu_affinity": [0, 1, 2, 3, 4, 5, 6, 7]
+                }
+            }
+        }
+    }
+
+
+class ReloadResponse(BaseModel):
+    """Model hot-reload response."""
+    
+    status: str = Field(..., description="Reload status")
+    model_version: str = Field(..., description="Model version now being served")
+    fingerprint: str = Field(..., description="Hash of the loaded artifacts")
+    loaded_at: datetime = Field(..., description="When the served version was loaded")
+    
+    model_config = {
+        "protected_namespaces": (),  # Disable protected namespace warnings
+        "json_schema_extra": {
+            "example": {
+                "status": "reloaded",
+                "model_version": "2.0",
+                "fingerprint": "3f2a9c1d04be",
+                "loaded_at": "2025-11-28T20:52:00Z"
             }
         }
     }
@@ -0,0 +1,81 @@
+"""
+Administrative endpoints for the Email Spam Classifier API.
+
+Provides model hot reload without restarting the server, and inference
+engine statistics.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from api.middleware.auth import get_api_key
+from api.models.responses import ReloadResponse, ErrorResponse
+from api.services.engine import InferenceEngine, get_engine
+from src.utils.exceptions import ModelLoadError
+from src.utils.logger import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Create router
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_api_key)],
+    responses={
+        409: {"model": ErrorResponse, "description": "Reload rejected"}
+    }
+)
+
+
+@router.post(
+    "/reload",
+    response_model=ReloadResponse,
+    summary="Hot-reload the model",
+    description="Load, validate and atomically publish the artifacts at MODEL_PATH/VECTORIZER_PATH"
+)
+async def reload_model(engine: InferenceEngine = Depends(get_engine)):
+    """
+    Reload the model artifacts from disk.
+    
+    Args:
+        engine: Application-scoped inference engine
+    
+    Returns:
+        ReloadResponse describing the version now being served
+    """
+    try:
+        info = await engine.reload()
+    except ModelLoadError as e:
+        logger.error(f"Reload rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Reload rejected, previous model still serving: {str(e)}"
+        )
+    
+    return ReloadResponse(
+        status="reloaded",
+        model_version=info['model_version'],
+        fingerprint=info['fingerprint'],
+        loaded_at=datetime.fromtimestamp(info['loaded_at'], timezone.utc)
+    )
+
+
+@router.get(
+    "/stats",
+    summary="Inference engine statistics",
+    description="Executor, micro-batcher and result cache counters"
+)
+async def engine_stats(engine: InferenceEngine = Depends(get_engine)) -> Dict[str, Any]:
+    """
+    Get inference engine statistics.
+    
+    Args:
+        engine: Application-scoped inference engine
+    
+    Returns:
+        Executor, batcher and cache statistics (hits, misses, evictions)
+    """
+    return engine.stats()
@@ -0,0 +1,69 @@
+"""
+Spam campaign endpoint for the Email Spam Classifier API.
+
+Lists the clusters of near-identical spam currently arriving, as tracked
+by the inference engine's campaign detector.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from api.middleware.auth import get_api_key
+from api.models.responses import CampaignCluster, CampaignsResponse
+from api.services.engine import InferenceEngine, get_engine
+from src.config.settings import settings
+
+# Create router
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["campaigns"],
+    dependencies=[Depends(get_api_key)]
+)
+
+
+@router.get(
+    "/campaigns",
+    response_model=CampaignsResponse,
+    summary="Active spam campaigns",
+    description="Top clusters of near-identical recent spam, with sizes and exemplars"
+)
+async def list_campaigns(
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of clusters"),
+    min_size: Optional[float] = Query(None, ge=0, description="Smallest decayed size listed"),
+    engine: InferenceEngine = Depends(get_engine)
+):
+    """
+    List the most active spam campaigns.
+    
+    Args:
+        limit: Maximum number of clusters returned
+        min_size: Smallest decayed cluster size (defaults to CAMPAIGN_MIN_SIZE)
+        engine: Application-scoped inference engine
+    
+    Returns:
+        CampaignsResponse with the largest active clusters
+    """
+    detector = engine.campaigns
+    if min_size is None:
+        min_size = settings.CAMPAIGN_MIN_SIZE
+    clusters = detector.top_clusters(limit=limit, min_size=min_size)
+    stats = detector.stats()
+    
+    return CampaignsResponse(
+        clusters=[
+            CampaignCluster(
+                **{
+                    **cluster,
+                    "first_seen": datetime.fromtimestamp(cluster["first_seen"], timezone.utc),
+                    "last_seen": datetime.fromtimestamp(cluster["last_seen"], timezone.utc)
+                }
+            )
+            for cluster in clusters
+        ],
+        tracked_clusters=stats["tracked_clusters"],
+        max_clusters=stats["max_clusters"],
+        window_seconds=detector.window_seconds,
+        memory_bytes=stats["memory_bytes"]
+    )
@@ -5,7 +5,7 @@ Handles single and batch email classification requests.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status
-from typing import List
+from typing import List, Optional
 import time
 import logging
 from slowapi import Limiter
@@ -16,13 +16,14 @@ from api.models.responses import (
     ClassificationResult,
     BatchClassificationResponse,
     BatchClassificationItem,
-    TextStats
+    BatchClassificationError,
+    TextStats,
+    ErrorResponse
 )
-from src.models.model_loader import ModelManager
-from src.models.predictor import SpamPredictor
 from src.config.settings import settings
-from src.utils.exceptions import ValidationError, PredictionError
+from src.utils.exceptions import ValidationError, PredictionError, ServiceOverloadedError
 from api.middleware.auth import get_api_key
+from api.services.engine import InferenceEngine, get_engine, resolve_model_version
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -40,27 +41,14 @@ router = APIRouter(
 
 limiter = Limiter(key_func=get_remote_address)
 
-def get_predictor():
-    """Dependency to get initialized predictor."""
-    # This ModelManager instance should ideally be a singleton or managed by FastAPI's dependency injection
-    # to avoid reloading models on every request. For simplicity, we'll instantiate it here.
-    # A more robust solution would involve a global instance or a custom dependency provider.
-    model_manager = ModelManager()
-    if model_manager.model is None or model_manager.vectorizer is None:
-        logger.info("Initializing models for API request")
-        try:
-            model_manager.load_models()
-        except Exception as e:
-            logger.error(f"Failed to load ML models: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to load ML models"
-            )
-
-    # Create predictor instance
-    predictor = SpamPredictor(model_manager.model, model_manager.vectorizer)
-    logger.info("SpamPredictor initialized for API")
-    return predictor
+def overloaded_response(e: ServiceOverloadedError) -> HTTPException:
+    """Build the fast 503 returned when the inference queue is full."""
+    logger.warning(f"Rejecting request: {str(e)}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry",
+        headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)}
+    )
 
 
 @router.post(
@@ -92,12 +80,18 @@ def get_predictor():
         }
     }
 )
-async def classify_email(request: ClassifyRequest):
+async def classify_email(
+    request: ClassifyRequest,
+    engine: InferenceEngine = Depends(get_engine),
+    version: Optional[str] = Depends(resolve_model_version)
+):
     """
     Classify a single email as spam or legitimate.
     
     Args:
         request: ClassifyRequest with email text
+        engine: Application-scoped inference engine
+        version: Model version from the X-Model-Version header or API-key pin
     
     Returns:
         ClassificationResult with prediction and metadata
@@ -105,11 +99,8 @@ async def classify_email(request: ClassifyRequest):
     try:
         logger.info(f"Classification request received (text length: {len(request.text)})")
         
-        # Get predictor
-        predictor = get_predictor()
-        
         # Perform classification
-        result = predictor.predict(request.text)
+        result = await engine.predict(request.text, version=version)
         
         # Convert to response model
         response = ClassificationResult(
@@ -139,6 +130,9 @@ async def classify_email(request: ClassifyRequest):
             detail="Failed to classify email"
         )
     
+    except ServiceOverloadedError as e:
+        raise overloaded_response(e)
+    
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -156,12 +150,18 @@ async def classify_email(request: ClassifyRequest):
         200: {"description": "Successful batch classification"}
     }
 )
-async def classify_batch(request: BatchClassifyRequest):
+async def classify_batch(
+    request: BatchClassifyRequest,
+    engine: InferenceEngine = Depends(get_engine),
+    version: Optional[str] = Depends(resolve_model_version)
+):
     """
     Classify multiple emails at once.
     
     Args:
         request: BatchClassifyRequest with list of emails
+        engine: Application-scoped inference engine
+        version: Model version from the X-Model-Version header or API-key pin
     
     Returns:
         BatchClassificationResponse with all results
@@ -170,45 +170,53 @@ async def classify_batch(request: BatchClassifyRequest):
         start_time = time.time()
         logger.info(f"Batch classification request received ({len(request.emails)} emails)")
         
-        # Get predictor
-        predictor = get_predictor()
+        # Score the whole batch in vectorized chunks
+        predictions = await engine.predict_batch(
+            [email_item.text for email_item in request.emails],
+            version=version
+        )
         
-        # Process each email
         results = []
-        for email_item in request.emails:
-            try:
-                result = predictor.predict(email_item.text)
-                
-                classification_result = ClassificationResult(
-                    is_spam=result['is_spam'],
-                    confidence=result['confidence'],
-                    spam_probability=result['spam_probability'],
-                    ham_probability=result['ham_probability'],
-                    processing_time_ms=result['processing_time_ms'],
-                    model_version=result['model_version'],
-                    text_stats=TextStats(**result['text_stats'])
-                )
-                
-                results.append(BatchClassificationItem(
+        errors = []
+        for email_item, result in zip(request.emails, predictions):
+            if "error" in result:
+                logger.warning(f"Error processing email {email_item.id}: {result['error']}")
+                errors.append(BatchClassificationError(
                     id=email_item.id,
-                    result=classification_result
+                    error=result['error_type'],
+                    message=result['error']
                 ))
-                
-            except Exception as e:
-                logger.error(f"Error processing email {email_item.id}: {str(e)}")
-                # Continue processing other emails
                 continue
+            
+            classification_result = ClassificationResult(
+                is_spam=result['is_spam'],
+                confidence=result['confidence'],
+                spam_probability=result['spam_probability'],
+                ham_probability=result['ham_probability'],
+                processing_time_ms=result['processing_time_ms'],
+                model_version=result['model_version'],
+                text_stats=TextStats(**result['text_stats'])
+            )
+            
+            results.append(BatchClassificationItem(
+                id=email_item.id,
+                result=classification_result
+            ))
         
         processing_time = (time.time() - start_time) * 1000
         
         response = BatchClassificationResponse(
             results=results,
             total_processed=len(results),
-            processing_time_ms=processing_time
+            processing_time_ms=processing_time,
+            errors=errors
         )
         
         logger.info(f"Batch classification complete: {len(results)}/{len(request.emails)} processed")
         return response
+    
+    except ServiceOverloadedError as e:
+        raise overloaded_response(e)
         
     except Exception as e:
         logger.error(f"Batch classification error: {str(e)}", exc_info=True)
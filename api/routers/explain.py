@@ -0,0 +1,82 @@
+"""
+Explanation endpoint for the Email Spam Classifier API.
+
+Returns the tokens that pushed an email towards spam or ham, with character
+offsets for highlighting.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from typing import Optional
+import logging
+
+from api.models.requests import ExplainRequest
+from api.models.responses import ExplanationResult, ErrorResponse
+from src.utils.exceptions import ValidationError, PredictionError, ServiceOverloadedError
+from api.middleware.auth import get_api_key
+from api.routers.classify import overloaded_response
+from api.services.engine import InferenceEngine, get_engine, resolve_model_version
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["explainability"],
+    dependencies=[Depends(get_api_key)],
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+    }
+)
+
+
+@router.post(
+    "/explain",
+    response_model=ExplanationResult,
+    summary="Explain a classification",
+    description="Top tokens pushing an email towards spam and ham, with character offsets"
+)
+async def explain_email(
+    request: ExplainRequest,
+    engine: InferenceEngine = Depends(get_engine),
+    version: Optional[str] = Depends(resolve_model_version)
+):
+    """
+    Explain the classification of a single email.
+    
+    Args:
+        request: ExplainRequest with email text and top_k
+        engine: Application-scoped inference engine
+        version: Model version from the X-Model-Version header or API-key pin
+    
+    Returns:
+        ExplanationResult with spam and ham token contributions
+    """
+    try:
+        result = await engine.explain(request.text, request.top_k, version=version)
+        return ExplanationResult(**result)
+    
+    except ValidationError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    except PredictionError as e:
+        logger.error(f"Explanation error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to explain email"
+        )
+    
+    except ServiceOverloadedError as e:
+        raise overloaded_response(e)
+    
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        )
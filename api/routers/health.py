@@ -4,10 +4,11 @@ Health check and information endpoints.
 Provides system health status and API information.
 """
 
-from fastapi import APIRouter
-from datetime import datetime
+from fastapi import APIRouter, Request, Response, status
+from datetime import datetime, timezone
 
-from api.models.responses import HealthResponse, InfoResponse
+from api.models.responses import HealthResponse, InfoResponse, ModelVersionInfo, RuntimeInfo
+from src.config.runtime import runtime_info
 from src.config.settings import settings
 from src.models.model_loader import model_manager
 from src.utils.logger import get_logger
@@ -25,15 +26,25 @@ router = APIRouter(tags=["health"])
     summary="Health check",
     description="Check if the API is running and healthy"
 )
-async def health_check():
+async def health_check(request: Request, response: Response):
     """
     Basic health check endpoint.
     
+    When the transformer runs in worker processes, a ping is sent through
+    their request queue so a wedged worker loop reports unhealthy (503).
+    
     Returns:
         HealthResponse with status and timestamp
     """
+    health = "healthy"
+    engine = getattr(request.app.state, "engine", None)
+    if engine is not None and await engine.ping_transformer() is False:
+        logger.warning("Transformer workers did not answer the health ping")
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        health = "unhealthy"
+    
     return HealthResponse(
-        status="healthy",
+        status=health,
         timestamp=datetime.utcnow()
     )
 
@@ -58,5 +69,17 @@ async def get_info():
         app_name=settings.APP_NAME,
         model_version=settings.MODEL_VERSION,
         model_loaded=model_info['model_loaded'] and model_info['vectorizer_loaded'],
-        supported_features=["single", "batch"]
+        supported_features=["single", "batch", "explain", "campaigns"],
+        available_versions=model_manager.available_versions(),
+        resident_versions=[
+            ModelVersionInfo(
+                version=entry['version'],
+                fingerprint=entry['fingerprint'],
+                footprint_bytes=entry['footprint_bytes'],
+                loaded_at=datetime.fromtimestamp(entry['loaded_at'], timezone.utc),
+                is_default=entry['is_default']
+            )
+            for entry in model_info['resident_versions']
+        ],
+        runtime=RuntimeInfo(**runtime_info())
     )
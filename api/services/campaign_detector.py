@@ -0,0 +1,323 @@
+"""
+Streaming detection of spam campaigns.
+
+Every message classified as spam is fingerprinted (SimHash over the cleaned
+text, see ``src.utils.near_duplicate``) and assigned to a cluster of
+near-identical recent spam through banded LSH buckets. Short messages
+make SimHash noisy, so the distance threshold is looser than for verdict
+reuse; a wrong merge only affects reporting. Cluster state lives
+in fixed-size arrays: an exponentially decayed message count, first and
+last arrival times, a total count, and decayed per-bit tallies of the
+member fingerprints whose majority vote is the cluster's centroid. Memory
+is bounded by the configured number of clusters and one update costs a
+few bucket lookups. Clusters idle for longer than the window are dropped,
+and when every slot is taken the weakest quarter is swept out at once,
+which keeps eviction O(1) amortized per message.
+
+The API hands messages over with ``submit``, which only enqueues them: a
+single background thread applies the updates, so the event loop does no
+clustering work and a burst overflowing the queue is dropped and counted
+rather than slowing classification down.
+"""
+
+import math
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.preprocessing.text_processor import text_processor
+from src.utils.logger import get_logger
+from src.utils.near_duplicate import FINGERPRINT_BITS, simhash
+
+logger = get_logger(__name__)
+
+# Messages waiting for the background thread before new ones are dropped
+DEFAULT_QUEUE_SIZE = 10000
+
+
+def _bits(fingerprint: int) -> np.ndarray:
+    """Bits of a fingerprint as a 0/1 vector, least significant first."""
+    raw = np.frombuffer(fingerprint.to_bytes(8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")
+
+
+class CampaignDetector:
+    """Bounded streaming clustering of recent spam."""
+
+    def __init__(
+        self,
+        max_clusters: int,
+        window_seconds: float = 3600.0,
+        half_life_seconds: float = 600.0,
+        max_distance: int = 10,
+        n_bands: int = 8,
+        exemplar_chars: int = 200,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            max_clusters: Number of tracked clusters (0 disables detection)
+            window_seconds: Idle time after which a cluster is forgotten
+            half_life_seconds: Half-life of the decayed message count
+            max_distance: Largest SimHash Hamming distance joining a cluster
+            n_bands: LSH bands of the fingerprint; a message is compared with
+                the clusters sharing one band, which finds every cluster
+                within ``n_bands - 1`` bits and most within ``max_distance``
+            exemplar_chars: Characters of cleaned text kept per cluster
+            queue_size: Submitted messages buffered for the background thread
+        """
+        self.max_clusters = max_clusters
+        self.window_seconds = window_seconds
+        self.max_distance = max_distance
+        self.exemplar_chars = exemplar_chars
+        self._decay_rate = math.log(2) / half_life_seconds
+
+        width = FINGERPRINT_BITS // n_bands
+        self._bands: List[Tuple[int, int]] = [
+            (band * width, (width if band < n_bands - 1 else FINGERPRINT_BITS - band * width))
+            for band in range(n_bands)
+        ]
+
+        # Per-slot cluster state; a slot with id 0 is free
+        self._ids = np.zeros(max_clusters, dtype=np.int64)
+        # Centroid fingerprint and the decayed member tallies behind it
+        self._fingerprints = np.zeros(max_clusters, dtype=np.uint64)
+        self._bit_weights = np.zeros((max_clusters, FINGERPRINT_BITS), dtype=np.float32)
+        self._weights = np.zeros(max_clusters, dtype=np.float64)
+        self._updated = np.zeros(max_clusters, dtype=np.float64)
+        self._first_seen = np.zeros(max_clusters, dtype=np.float64)
+        self._totals = np.zeros(max_clusters, dtype=np.int64)
+        self._exemplars: List[Optional[str]] = [None] * max_clusters
+        self._free: List[int] = list(range(max_clusters - 1, -1, -1))
+        self._buckets: Dict[Tuple[int, int], set] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.observed = 0
+        self.evicted = 0
+        self.dropped = 0
+        self._pending: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._feeder: Optional[threading.Thread] = None
+        self._feeder_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether campaign detection is on."""
+        return self.max_clusters > 0
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        """Bucket keys of a fingerprint, one per band."""
+        return [
+            (band, (fingerprint >> shift) & ((1 << width) - 1))
+            for band, (shift, width) in enumerate(self._bands)
+        ]
+
+    def _current_weights(self, now: float) -> np.ndarray:
+        """Decayed message counts of every slot at ``now``."""
+        return self._weights * np.exp(-self._decay_rate * (now - self._updated))
+
+    def observe(self, text: str, fingerprint: Optional[int] = None, now: Optional[float] = None):
+        """
+        Record one spam message.
+
+        Args:
+            text: Raw email text
+            fingerprint: SimHash of the cleaned text, if already computed
+            now: Arrival time (defaults to the current time)
+        """
+        if not self.enabled:
+            return
+        cleaned = None
+        if fingerprint is None:
+            cleaned = text_processor.clean_text(text)
+            fingerprint = simhash(cleaned)
+            if fingerprint is None:
+                return
+        now = time.time() if now is None else now
+        keys = self._band_keys(fingerprint)
+
+        with self._lock:
+            self.observed += 1
+            slot = self._match(keys, fingerprint, now)
+            if slot is None:
+                if not self._free:
+                    self._sweep(now)
+                slot = self._free.pop()
+                self._ids[slot] = self._next_id
+                self._next_id += 1
+                self._fingerprints[slot] = fingerprint
+                self._first_seen[slot] = now
+                self._totals[slot] = 0
+                if cleaned is None:
+                    cleaned = text_processor.clean_text(text)
+                self._exemplars[slot] = cleaned[:self.exemplar_chars]
+                self._index(slot, keys)
+            else:
+                decay = math.exp(-self._decay_rate * (now - self._updated[slot]))
+                self._weights[slot] *= decay
+                self._bit_weights[slot] *= decay
+
+            self._weights[slot] += 1.0
+            self._bit_weights[slot] += _bits(fingerprint)
+            self._updated[slot] = now
+            self._totals[slot] += 1
+            self._recenter(slot)
+
+    def submit(self, text: str, fingerprint: int):
+        """
+        Queue one spam message for the background thread; never blocks.
+
+        Args:
+            text: Raw email text (cleaned only if it starts a new cluster)
+            fingerprint: SimHash of the cleaned text
+        """
+        if not self.enabled:
+            return
+        if self._feeder is None:
+            with self._feeder_lock:
+                if self._feeder is None:
+                    self._feeder = threading.Thread(target=self._feed, name="campaign-detector", daemon=True)
+                    self._feeder.start()
+        try:
+            self._pending.put_nowait((text, fingerprint, time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _feed(self):
+        """Apply queued messages until ``close`` is called."""
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                self.observe(*item)
+            except Exception as e:
+                logger.error(f"Campaign update failed: {str(e)}", exc_info=True)
+            finally:
+                self._pending.task_done()
+
+    def flush(self):
+        """Wait until every submitted message has been applied."""
+        if self._feeder is not None:
+            self._pending.join()
+
+    def close(self):
+        """Apply the queued messages and stop the background thread."""
+        with self._feeder_lock:
+            feeder, self._feeder = self._feeder, None
+        if feeder is not None:
+            self._pending.put(None)
+            feeder.join()
+
+    def _match(self, keys: List[Tuple[int, int]], fingerprint: int, now: float) -> Optional[int]:
+        """Slot of the closest live cluster within the distance threshold."""
+        best, best_distance = None, self.max_distance + 1
+        for key in keys:
+            for slot in self._buckets.get(key, ()):
+                if now - self._updated[slot] > self.window_seconds:
+                    continue
+                distance = bin(int(self._fingerprints[slot]) ^ fingerprint).count("1")
+                if distance < best_distance:
+                    best, best_distance = slot, distance
+        return best
+
+    def _index(self, slot: int, keys: List[Tuple[int, int]]):
+        """Add a slot to the buckets of its centroid."""
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(slot)
+
+    def _unindex(self, slot: int):
+        """Remove a slot from the buckets of its centroid."""
+        for key in self._band_keys(int(self._fingerprints[slot])):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _recenter(self, slot: int):
+        """Move a cluster's centroid to the majority of its members' bits."""
+        majority = (2 * self._bit_weights[slot] > self._weights[slot]).astype(np.uint8)
+        centroid = int(np.packbits(majority, bitorder="little").view("<u8")[0])
+        if centroid != int(self._fingerprints[slot]):
+            self._unindex(slot)
+            self._fingerprints[slot] = centroid
+            self._index(slot, self._band_keys(centroid))
+
+    def _sweep(self, now: float):
+        """Free idle clusters, or the weakest quarter if none are idle."""
+        idle = np.flatnonzero(now - self._updated > self.window_seconds)
+        if len(idle) == 0:
+            count = max(1, self.max_clusters // 4)
+            idle = np.argpartition(self._current_weights(now), count - 1)[:count]
+        for slot in idle.tolist():
+            self._release(slot)
+        self.evicted += len(idle)
+
+    def _release(self, slot: int):
+        """Return a slot to the free list and drop its buckets."""
+        self._unindex(slot)
+        self._ids[slot] = 0
+        self._weights[slot] = 0.0
+        self._bit_weights[slot] = 0.0
+        self._exemplars[slot] = None
+        self._free.append(slot)
+
+    def top_clusters(self, limit: int = 10, min_size: float = 1.0, now: Optional[float] = None) -> List[Dict]:
+        """
+        List the most active clusters.
+
+        Args:
+            limit: Maximum number of clusters returned
+            min_size: Smallest decayed message count reported
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Cluster dicts sorted by decayed size, largest first
+        """
+        if not self.enabled:
+            return []
+        now = time.time() if now is None else now
+        with self._lock:
+            weights = self._current_weights(now)
+            live = (self._ids > 0) & (now - self._updated <= self.window_seconds) & (weights >= min_size)
+            slots = np.flatnonzero(live)
+            slots = slots[np.argsort(-weights[slots], kind="stable")][:limit]
+            return [
+                {
+                    "cluster_id": int(self._ids[slot]),
+                    "size": float(weights[slot]),
+                    "total_messages": int(self._totals[slot]),
+                    "first_seen": float(self._first_seen[slot]),
+                    "last_seen": float(self._updated[slot]),
+                    "exemplar": self._exemplars[slot],
+                    "fingerprint": f"{int(self._fingerprints[slot]):016x}"
+                }
+                for slot in slots.tolist()
+            ]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by cluster state, exemplars included."""
+        arrays = (
+            self._ids.nbytes + self._fingerprints.nbytes + self._bit_weights.nbytes + self._weights.nbytes
+            + self._updated.nbytes + self._first_seen.nbytes + self._totals.nbytes
+        )
+        exemplars = sum(len(exemplar) for exemplar in self._exemplars if exemplar is not None)
+        return arrays + exemplars
+
+    def stats(self) -> Dict:
+        """Get detector statistics."""
+        return {
+            "tracked_clusters": self.max_clusters - len(self._free),
+            "max_clusters": self.max_clusters,
+            "observed": self.observed,
+            "evicted": self.evicted,
+            "dropped": self.dropped,
+            "pending": self._pending.qsize(),
+            "memory_bytes": self.nbytes
+        }
@@ -0,0 +1,457 @@
+"""
+Application-scoped inference engine for the API.
+
+Owns the single predictor, inference executor and micro-batcher for the
+process. It is built and warmed up once in the FastAPI lifespan and handed
+to routers through dependency injection.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Header, HTTPException, Request, Security, status
+
+from api.middleware.auth import api_key_header
+from api.services.campaign_detector import CampaignDetector
+from api.services.inference_executor import InferenceExecutor
+from api.services.micro_batcher import MicroBatcher
+from api.services.verdict_reuse import VerdictReuse
+from src.config.settings import settings
+from src.models.artifact import META_FILE, is_artifact
+from src.models.model_loader import ModelBundle, model_manager
+from src.models.predictor import SpamPredictor
+from src.utils.exceptions import ConfigurationError
+from src.utils.result_cache import ResultCache, fingerprint
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Representative inputs pushed through every code path before serving traffic
+WARMUP_TEXTS = [
+    "Hi, are we still on for the meeting tomorrow at 3pm?",
+    "CONGRATULATIONS! You have WON a FREE prize. Call 555-123-4567 or visit http://example.com now!",
+    "Please find the report attached, contact me at someone@example.com with questions.",
+]
+
+
+def build_predictor(version: Optional[str] = None) -> SpamPredictor:
+    """
+    Load the model artifacts and build a predictor.
+
+    Module-level so process-pool workers can rebuild it in their own process.
+    The predictor is cached on its bundle, so repeated calls are cheap and
+    it is released together with the bundle when the registry evicts it.
+
+    Args:
+        version: Registry version; None for the default version
+
+    Returns:
+        SpamPredictor for the requested model version
+
+    Raises:
+        ModelLoadError: If the artifacts cannot be loaded
+    """
+    bundle = model_manager.get_bundle(version)
+    predictor = bundle.cache.get("predictor")
+    if predictor is None:
+        predictor = SpamPredictor(bundle.model, bundle.vectorizer, model_version=bundle.version)
+        bundle.cache["predictor"] = predictor
+    return predictor
+
+
+class InferenceEngine:
+    """Shared predictor, executor and micro-batcher for one API process."""
+
+    def __init__(self, predictor: SpamPredictor):
+        """
+        Initialize the engine.
+
+        Args:
+            predictor: Predictor built from the loaded artifacts
+        """
+        self.predictor = predictor
+
+        # Process workers rebuild the predictor themselves; threads share this one
+        factory = build_predictor if settings.INFERENCE_EXECUTOR == "process" else self._get_predictor
+        self.executor = InferenceExecutor(
+            factory,
+            kind=settings.INFERENCE_EXECUTOR,
+            max_workers=settings.INFERENCE_WORKERS,
+            max_queue=settings.INFERENCE_QUEUE_SIZE
+        )
+        self.batcher = MicroBatcher(
+            lambda texts: self.executor.submit("predict_batch", texts, **self._job_options(None)),
+            max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+            max_wait_ms=settings.MICRO_BATCH_WAIT_MS
+        )
+        # Results of repeated messages; keys carry the model generation so a
+        # job finishing on the old model after a reload is never served again
+        self.result_cache = ResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL_SECONDS)
+        self.explain_cache = ResultCache(settings.EXPLAIN_CACHE_SIZE)
+        self.near_duplicates = VerdictReuse(
+            settings.NEAR_DUP_MAX_ENTRIES,
+            max_distance=settings.NEAR_DUP_MAX_DISTANCE,
+            min_confidence=settings.NEAR_DUP_MIN_CONFIDENCE,
+            verify_rate=settings.NEAR_DUP_VERIFY_RATE
+        )
+        if self.near_duplicates.enabled and settings.INFERENCE_EXECUTOR == "process":
+            # Jobs consult the index in place; a process worker would get a copy
+            raise ConfigurationError("NEAR_DUP_MAX_ENTRIES requires INFERENCE_EXECUTOR=thread")
+        # Spam clusters are about traffic, not the model, and survive reloads
+        self.campaigns = CampaignDetector(
+            settings.CAMPAIGN_MAX_CLUSTERS,
+            window_seconds=settings.CAMPAIGN_WINDOW_SECONDS,
+            half_life_seconds=settings.CAMPAIGN_HALF_LIFE_SECONDS,
+            max_distance=settings.CAMPAIGN_MAX_DISTANCE,
+            exemplar_chars=settings.CAMPAIGN_EXEMPLAR_CHARS
+        )
+        self._generation = 0
+        self._watcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def create(cls) -> "InferenceEngine":
+        """
+        Load the artifacts and build the engine.
+
+        Raises:
+            ModelLoadError: If the artifacts are missing or corrupt
+            ConfigurationError: If near-duplicate reuse is combined with the
+                process executor
+        """
+        return cls(build_predictor())
+
+    def _get_predictor(self, version: Optional[str] = None) -> SpamPredictor:
+        """
+        Predictor factory for thread-pool workers.
+
+        Non-default versions get a predictor cached on their bundle, so it is
+        released together with the bundle when the registry evicts it.
+        """
+        if version is None:
+            return self.predictor
+        return build_predictor(version)
+
+    async def start(self):
+        """Warm up every worker and start the micro-batcher and file watcher."""
+        self._loop = asyncio.get_running_loop()
+        await self.warmup()
+        if settings.MICRO_BATCH_ENABLED:
+            await self.batcher.start()
+        model_manager.add_reload_listener(self._on_reload)
+        if settings.MODEL_WATCH_INTERVAL_SECONDS > 0:
+            self._watcher = asyncio.create_task(self._watch_artifacts())
+        logger.info("Inference engine ready")
+
+    async def warmup(self):
+        """Run the warmup batch through each pool worker."""
+        # Submitted concurrently so every thread/process is spawned and exercised
+        await asyncio.gather(*(
+            self.executor.submit("predict_batch", WARMUP_TEXTS)
+            for _ in range(self.executor.max_workers)
+        ))
+        await self.executor.submit("predict", WARMUP_TEXTS[0])
+        logger.info(f"Inference engine warmed up ({self.executor.max_workers} workers)")
+
+    async def stop(self):
+        """Stop the watcher and batcher, shut down the executor and drain campaign updates."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        model_manager.remove_reload_listener(self._on_reload)
+        await self.batcher.stop()
+        self.executor.shutdown()
+        self.campaigns.close()
+
+    def _on_reload(self, bundle: ModelBundle):
+        """
+        Swap in a predictor for a newly published bundle.
+
+        Jobs that already fetched the old predictor finish on it; the next
+        job picks up the new one. Reloads run in a worker thread, so a
+        process pool is recycled on the event loop, where ``submit`` picks
+        the pool, never while a job is being handed to it.
+        """
+        self.predictor = SpamPredictor(bundle.model, bundle.vectorizer, model_version=bundle.version)
+        self._generation += 1
+        self.result_cache.clear()
+        self.explain_cache.clear()
+        self.near_duplicates.clear()
+        if self.executor.kind == "process":
+            self._loop.call_soon_threadsafe(self.executor.recycle)
+        logger.info(f"Inference engine switched to model {bundle.fingerprint}")
+
+    async def reload(self) -> Dict:
+        """
+        Hot-reload the artifacts from disk.
+
+        Loading and canary validation run in a worker thread; on failure the
+        current model keeps serving.
+
+        Returns:
+            Model information for the version now being served
+
+        Raises:
+            ModelLoadError: If the new artifacts fail to load or validate
+        """
+        await asyncio.to_thread(model_manager.reload_models)
+        return model_manager.get_model_info()
+
+    @staticmethod
+    def _artifact_stamp() -> Tuple:
+        """
+        Modification times and sizes of the files the model is loaded from.
+
+        An artifact directory is stamped by its manifest, which a new export
+        swaps in with the rest of the directory; VECTORIZER_PATH is unused then.
+        """
+        if is_artifact(settings.MODEL_PATH):
+            paths = (os.path.join(settings.MODEL_PATH, META_FILE),)
+        else:
+            paths = (settings.MODEL_PATH, settings.VECTORIZER_PATH)
+        stamp = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    async def _watch_artifacts(self):
+        """Poll the artifact files and reload when they change."""
+        last = self._artifact_stamp()
+        while True:
+            await asyncio.sleep(settings.MODEL_WATCH_INTERVAL_SECONDS)
+            current = self._artifact_stamp()
+            if current == last or None in current:
+                continue
+            last = current
+            logger.info("Model artifacts changed on disk, reloading")
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Hot reload rejected, keeping current model: {str(e)}")
+
+    def _cache_key(self, text: str, version: Optional[str], *parts) -> Tuple:
+        """Cache key for a text under the model currently serving ``version``."""
+        return (self._generation, version, fingerprint(text, *parts))
+
+    def _job_options(self, version: Optional[str]) -> Dict:
+        """
+        Keyword arguments of a scoring job.
+
+        Near-duplicate lookup and the campaign fingerprint run inside the
+        job, on the text the predictor cleans for scoring.
+        """
+        return {
+            "fingerprint_spam": self.campaigns.enabled,
+            "reuse": self.near_duplicates.scoped((self._generation, version))
+        }
+
+    @staticmethod
+    def _public(result: Dict) -> Dict:
+        """Copy a prediction without the campaign fingerprint kept in the cache."""
+        return {key: value for key, value in result.items() if key != "simhash"}
+
+    @classmethod
+    def _from_cache(cls, result: Dict, start: float) -> Dict:
+        """Copy a cached prediction, reporting the time actually spent."""
+        return {**cls._public(result), "processing_time_ms": (time.perf_counter() - start) * 1000}
+
+    def _observe(self, text: str, result: Dict):
+        """
+        Hand a spam verdict to the campaign detector.
+
+        The fingerprint was computed next to the prediction (and is cached
+        with it), so this only enqueues; short messages have none and are
+        not tracked.
+        """
+        if result.get("is_spam") and result.get("simhash") is not None:
+            self.campaigns.submit(text, result["simhash"])
+
+    async def predict(self, text: str, version: Optional[str] = None) -> Dict:
+        """
+        Classify one email, coalescing with concurrent requests when batching is on.
+
+        Repeated messages are answered from the result cache without
+        validation, cleaning or scoring; when reuse is enabled, the scoring
+        job gives near-duplicates of confidently classified messages their
+        verdict instead of scoring them.
+
+        Args:
+            text: Email text to classify
+            version: Model version; None for the default (only the default
+                version is micro-batched)
+
+        Raises:
+            ValidationError: If the email fails validation
+            PredictionError: If scoring fails
+            ServiceOverloadedError: If the inference queue is full
+        """
+        start = time.perf_counter()
+        key = self._cache_key(text, version)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self._observe(text, cached)
+            return self._from_cache(cached, start)
+
+        if version is None and self.batcher.running:
+            result = await self.batcher.submit(text)
+        else:
+            result = await self.executor.submit("predict", text, version=version, **self._job_options(version))
+        self.result_cache.put(key, result)
+        self._observe(text, result)
+        return self._public(result)
+
+    async def predict_batch(self, texts: List[str], version: Optional[str] = None) -> List[Dict]:
+        """
+        Classify several emails, with the same contract as ``SpamPredictor.predict_batch``.
+
+        Cached messages are filled in directly. The rest are scored in vectorized chunks; each chunk re-enters the executor queue so a large
+        batch cannot monopolize it ahead of single requests.
+
+        Args:
+            texts: Email texts to classify
+            version: Model version; None for the default
+
+        Raises:
+            PredictionError: If scoring fails
+            ServiceOverloadedError: If the inference queue is full
+        """
+        start = time.perf_counter()
+        predictions: List[Optional[Dict]] = [None] * len(texts)
+        keys = [self._cache_key(text, version) if isinstance(text, str) else None for text in texts]
+        misses = []
+        for index, key in enumerate(keys):
+            cached = self.result_cache.get(key) if key is not None else None
+            if cached is not None:
+                self._observe(texts[index], cached)
+                predictions[index] = self._from_cache(cached, start)
+                continue
+            misses.append(index)
+
+        chunk_size = settings.INFERENCE_BATCH_CHUNK_SIZE
+        for offset in range(0, len(misses), chunk_size):
+            chunk = misses[offset:offset + chunk_size]
+            results = await self.executor.submit(
+                "predict_batch", [texts[index] for index in chunk], version=version, **self._job_options(version)
+            )
+            for index, result in zip(chunk, results):
+                # Validation errors are cheap to recompute and not worth a slot
+                if "error" not in result:
+                    self.result_cache.put(keys[index], result)
+                    self._observe(texts[index], result)
+                    result = self._public(result)
+                predictions[index] = result
+        return predictions
+
+    async def explain(self, text: str, top_k: int = 10, version: Optional[str] = None) -> Dict:
+        """
+        Explain one email, answering repeats from the content-hash cache.
+
+        Args:
+            text: Email text to explain
+            top_k: Maximum number of tokens listed per direction
+            version: Model version; None for the default
+
+        Returns:
+            Explanation as returned by ``SpamPredictor.explain`` plus a
+            "cached" flag
+
+        Raises:
+            ValidationError: If the email fails validation
+            PredictionError: If the explanation fails
+            ServiceOverloadedError: If the inference queue is full
+        """
+        key = self._cache_key(text, version, top_k)
+        cached = self.explain_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+        
+        result = await self.executor.submit("explain", text, top_k, version=version)
+        self.explain_cache.put(key, result)
+        return {**result, "cached": False}
+
+    async def ping_transformer(self) -> Optional[bool]:
+        """
+        Round-trip a ping through the transformer worker processes.
+        
+        Returns:
+            Whether a worker answered in time, or None if the predictor
+            does not use worker processes
+        """
+        transformer = getattr(self.predictor, "transformer", None)
+        if not hasattr(transformer, "ping"):
+            return None
+        # ping() blocks on the response queue, keep it off the event loop
+        return await asyncio.to_thread(
+            transformer.ping, settings.TRANSFORMER_WORKER_PING_TIMEOUT_SECONDS
+        )
+
+    def stats(self) -> Dict:
+        """Get executor, batcher, cache, near-duplicate and campaign statistics."""
+        stats = {
+            "executor": self.executor.stats(),
+            "batcher": self.batcher.stats(),
+            "result_cache": self.result_cache.stats(),
+            "near_duplicates": self.near_duplicates.stats(),
+            "campaigns": self.campaigns.stats(),
+            "explain_cache": self.explain_cache.stats()
+        }
+        # Transformer worker processes, when the predictor uses them
+        transformer = getattr(self.predictor, "transformer", None)
+        if hasattr(transformer, "ping"):
+            stats["transformer_workers"] = transformer.stats()
+        return stats
+
+
+def get_engine(request: Request) -> InferenceEngine:
+    """
+    Dependency returning the engine created by the app lifespan.
+
+    Raises:
+        HTTPException: 503 if the engine has not been started
+    """
+    engine = getattr(request.app.state, "engine", None)
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Inference engine not initialized"
+        )
+    return engine
+
+
+def resolve_model_version(
+    x_model_version: Optional[str] = Header(None, description="Model version to score with"),
+    api_key: Optional[str] = Security(api_key_header)
+) -> Optional[str]:
+    """
+    Dependency choosing the model version for a request.
+
+    The ``X-Model-Version`` header wins, then the caller's API-key pin from
+    the registry; otherwise the default version is used.
+
+    Returns:
+        Version to route to, or None for the default version
+
+    Raises:
+        HTTPException: 400 if the requested version is not registered
+    """
+    version = x_model_version or model_manager.get_pinned_version(api_key)
+    if version is None or version == settings.MODEL_VERSION:
+        return None
+    if version not in model_manager.available_versions():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown model version: {version}"
+        )
+    return version
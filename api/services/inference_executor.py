@@ -0,0 +1,200 @@
+"""
+Bounded executor that keeps CPU-bound inference off the event loop.
+
+Model loading and scoring run in a thread pool (or a process pool, for
+backends such as the transformer model that hold the GIL for long stretches).
+The number of queued plus running jobs is capped; once full, new work is
+rejected immediately so the API can answer 503 instead of stalling.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.config.runtime import apply_runtime_limits
+from src.utils.logger import get_logger
+from src.utils.exceptions import ConfigurationError, ServiceOverloadedError
+
+
+logger = get_logger(__name__)
+
+
+IN_FLIGHT = Gauge(
+    "spam_inference_in_flight",
+    "Inference jobs queued or running in the executor"
+)
+QUEUE_WAIT = Histogram(
+    "spam_inference_queue_wait_seconds",
+    "Time an inference job waited before a worker picked it up",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+REJECTED = Counter(
+    "spam_inference_rejected",
+    "Inference jobs rejected because the queue was full"
+)
+
+
+# Predictor factory of a process-pool worker. It is called for every job,
+# so the predictors it returns must be cached by the worker's own model
+# registry (see ``build_predictor``) and are freed when that evicts them
+_worker_factory = None
+
+
+def _init_worker(predictor_factory: Callable[[Optional[str]], Any]):
+    """Build the default predictor once in each worker process."""
+    global _worker_factory
+    apply_runtime_limits()
+    _worker_factory = predictor_factory
+    predictor_factory(None)
+
+
+def _timed_call(
+    predictor_factory: Optional[Callable[[Optional[str]], Any]],
+    method: str,
+    args: tuple,
+    submitted_at: float,
+    version: Optional[str] = None,
+    kwargs: Optional[Dict] = None
+):
+    """
+    Run one predictor method, reporting how long the job was queued.
+    
+    Module-level so it can be pickled into process-pool workers, where the
+    factory is None and the worker's own factory is used.
+    """
+    queue_wait = time.time() - submitted_at
+    predictor = (predictor_factory or _worker_factory)(version)
+    return queue_wait, getattr(predictor, method)(*args, **(kwargs or {}))
+
+
+class InferenceExecutor:
+    """Bounded thread/process pool for predictor calls."""
+    
+    def __init__(
+        self,
+        predictor_factory: Callable[[Optional[str]], Any],
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64
+    ):
+        """
+        Initialize the executor.
+        
+        Args:
+            predictor_factory: Returns the predictor for a model version
+                (None for the default). For process pools it must be
+                picklable (a module-level function) and is invoked inside
+                each worker process for every job, so it must return cached
+                predictors.
+            kind: "thread" or "process"
+            max_workers: Number of pool workers
+            max_queue: Jobs allowed to wait beyond the busy workers
+        """
+        if kind not in ("thread", "process"):
+            raise ConfigurationError(f"Unknown inference executor: {kind}")
+        
+        self.predictor_factory = predictor_factory
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._rejected = 0
+    
+    @property
+    def capacity(self) -> int:
+        """Maximum number of jobs queued or running at once."""
+        return self.max_workers + self.max_queue
+    
+    def _get_pool(self) -> Executor:
+        """Create the underlying pool on first use."""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.predictor_factory,)
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference"
+                )
+            logger.info(f"Inference executor started ({self.kind}, workers={self.max_workers}, queue={self.max_queue})")
+        return self._pool
+    
+    async def submit(self, method: str, *args, version: Optional[str] = None, **kwargs) -> Any:
+        """
+        Run a predictor method in the pool.
+        
+        Args:
+            method: Predictor method name (e.g. "predict", "predict_batch")
+            *args: Arguments for the method
+            version: Model version to route to; None for the default
+            **kwargs: Keyword arguments for the method
+        
+        Returns:
+            The method's return value
+        
+        Raises:
+            ServiceOverloadedError: If the queue is full
+        """
+        if self._in_flight >= self.capacity:
+            self._rejected += 1
+            REJECTED.inc()
+            raise ServiceOverloadedError(
+                f"Inference queue full ({self._in_flight}/{self.capacity} jobs)"
+            )
+        
+        factory = None if self.kind == "process" else self.predictor_factory
+        self._in_flight += 1
+        IN_FLIGHT.set(self._in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            queue_wait, result = await loop.run_in_executor(
+                self._get_pool(), _timed_call, factory, method, args, time.time(), version, kwargs
+            )
+        finally:
+            self._in_flight -= 1
+            IN_FLIGHT.set(self._in_flight)
+        
+        QUEUE_WAIT.observe(queue_wait)
+        logger.debug(f"Inference job {method} waited {queue_wait * 1000:.1f}ms in queue")
+        return result
+    
+    def stats(self) -> Dict:
+        """
+        Get executor statistics.
+        
+        Returns:
+            Dictionary with pool configuration and load
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected
+        }
+    
+    def recycle(self):
+        """
+        Replace the pool so new jobs run on freshly initialized workers.
+        
+        Used after a model reload in process mode, where each worker holds
+        its own predictor. Jobs already submitted finish on the old pool.
+        """
+        old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+            logger.info("Inference executor recycled")
+    
+    def shutdown(self):
+        """Shut down the pool, waiting for running jobs."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            logger.info("Inference executor stopped")
@@ -0,0 +1,195 @@
+"""
+Micro-batching scheduler for single-email classification requests.
+
+Concurrent ``/api/v1/classify`` calls are queued for a short window and
+scored together through one vectorized ``predict_batch`` call, so a single
+worker gets batch-level throughput while per-request latency stays bounded.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+from src.utils.logger import get_logger
+from src.utils.exceptions import ValidationError
+
+
+logger = get_logger(__name__)
+
+
+QUEUE_DEPTH = Gauge(
+    "spam_batcher_queue_depth",
+    "Single-email requests waiting to be batched"
+)
+BATCH_SIZE = Histogram(
+    "spam_batcher_batch_size",
+    "Number of requests scored together per micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+
+class MicroBatcher:
+    """
+    Asyncio dynamic batcher.
+    
+    The first queued request opens a window; the batch is flushed when the
+    window (``max_wait_ms``) closes or ``max_batch_size`` requests are queued,
+    whichever comes first.
+    """
+    
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[Dict]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            predict_batch: Callable scoring a list of texts, with the same
+                contract as ``SpamPredictor.predict_batch``. May be a
+                coroutine function (e.g. dispatching to an executor), in
+                which case several batches can be in flight at once.
+            max_batch_size: Maximum number of requests per batch
+            max_wait_ms: Maximum time the first request waits for companions
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background worker is accepting requests."""
+        return self._worker is not None and not self._worker.done()
+    
+    async def start(self):
+        """Start the background batching task on the running loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"MicroBatcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+    
+    async def stop(self):
+        """Stop the background task, failing any requests still queued."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher stopped"))
+        QUEUE_DEPTH.set(0)
+        logger.info("MicroBatcher stopped")
+    
+    async def submit(self, text: str) -> Dict:
+        """
+        Queue one email and wait for its result.
+        
+        Args:
+            text: Email text to classify
+        
+        Returns:
+            Prediction dictionary for this email
+        
+        Raises:
+            ValidationError: If the email fails validation
+            PredictionError: If scoring the batch fails
+        """
+        if not self.running:
+            raise RuntimeError("MicroBatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+    
+    def stats(self) -> Dict:
+        """
+        Get batching statistics.
+        
+        Returns:
+            Dictionary with queue depth and achieved batch sizes
+        """
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0
+        }
+    
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for the first request, then gather more until the window closes."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+    
+    async def _run(self):
+        """Background loop: collect a batch and hand it off for scoring."""
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnect) are dropped here
+            batch = [(text, future) for text, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            
+            self._batches += 1
+            self._items += len(batch)
+            BATCH_SIZE.observe(len(batch))
+            
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Score one batch and resolve each caller's future."""
+        try:
+            results = self.predict_batch([text for text, _ in batch])
+            if inspect.isawaitable(results):
+                results = await results
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(batch)} failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if "error" in result:
+                future.set_exception(ValidationError(result["error"]))
+            else:
+                future.set_result(result)
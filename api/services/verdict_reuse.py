@@ -0,0 +1,153 @@
+"""
+Reuse of confident verdicts for near-duplicate messages.
+
+Sits between the exact result cache and scoring: a message whose SimHash
+is within the configured distance of a recently and confidently classified
+message gets that message's verdict (with its own text statistics) instead
+of being scored. A sampled fraction of such matches is still scored in
+full, and disagreements are counted so the reuse can be judged from its
+stats.
+
+The predictor consults it from inside the executor job (see
+``SpamPredictor.predict_batch``), fingerprinting the text it has cleaned
+for scoring, so the event loop never cleans or hashes message text.
+"""
+
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+from src.utils.near_duplicate import NearDuplicateIndex
+
+
+@dataclass
+class ReuseTicket:
+    """Fingerprint of a scored message and the neighbour it is checked against."""
+
+    scope: Hashable
+    fingerprint: int
+    neighbour: Optional[Dict] = None
+
+
+class VerdictReuse:
+    """Near-duplicate verdict reuse with sampled verification."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_distance: int = 6,
+        min_confidence: float = 0.95,
+        verify_rate: float = 0.05
+    ):
+        """
+        Initialize verdict reuse.
+
+        Args:
+            max_entries: Remembered messages (0 disables reuse)
+            max_distance: Largest SimHash Hamming distance reused
+            min_confidence: Smallest confidence of a verdict that may be reused
+            verify_rate: Fraction of matches still scored in full
+        """
+        self.index = NearDuplicateIndex(max_entries, max_distance)
+        self.min_confidence = min_confidence
+        self.verify_rate = verify_rate
+        self.lookups = 0
+        self.hits = 0
+        self.verified = 0
+        self.disagreements = 0
+        # Executor threads update the counters concurrently
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether near-duplicate reuse is on."""
+        return self.index.max_entries > 0
+
+    def scoped(self, scope: Hashable) -> Optional["ScopedReuse"]:
+        """
+        Bind reuse to one model scope for a scoring job.
+
+        Args:
+            scope: Model scope verdicts are looked up in and recorded under
+
+        Returns:
+            Handle for the predictor, or None when reuse is disabled
+        """
+        return ScopedReuse(self, scope) if self.enabled else None
+
+    def lookup(self, fingerprint: int, scope: Hashable) -> Tuple[Optional[Dict], ReuseTicket]:
+        """
+        Find a reusable verdict for a message.
+
+        Args:
+            fingerprint: SimHash of the cleaned message
+            scope: Model scope the verdict must come from
+
+        Returns:
+            Tuple of (neighbour's prediction to reuse or None, ticket to pass
+            to ``record`` once the message has been scored)
+        """
+        ticket = ReuseTicket(scope, fingerprint)
+        found = self.index.find(scope, fingerprint)
+        with self._lock:
+            self.lookups += 1
+            if found is None:
+                return None, ticket
+            neighbour, _ = found
+            if random.random() < self.verify_rate:
+                # Score this one anyway and compare with the neighbour's verdict
+                ticket.neighbour = neighbour
+                return None, ticket
+            self.hits += 1
+        return neighbour, ticket
+
+    def record(self, ticket: Optional[ReuseTicket], result: Dict):
+        """
+        Index a freshly scored message and settle its verification.
+
+        Args:
+            ticket: Ticket returned by ``lookup``
+            result: Prediction for the message
+        """
+        if ticket is None or "error" in result:
+            return
+        if ticket.neighbour is not None:
+            with self._lock:
+                self.verified += 1
+                if ticket.neighbour["is_spam"] != result["is_spam"]:
+                    self.disagreements += 1
+        if result["confidence"] >= self.min_confidence:
+            self.index.add(ticket.scope, ticket.fingerprint, result)
+
+    def clear(self):
+        """Forget every remembered verdict (counters are kept)."""
+        self.index.clear()
+
+    def stats(self) -> Dict:
+        """Get reuse statistics."""
+        return {
+            "entries": len(self.index),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "verified": self.verified,
+            "disagreements": self.disagreements,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "disagreement_rate": self.disagreements / self.verified if self.verified else 0.0
+        }
+
+
+@dataclass
+class ScopedReuse:
+    """``VerdictReuse`` bound to one model scope, as passed to the predictor."""
+
+    reuse: VerdictReuse
+    scope: Hashable
+
+    def lookup(self, fingerprint: int) -> Tuple[Optional[Dict], ReuseTicket]:
+        """Find a reusable verdict in this scope (see ``VerdictReuse.lookup``)."""
+        return self.reuse.lookup(fingerprint, self.scope)
+
+    def record(self, ticket: Optional[ReuseTicket], result: Dict):
+        """Index a scored message (see ``VerdictReuse.record``)."""
+        self.reuse.record(ticket, result)
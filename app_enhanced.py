@@ -566,7 +566,32 @@ with tab_batch:
     st.markdown("### 📦 Bulk Analysis")
     uploaded = st.file_uploader("Upload CSV", type="csv")
     if uploaded:
-        st.info("Batch processing ready.")
+        batch_df = pd.read_csv(uploaded, encoding_errors="replace")
+        text_columns = [col for col in batch_df.columns if batch_df[col].dtype == object]
+        if not text_columns:
+            st.error("No text column found in the CSV.")
+        else:
+            text_column = st.selectbox("Text column", text_columns)
+            st.info(f"Batch processing ready: {len(batch_df)} rows.")
+            if st.button("Analyze Batch", type="primary"):
+                with st.spinner(f"Analyzing {len(batch_df)} emails..."):
+                    texts = batch_df[text_column].fillna("").astype(str).tolist()
+                    results = model_service.predict_batch(texts, model_choice)
+                
+                batch_df['prediction'] = [
+                    'INVALID' if 'error' in r else ('SPAM' if r['is_spam'] else 'HAM')
+                    for r in results
+                ]
+                batch_df['confidence'] = [r.get('confidence') for r in results]
+                spam_total = int((batch_df['prediction'] == 'SPAM').sum())
+                st.success(f"Done: {spam_total} spam out of {len(batch_df)} emails.")
+                st.dataframe(batch_df, use_container_width=True)
+                st.download_button(
+                    "Download Results",
+                    batch_df.to_csv(index=False),
+                    file_name="spam_batch_results.csv",
+                    mime="text/csv"
+                )
 
 # Dashboard Tab
 with tab_dash:
@@ -0,0 +1,66 @@
+"""
+Benchmark the streaming campaign detector.
+
+Feeds the corpus spam, mixed with a synthetic campaign of near-identical
+variants, through detectors of increasing capacity. Reports the update
+cost per message (which should not grow with capacity), the memory held,
+and whether the campaign comes out as the top cluster.
+
+Usage:
+    python benchmarks/bench_campaigns.py [--campaign-size N] [--capacities N [N ...]]
+"""
+
+import argparse
+import random
+
+from common import load_corpus, time_per_call
+from api.services.campaign_detector import CampaignDetector
+from src.preprocessing.text_processor import text_processor
+from src.utils.near_duplicate import simhash
+
+
+CAMPAIGN = (
+    "Dear {name}, your parcel {code} is waiting at our depot. Pay the 1.99 redelivery "
+    "fee at {url} within 24 hours or it will be returned to the sender."
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--campaign-size", type=int, default=2000)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    args = parser.parse_args()
+
+    texts, labels = load_corpus()
+    spam = [text for text, label in zip(texts, labels) if label == 1]
+    rng = random.Random(0)
+    campaign = [
+        CAMPAIGN.format(
+            name=rng.choice(["John", "Mary", "Ahmed", "Li", "customer", "friend"]),
+            code=f"RM{rng.randrange(10 ** 8):08d}GB",
+            url=f"http://parcel-{rng.randrange(1000)}.example/pay"
+        )
+        for _ in range(args.campaign_size)
+    ]
+    stream = spam + campaign
+    rng.shuffle(stream)
+    fingerprints = [(text, simhash(text_processor.clean_text(text))) for text in stream]
+    fingerprints = [(text, fp) for text, fp in fingerprints if fp is not None]
+
+    print(f"Stream: {len(fingerprints)} fingerprinted spam messages, {args.campaign_size} from one campaign")
+    print(f"{'capacity':>10}{'us/msg':>8}{'given fingerprint (us)':>23}{'memory (KB)':>13}{'top cluster':>13}")
+    for capacity in args.capacities:
+        detector = CampaignDetector(capacity)
+        update = time_per_call(lambda item: detector.observe(item[0], item[1]), fingerprints)
+        full = time_per_call(CampaignDetector(capacity).observe, stream)
+        # One clean pass for the clustering result
+        detector = CampaignDetector(capacity)
+        for text in stream:
+            detector.observe(text)
+        top = detector.top_clusters(limit=1)[0]
+        print(f"{capacity:>10}{full:>8.1f}{update:>23.1f}{detector.nbytes / 1024:>13.1f}"
+              f"{top['total_messages']:>13}")
+
+
+if __name__ == "__main__":
+    main()
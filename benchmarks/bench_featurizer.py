@@ -0,0 +1,54 @@
+"""
+Benchmark the batch featurizer against ``TfidfVectorizer.transform``.
+
+Reports featurization latency per email for single-email calls and for
+batches, and checks that both paths produce bit-identical CSR matrices.
+
+Usage:
+    python benchmarks/bench_featurizer.py [--max-features N] [--samples N] [--batch-size N]
+"""
+
+import argparse
+
+from common import train_reference_model, time_per_call
+from src.preprocessing.featurizer import Featurizer
+from src.preprocessing.text_processor import text_processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-features", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    _, vectorizer, texts = train_reference_model(args.max_features)
+    cleaned = text_processor.clean_texts(texts[:args.samples])
+    featurizer = Featurizer.from_vectorizer(vectorizer)
+
+    expected = vectorizer.transform(cleaned)
+    actual = featurizer.transform(cleaned)
+    identical = (
+        (actual.indptr == expected.indptr).all()
+        and (actual.indices == expected.indices).all()
+        and actual.data.tobytes() == expected.data.tobytes()
+    )
+
+    batches = [cleaned[i:i + args.batch_size] for i in range(0, len(cleaned), args.batch_size)]
+
+    print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+    print(f"Bit-identical output: {identical}")
+    print(f"{'mode':<16}{'sklearn (us)':>14}{'featurizer (us)':>17}")
+    single_sklearn = time_per_call(lambda text: vectorizer.transform([text]), cleaned)
+    single_fast = time_per_call(lambda text: featurizer.transform([text]), cleaned)
+    print(f"{'single':<16}{single_sklearn:>14.1f}{single_fast:>17.1f}")
+
+    # Per-email cost when featurizing whole batches
+    scale = len(batches) / len(cleaned)
+    batch_sklearn = time_per_call(vectorizer.transform, batches) * scale
+    batch_fast = time_per_call(featurizer.transform, batches) * scale
+    print(f"{f'batch ({args.batch_size})':<16}{batch_sklearn:>14.1f}{batch_fast:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
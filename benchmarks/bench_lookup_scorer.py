@@ -0,0 +1,51 @@
+"""
+Benchmark the token-weight lookup scorer against the sklearn path.
+
+Reports per-email scoring latency (cleaning excluded) for short and full-length
+messages, plus the maximum probability deviation between the two backends.
+
+Usage:
+    python benchmarks/bench_lookup_scorer.py [--max-features N] [--samples N]
+"""
+
+import argparse
+
+import numpy as np
+
+from common import train_reference_model, time_per_call
+from src.models.lookup_scorer import TokenWeightScorer
+from src.models.predictor import SpamPredictor
+from src.preprocessing.text_processor import text_processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-features", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args()
+
+    model, vectorizer, texts = train_reference_model(args.max_features)
+    cleaned = [text_processor.clean_text(t) for t in texts[:args.samples]]
+    short = [t for t in cleaned if len(t) <= 80]
+
+    predictor = SpamPredictor(model, vectorizer, backend="sklearn")
+    scorer = TokenWeightScorer.from_sklearn(model, vectorizer)
+
+    def sklearn_path(text):
+        return predictor._predict_proba(vectorizer.transform([text]))[0]
+
+    deviation = np.abs(
+        scorer.predict_proba(cleaned) - model.predict_proba(vectorizer.transform(cleaned))
+    ).max()
+
+    print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+    print(f"Max probability deviation: {deviation:.2e}")
+    print(f"{'inputs':<16}{'sklearn (us)':>14}{'lookup (us)':>14}")
+    for name, inputs in ((f"short ({len(short)})", short), (f"all ({len(cleaned)})", cleaned)):
+        baseline = time_per_call(sklearn_path, inputs)
+        lookup = time_per_call(scorer.predict_proba_one, inputs)
+        print(f"{name:<16}{baseline:>14.1f}{lookup:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
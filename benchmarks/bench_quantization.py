@@ -0,0 +1,48 @@
+"""
+Benchmark reduced-precision model artifacts against the full model.
+
+Reports weight size, holdout deviation, label flips and single-email
+scoring latency for float64, float32 and int8 artifacts.
+
+Usage:
+    python benchmarks/bench_quantization.py [--max-features N] [--samples N]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import train_reference_model, time_per_call
+from src.models.artifact import PRECISIONS, export_artifact, load_artifact
+from src.models.quantization import validate_quantized
+from src.preprocessing.text_processor import text_processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-features", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    model, vectorizer, texts = train_reference_model(args.max_features)
+    cleaned = text_processor.clean_texts(texts[:args.samples])
+
+    print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+    print(f"{'precision':<11}{'weights (KB)':>14}{'max deviation':>15}{'flip rate':>11}{'latency (us)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for precision in PRECISIONS:
+            compact_model, compact_vectorizer, _ = load_artifact(
+                export_artifact(model, vectorizer, Path(tmp) / precision, precision=precision)
+            )
+            report = validate_quantized(model, vectorizer, compact_model, compact_vectorizer, cleaned)
+            latency = time_per_call(
+                lambda text: compact_model.predict_proba(compact_vectorizer.transform([text])), cleaned
+            )
+            print(
+                f"{precision:<11}{compact_model.feature_log_prob_t.nbytes / 1024:>14.1f}"
+                f"{report['max_deviation']:>15.2e}{report['label_flip_rate']:>11.4f}{latency:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
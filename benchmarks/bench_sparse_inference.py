@@ -0,0 +1,60 @@
+"""
+Benchmark dense vs sparse single-email inference.
+
+Compares the old ``transform(...).toarray()`` + ``predict_proba`` path against
+``SpamPredictor`` scoring the CSR matrix directly, reporting per-request
+latency and peak allocation.
+
+Usage:
+    python benchmarks/bench_sparse_inference.py [--max-features N] [--samples N]
+"""
+
+import argparse
+import tracemalloc
+
+from common import train_reference_model, time_per_call
+from src.models.predictor import SpamPredictor
+from src.preprocessing.text_processor import text_processor
+
+
+def peak_bytes(func, inputs: list) -> int:
+    """Return the peak traced allocation of running ``func`` over ``inputs``."""
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-features", type=int, default=3000,
+                        help="Vocabulary cap (0 for unlimited)")
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    model, vectorizer, texts = train_reference_model(args.max_features or None)
+    cleaned = [text_processor.clean_text(t) for t in texts[:args.samples]]
+    vocab_size = len(vectorizer.vocabulary_)
+
+    def dense(text):
+        X = vectorizer.transform([text]).toarray()
+        return model.predict_proba(X)
+
+    predictor = SpamPredictor(model, vectorizer)
+
+    def sparse(text):
+        X = vectorizer.transform([text])
+        return predictor._predict_proba(X)
+
+    print(f"Vocabulary size: {vocab_size}, samples: {len(cleaned)}")
+    print(f"{'path':<8}{'latency (us)':>16}{'peak alloc (KiB)':>20}")
+    for name, func in (("dense", dense), ("sparse", sparse)):
+        latency = time_per_call(func, cleaned)
+        peak = peak_bytes(func, cleaned[:50]) / 1024
+        print(f"{name:<8}{latency:>16.1f}{peak:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the packed term index against the vocabulary dict.
+
+Reports the memory held by each representation and token lookup
+throughput for single emails and for batches, and checks that both return
+the same feature ids.
+
+Usage:
+    python benchmarks/bench_term_index.py [--max-features N] [--samples N] [--batch-size N]
+"""
+
+import argparse
+import pickle
+import tracemalloc
+
+import numpy as np
+
+from common import train_reference_model, time_per_call
+from src.preprocessing.featurizer import Featurizer
+from src.preprocessing.term_index import TermIndex
+from src.preprocessing.text_processor import text_processor
+
+
+def allocated_bytes(build) -> int:
+    """Bytes still allocated by the object ``build`` returns."""
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-features", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    _, vectorizer, texts = train_reference_model(args.max_features)
+    vocabulary = vectorizer.vocabulary_
+    index = TermIndex.from_vocabulary(vocabulary)
+    featurizer = Featurizer.from_vectorizer(vectorizer)
+
+    cleaned = text_processor.clean_texts(texts[:args.samples])
+    emails = [featurizer.tokenize([text])[0] for text in cleaned]
+    batches = [sum(emails[i:i + args.batch_size], []) for i in range(0, len(emails), args.batch_size)]
+    tokens = sum(emails, [])
+
+    identical = (featurizer.lookup(tokens) == index.lookup(tokens)).all()
+    dict_bytes = allocated_bytes(lambda: pickle.loads(pickle.dumps(vocabulary)))
+    index_bytes = allocated_bytes(lambda: TermIndex.from_vocabulary(vocabulary))
+
+    print(f"Vocabulary size: {len(vocabulary)} ({sum(len(t.encode('utf-8')) for t in vocabulary) / 1024:.1f} KB of term bytes)")
+    print(f"Same feature ids: {identical}")
+    print(f"Resident memory: dict {dict_bytes / 1024:.1f} KB, index {index_bytes / 1024:.1f} KB "
+          f"({index.blob.nbytes + index.offsets.nbytes + index.ids.nbytes} bytes shareable when mapped)")
+
+    print(f"{'mode':<16}{'dict (Mtok/s)':>15}{'index (Mtok/s)':>16}")
+    for mode, inputs in (("single", emails), (f"batch ({args.batch_size})", batches)):
+        n_tokens = sum(map(len, inputs))
+        tokens_per_call = n_tokens / len(inputs)
+        # Tokens per microsecond is millions of tokens per second
+        dict_rate = tokens_per_call / time_per_call(featurizer.lookup, inputs)
+        index_rate = tokens_per_call / time_per_call(index.lookup, inputs)
+        print(f"{mode:<16}{dict_rate:>15.2f}{index_rate:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark CPU oversubscription across worker processes.
+
+Starts one process per simulated uvicorn worker, each running dense
+float32 matrix products shaped like a transformer feed-forward layer (the
+BLAS-heavy part of transformer scoring), all at once. Without limits every
+process's BLAS starts one thread per core; with the governor
+(``apply_runtime_limits``) the cores are split between the processes.
+Reports per-call p50/p99 latency and the total throughput of both runs.
+
+Usage:
+    python benchmarks/bench_thread_governor.py [--workers N] [--calls N] [--tokens N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (adds the project root to sys.path)
+from src.config import runtime
+from src.config.settings import settings
+
+
+HIDDEN, INTERMEDIATE = 768, 3072
+
+
+def _worker(governed: bool, workers: int, calls: int, tokens: int, barrier, results):
+    """Time ``calls`` feed-forward products in one simulated API worker."""
+    if governed:
+        settings.API_WORKERS = workers
+        settings.INFERENCE_WORKERS = 1
+        runtime.apply_runtime_limits()
+
+    rng = np.random.default_rng(0)
+    activations = rng.standard_normal((tokens, HIDDEN), dtype=np.float32)
+    weights = rng.standard_normal((HIDDEN, INTERMEDIATE), dtype=np.float32)
+    activations @ weights
+
+    barrier.wait()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        activations @ weights
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def run(governed: bool, workers: int, calls: int, tokens: int) -> dict:
+    """Run every worker at once and pool their latencies."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(governed, workers, calls, tokens, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    latencies = np.concatenate([np.asarray(results.get()) for _ in processes]) * 1000
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "throughput": len(latencies) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() // 2), help="simulated uvicorn workers")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=256, help="rows per product (batch x sequence length)")
+    args = parser.parse_args()
+
+    settings.API_WORKERS = args.workers
+    settings.INFERENCE_WORKERS = 1
+    print(
+        f"{args.workers} workers on {runtime.cpu_count()} cores, "
+        f"{runtime.threads_per_worker()} threads per worker when governed"
+    )
+    if runtime.cpu_count() < 2:
+        print("Only one core: both modes run one thread per worker, so the comparison says nothing")
+    print(f"{'mode':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'products/s':>12}")
+    for governed in (False, True):
+        result = run(governed, args.workers, args.calls, args.tokens)
+        mode = "governed" if governed else "default"
+        print(f"{mode:<12}{result['p50']:>10.2f}{result['p99']:>10.2f}{result['throughput']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the transformer CPU execution backends.
+
+For each backend (eager fp32, dynamic int8, TorchScript, ONNX Runtime)
+reports single-email latency, batched throughput, and probability drift
+against the eager model on corpus emails. Exports are cached in
+TRANSFORMER_CACHE_DIR, so the first run also pays for them; a backend that
+fails its parity check falls back to eager and is reported as rejected.
+
+Usage:
+    python benchmarks/bench_transformer_backends.py [--samples N] [--batch-size N] [--threads N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from common import load_corpus, time_per_call
+from src.services.transformer_backends import TRANSFORMER_BACKENDS
+from src.services.transformer_service import TransformerService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    texts, _ = load_corpus()
+    texts = texts[:args.samples]
+
+    eager = TransformerService(batch_size=args.batch_size, backend="eager")
+    reference = eager.predict_proba(texts)
+
+    print(f"{len(texts)} emails, batch size {args.batch_size}, {torch.get_num_threads()} threads")
+    print(f"{'backend':<13}{'status':<10}{'latency (ms)':>14}{'throughput (/s)':>17}{'max drift':>12}{'flips':>7}")
+    for backend in TRANSFORMER_BACKENDS:
+        service = TransformerService(batch_size=args.batch_size, backend=backend)
+        service.load_model()
+        status = "ok" if service.backend == backend else "rejected"
+
+        latency = time_per_call(lambda text: service.predict_proba([text]), texts[:100]) / 1000
+        start = time.perf_counter()
+        probabilities = service.predict_proba(texts)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        drift = float(np.abs(probabilities - reference).max())
+        flips = int((probabilities.argmax(axis=1) != reference.argmax(axis=1)).sum())
+        print(f"{backend:<13}{status:<10}{latency:>14.2f}{throughput:>17.1f}{drift:>12.2e}{flips:>7}")
+
+
+if __name__ == "__main__":
+    main()
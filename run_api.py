@@ -5,16 +5,22 @@ Run this script to start the Email Spam Classifier API.
 """
 
 import uvicorn
+from src.config.runtime import apply_runtime_limits
 from src.config.settings import settings
 
 
 if __name__ == "__main__":
+    # Export the thread limits before the workers start, so they are in
+    # place before each worker loads NumPy or torch
+    apply_runtime_limits()
+
     # Run the API server
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
+        workers=None if settings.DEBUG else settings.API_WORKERS,
         log_level=settings.LOG_LEVEL.lower(),
         access_log=True
     )
@@ -0,0 +1,205 @@
+"""
+CPU thread and affinity limits for serving processes.
+
+By default OpenMP, the BLAS behind NumPy/scikit-learn and torch each start
+one thread per core in every process. With several uvicorn workers, each
+running several scoring threads or worker processes, that is many times
+more busy threads than cores, and tail latency collapses under load. The
+limits here split the cores between the scoring workers instead:
+
+- every scoring worker gets ``CPU_THREADS_PER_WORKER`` threads (by default
+  the cores divided by the number of scoring workers on the box, see
+  ``scoring_workers``)
+- the OpenMP/BLAS thread variables are set for libraries loaded later and
+  in child processes, and threadpoolctl limits the ones already loaded
+- torch gets the same intra-op count and ``TORCH_INTEROP_THREADS``
+  inter-op threads once it is imported
+- with ``CPU_AFFINITY`` each uvicorn worker is pinned to its own slice of
+  the cores; its child processes inherit the mask
+
+``apply_runtime_limits`` is called at the start of every serving process.
+"""
+
+import multiprocessing
+import os
+import sys
+from typing import Dict, List, Optional
+
+from threadpoolctl import threadpool_info, threadpool_limits
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Thread-count variables read by OpenMP and the BLAS/numexpr builds NumPy,
+# scikit-learn and torch ship with, when they are loaded
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# Limits applied in this process, reported by ``runtime_info``
+_applied: Dict = {}
+
+
+def cpu_count() -> int:
+    """Cores available to the deployment (``CPU_COUNT`` overrides detection)."""
+    return settings.CPU_COUNT or os.cpu_count() or 1
+
+
+def scoring_workers() -> int:
+    """
+    Number of threads or processes on the box that score emails at once.
+
+    Each uvicorn worker scores in ``INFERENCE_WORKERS`` executor threads or
+    processes, or, for the transformer backend with worker processes, in
+    ``TRANSFORMER_WORKERS`` processes (the executor threads then only wait).
+
+    Returns:
+        Concurrent scoring workers across all uvicorn workers
+    """
+    if settings.INFERENCE_BACKEND == "transformer" and settings.TRANSFORMER_WORKERS > 0:
+        per_server = settings.TRANSFORMER_WORKERS
+    else:
+        per_server = settings.INFERENCE_WORKERS
+    return max(1, settings.API_WORKERS) * max(1, per_server)
+
+
+def threads_per_worker() -> int:
+    """Intra-op threads for each scoring worker."""
+    if settings.CPU_THREADS_PER_WORKER > 0:
+        return settings.CPU_THREADS_PER_WORKER
+    return max(1, cpu_count() // scoring_workers())
+
+
+def server_worker_index() -> int:
+    """
+    Best-effort index of this uvicorn worker.
+
+    uvicorn starts its workers as multiprocessing children, numbered from 1
+    in start order; a restarted worker takes the slot its number maps to.
+
+    Returns:
+        Index in ``range(API_WORKERS)`` (0 when not running under uvicorn workers)
+    """
+    identity = multiprocessing.current_process()._identity
+    if not identity:
+        return 0
+    return (identity[0] - 1) % max(1, settings.API_WORKERS)
+
+
+def _affinity_slice(worker_index: int) -> Optional[List[int]]:
+    """Cores of this worker's share of the available cores, or None if pinning is off."""
+    if not settings.CPU_AFFINITY or settings.API_WORKERS <= 1 or not hasattr(os, "sched_setaffinity"):
+        return None
+    cores = sorted(os.sched_getaffinity(0))
+    share = len(cores) // settings.API_WORKERS
+    if share == 0:
+        # Fewer cores than workers: share them round-robin
+        return [cores[worker_index % len(cores)]]
+    start = (worker_index % settings.API_WORKERS) * share
+    return cores[start:start + share]
+
+
+def _env_threads(default: int) -> int:
+    """
+    Thread count from ``OMP_NUM_THREADS``.
+
+    OpenMP accepts a comma-separated list of counts for nested parallel
+    regions ("4,2"); the first one sizes the outer pool. Anything that does
+    not start with a positive integer falls back to ``default``.
+    """
+    value = os.environ.get("OMP_NUM_THREADS", "").split(",")[0].strip()
+    try:
+        threads = int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid OMP_NUM_THREADS={os.environ.get('OMP_NUM_THREADS')!r}")
+        return default
+    return threads if threads > 0 else default
+
+
+def apply_torch_limits():
+    """
+    Apply the thread limits to torch, if it has been imported.
+
+    The inter-op pool can only be sized before torch first uses it, so call
+    this before loading a model.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None or "threads" not in _applied:
+        return
+    try:
+        torch.set_num_threads(_applied["threads"])
+        torch.set_num_interop_threads(settings.TORCH_INTEROP_THREADS)
+    except RuntimeError as e:
+        # Inter-op work already started in this process
+        logger.warning(f"Could not set torch inter-op threads: {e}")
+
+
+def apply_runtime_limits(worker_index: Optional[int] = None) -> Dict:
+    """
+    Limit this process's CPU threads and, for uvicorn workers, its cores.
+
+    Thread variables already set in the environment (by the operator or a
+    parent process) are kept.
+
+    Args:
+        worker_index: Index of the uvicorn worker to pin when
+            ``CPU_AFFINITY`` is on; None for processes that should keep
+            their parent's mask (executor and transformer workers)
+
+    Returns:
+        The effective limits, as reported by ``runtime_info``
+    """
+    threads = threads_per_worker()
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    threads = _env_threads(threads)
+    _applied["threads"] = threads
+
+    # Libraries loaded before this call have already sized their pools
+    threadpool_limits(limits=threads)
+
+    if worker_index is not None:
+        cores = _affinity_slice(worker_index)
+        if cores:
+            os.sched_setaffinity(0, cores)
+
+    apply_torch_limits()
+    info = runtime_info()
+    logger.info(
+        f"Runtime limits: {threads} threads per worker for {info['scoring_workers']} scoring workers "
+        f"on {info['cpu_count']} cores, affinity {info['cpu_affinity']}"
+    )
+    return info
+
+
+def runtime_info() -> Dict:
+    """
+    Effective thread and affinity settings of this process.
+
+    Returns:
+        Dictionary with the core count, scoring workers, configured threads
+        per worker, the thread count of each loaded OpenMP/BLAS library,
+        torch's intra- and inter-op threads (None until torch is imported)
+        and the CPU affinity mask (None where unsupported)
+    """
+    torch = sys.modules.get("torch")
+    return {
+        "cpu_count": cpu_count(),
+        "scoring_workers": scoring_workers(),
+        "threads_per_worker": _applied.get("threads", threads_per_worker()),
+        "thread_pools": {
+            f"{pool['user_api']}:{pool['internal_api']}": pool["num_threads"]
+            for pool in threadpool_info()
+        },
+        "torch_threads": torch.get_num_threads() if torch is not None else None,
+        "torch_interop_threads": torch.get_num_interop_threads() if torch is not None else None,
+        "cpu_affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+    }
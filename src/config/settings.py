@@ -20,6 +20,7 @@ class Settings:
     
     # Paths
     BASE_DIR: Path = Path(__file__).parent.parent.parent
+    # MODEL_PATH may also name a memory-mapped artifact directory (VECTORIZER_PATH is then unused)
     MODEL_PATH: str = os.getenv("MODEL_PATH", str(BASE_DIR / "models" / "spam_v2.pkl"))
     VECTORIZER_PATH: str = os.getenv("VECTORIZER_PATH", str(BASE_DIR / "models" / "vectorizer_v2.pkl"))
     LOG_DIR: str = os.getenv("LOG_DIR", str(BASE_DIR / "logs"))
@@ -27,6 +28,37 @@ class Settings:
     # Model configuration
     MODEL_VERSION: str = "2.0"
     CONFIDENCE_THRESHOLD: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.7"))
+    # Optional JSON registry of extra servable versions and per-API-key pins:
+    # {"versions": {"1.0": {"model_path": ..., "vectorizer_path": ...}}, "pins": {"<api key>": "1.0"}}
+    MODEL_REGISTRY_PATH: str = os.getenv("MODEL_REGISTRY_PATH", str(BASE_DIR / "models" / "registry.json"))
+    MODEL_MEMORY_BUDGET_MB: float = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+    # Poll MODEL_PATH/VECTORIZER_PATH for changes and hot-reload (0 disables)
+    MODEL_WATCH_INTERVAL_SECONDS: float = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "0"))
+    # Scoring backend: "sklearn" or "lookup" (token-weight table) for Naive
+    # Bayes models, or "transformer" (TRANSFORMER_MODEL_NAME, needs torch)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "sklearn")
+    TRANSFORMER_MODEL_NAME: str = os.getenv("TRANSFORMER_MODEL_NAME", "mrm8488/bert-tiny-finetuned-sms-spam-detection")
+    # Transformer batches: texts sorted by length, cut at this many texts or
+    # padded tokens, each padded to its own longest text
+    TRANSFORMER_BATCH_SIZE: int = int(os.getenv("TRANSFORMER_BATCH_SIZE", "32"))
+    TRANSFORMER_MAX_BATCH_TOKENS: int = int(os.getenv("TRANSFORMER_MAX_BATCH_TOKENS", "8192"))
+    TRANSFORMER_MAX_LENGTH: int = int(os.getenv("TRANSFORMER_MAX_LENGTH", "512"))
+    # CPU execution backend: "eager", "int8" (dynamic quantization),
+    # "torchscript" or "onnx" (needs onnxruntime). Exports are cached in
+    # TRANSFORMER_CACHE_DIR and only used if their spam probabilities stay
+    # within TRANSFORMER_MAX_DRIFT of the eager model
+    TRANSFORMER_BACKEND: str = os.getenv("TRANSFORMER_BACKEND", "eager")
+    TRANSFORMER_CACHE_DIR: str = os.getenv("TRANSFORMER_CACHE_DIR", str(BASE_DIR / "models" / "transformer_cache"))
+    TRANSFORMER_MAX_DRIFT: float = float(os.getenv("TRANSFORMER_MAX_DRIFT", "0.02"))
+    # Run the transformer in this many supervised worker processes instead of
+    # in-process (0). Workers coalesce requests arriving within the batch
+    # wait and are restarted if their heartbeat is older than the health timeout.
+    # /health round-trips a ping through them and fails after the ping timeout
+    TRANSFORMER_WORKERS: int = int(os.getenv("TRANSFORMER_WORKERS", "0"))
+    TRANSFORMER_WORKER_BATCH_WAIT_MS: float = float(os.getenv("TRANSFORMER_WORKER_BATCH_WAIT_MS", "2"))
+    TRANSFORMER_WORKER_TIMEOUT_SECONDS: float = float(os.getenv("TRANSFORMER_WORKER_TIMEOUT_SECONDS", "30"))
+    TRANSFORMER_WORKER_HEALTH_TIMEOUT_SECONDS: float = float(os.getenv("TRANSFORMER_WORKER_HEALTH_TIMEOUT_SECONDS", "120"))
+    TRANSFORMER_WORKER_PING_TIMEOUT_SECONDS: float = float(os.getenv("TRANSFORMER_WORKER_PING_TIMEOUT_SECONDS", "5"))
     
     # UI configuration
     PAGE_TITLE: str = "Email Spam Classifier - AI Powered"
@@ -43,6 +75,53 @@ class Settings:
     # Performance
     MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", "10000"))
     
+    # Micro-batching of concurrent single-email API requests
+    MICRO_BATCH_ENABLED: bool = os.getenv("MICRO_BATCH_ENABLED", "True").lower() == "true"
+    MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+    MICRO_BATCH_WAIT_MS: float = float(os.getenv("MICRO_BATCH_WAIT_MS", "2.0"))
+    
+    # Inference executor ("thread" or "process") keeping scoring off the event loop
+    INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    INFERENCE_QUEUE_SIZE: int = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+    INFERENCE_RETRY_AFTER_SECONDS: int = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "1"))
+    # Batch endpoint requests are split into chunks so they interleave with single requests
+    INFERENCE_BATCH_CHUNK_SIZE: int = int(os.getenv("INFERENCE_BATCH_CHUNK_SIZE", "25"))
+
+    # CPU governor (src/config/runtime.py), applied at the start of every
+    # serving process: the CPU_COUNT cores (0 = detected) are split between
+    # the scoring workers of all API_WORKERS uvicorn workers, each getting
+    # CPU_THREADS_PER_WORKER torch/BLAS/OpenMP threads (0 = an even share).
+    # CPU_AFFINITY pins each uvicorn worker to its own slice of the cores
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    CPU_COUNT: int = int(os.getenv("CPU_COUNT", "0"))
+    CPU_THREADS_PER_WORKER: int = int(os.getenv("CPU_THREADS_PER_WORKER", "0"))
+    TORCH_INTEROP_THREADS: int = int(os.getenv("TORCH_INTEROP_THREADS", "1"))
+    CPU_AFFINITY: bool = os.getenv("CPU_AFFINITY", "False").lower() == "true"
+    
+    # Classification results of repeated messages, keyed by content hash and
+    # model version, dropped on model reload (size 0 disables, TTL 0 = no expiry)
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+    RESULT_CACHE_TTL_SECONDS: float = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+    # Near-duplicate verdict reuse: messages within NEAR_DUP_MAX_DISTANCE SimHash
+    # bits of a recent verdict with at least NEAR_DUP_MIN_CONFIDENCE reuse it;
+    # NEAR_DUP_VERIFY_RATE of matches are still scored (entries 0 disables)
+    NEAR_DUP_MAX_ENTRIES: int = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "0"))
+    NEAR_DUP_MAX_DISTANCE: int = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "6"))
+    NEAR_DUP_MIN_CONFIDENCE: float = float(os.getenv("NEAR_DUP_MIN_CONFIDENCE", "0.95"))
+    NEAR_DUP_VERIFY_RATE: float = float(os.getenv("NEAR_DUP_VERIFY_RATE", "0.05"))
+    # Spam campaign detection: recent spam clustered by SimHash into at most
+    # CAMPAIGN_MAX_CLUSTERS clusters (0 disables), forgotten after
+    # CAMPAIGN_WINDOW_SECONDS idle; sizes decay with CAMPAIGN_HALF_LIFE_SECONDS
+    CAMPAIGN_MAX_CLUSTERS: int = int(os.getenv("CAMPAIGN_MAX_CLUSTERS", "1000"))
+    CAMPAIGN_WINDOW_SECONDS: float = float(os.getenv("CAMPAIGN_WINDOW_SECONDS", "3600"))
+    CAMPAIGN_HALF_LIFE_SECONDS: float = float(os.getenv("CAMPAIGN_HALF_LIFE_SECONDS", "600"))
+    CAMPAIGN_MAX_DISTANCE: int = int(os.getenv("CAMPAIGN_MAX_DISTANCE", "10"))
+    CAMPAIGN_EXEMPLAR_CHARS: int = int(os.getenv("CAMPAIGN_EXEMPLAR_CHARS", "200"))
+    CAMPAIGN_MIN_SIZE: float = float(os.getenv("CAMPAIGN_MIN_SIZE", "5"))
+    # /api/v1/explain results cached by content hash (0 disables)
+    EXPLAIN_CACHE_SIZE: int = int(os.getenv("EXPLAIN_CACHE_SIZE", "1024"))
+    
     @classmethod
     def validate(cls) -> bool:
         """
@@ -58,7 +137,8 @@ class Settings:
         if not model_path.exists():
             raise FileNotFoundError(f"Model file not found: {cls.MODEL_PATH}")
         
-        if not vectorizer_path.exists():
+        # An artifact directory holds the vectorizer too
+        if not model_path.is_dir() and not vectorizer_path.exists():
             raise FileNotFoundError(f"Vectorizer file not found: {cls.VECTORIZER_PATH}")
         
         return True
@@ -0,0 +1,432 @@
+"""
+Memory-mapped, pickle-free model artifact for Naive Bayes text models.
+
+An artifact is a directory of ``.npy`` arrays plus a ``meta.json`` manifest.
+Loading maps the arrays read-only with ``np.load(mmap_mode='r')``, so every
+API/UI worker on a host shares a single page-cache copy of the weights and
+vocabulary instead of unpickling a private vocabulary dict per process. The
+vocabulary is stored packed (see ``src.preprocessing.term_index``).
+Hashing-vectorizer models have no vocabulary and store only weights.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from src.preprocessing.featurizer import Featurizer, HashingFeaturizer, unsupported_vectorizer_options
+from src.preprocessing.term_index import TermIndex, pack_terms
+from src.utils.logger import get_logger
+from src.utils.exceptions import ConfigurationError, ModelLoadError
+
+
+logger = get_logger(__name__)
+
+
+ARTIFACT_FORMAT = "spam-nb-mmap/2"
+META_FILE = "meta.json"
+
+# Array files making up an artifact, in digest order
+ARRAY_FILES = (
+    "term_blob.npy",
+    "term_offsets.npy",
+    "term_ids.npy",
+    "idf.npy",
+    "feature_log_prob_t.npy",
+    "class_log_prior.npy",
+    "classes.npy",
+)
+# Extra arrays of int8 artifacts: per-class dequantization parameters
+QUANTIZATION_FILES = ("weight_scale.npy", "weight_offset.npy")
+
+# Weight precisions export_artifact can write
+PRECISIONS = ("float64", "float32", "int8")
+
+
+def quantize_int8(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Quantize weights to int8 with a per-column affine scale.
+
+    Each column (class) is mapped onto [-127, 127] around its midrange, so
+    ``weights ~= q * scale + offset`` with an error of at most ``scale / 2``.
+
+    Args:
+        weights: Float weights, shape (n_features, n_classes)
+
+    Returns:
+        Tuple of (int8 weights, scale per column, offset per column)
+    """
+    low = weights.min(axis=0)
+    high = weights.max(axis=0)
+    offset = (high + low) / 2
+    scale = (high - low) / 254
+    scale[scale == 0] = 1.0
+    quantized = np.clip(np.rint((weights - offset) / scale), -127, 127).astype(np.int8)
+    return np.ascontiguousarray(quantized), scale, offset
+
+
+class CompactVectorizer(Featurizer):
+    """
+    TF-IDF featurizer over a packed, memory-mapped vocabulary.
+
+    Produces the same CSR matrix as the fitted word vectorizer it was
+    exported from. Terms are looked up in a ``TermIndex``, so no
+    per-process dict is built.
+    """
+
+    def __init__(
+        self,
+        index: TermIndex,
+        idf: Optional[np.ndarray],
+        n_features: int,
+        token_pattern: str,
+        lowercase: bool = True,
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        norm: Optional[str] = "l2",
+        dtype=np.float64
+    ):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            index: Term to feature index mapping
+            idf: IDF weight per feature, or None when IDF is disabled
+            n_features: Number of model features
+            token_pattern: Regex used to extract tokens
+            lowercase: Whether input is lowercased before tokenizing
+            sublinear_tf: Whether term frequencies are replaced by 1 + log(tf)
+            binary: Whether term frequencies are clipped to 1
+            norm: Row normalization ('l2', 'l1' or None)
+            dtype: Dtype of the output matrix
+        """
+        super().__init__(
+            vocabulary=None,
+            n_features=n_features,
+            idf=idf,
+            token_pattern=token_pattern,
+            lowercase=lowercase,
+            sublinear_tf=sublinear_tf,
+            binary=binary,
+            norm=norm,
+            dtype=dtype
+        )
+        self.index = index
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """
+        Map tokens to feature indices.
+
+        Args:
+            tokens: Tokens to look up
+
+        Returns:
+            Array aligned with ``tokens``; -1 marks out-of-vocabulary tokens
+        """
+        return self.index.lookup(tokens)
+
+    @property
+    def vocabulary_(self) -> TermIndex:
+        """Term to feature index mapping (read-only, dict-like)."""
+        return self.index
+
+
+class CompactNB:
+    """
+    Multinomial Naive Bayes scorer over memory-mapped weights.
+
+    Weights may be float64, float32, or int8 with a per-class scale and
+    offset. Reduced-precision weights are never upcast as a whole: float32
+    weights are multiplied in float32, and int8 scoring only gathers the
+    rows of the features present in the input.
+    """
+
+    def __init__(
+        self,
+        feature_log_prob_t: np.ndarray,
+        class_log_prior: np.ndarray,
+        classes: np.ndarray,
+        weight_scale: Optional[np.ndarray] = None,
+        weight_offset: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            feature_log_prob_t: Log-probabilities, shape (n_features, n_classes), C-contiguous
+            class_log_prior: Class log-priors, shape (n_classes,)
+            classes: Class labels in model order
+            weight_scale: Per-class scale of int8 weights
+            weight_offset: Per-class offset of int8 weights
+        """
+        self.feature_log_prob_t = feature_log_prob_t
+        self.class_log_prior_ = class_log_prior
+        self.classes_ = classes
+        self.weight_scale = weight_scale
+        self.weight_offset = weight_offset
+
+    @property
+    def precision(self) -> str:
+        """Storage precision of the weights."""
+        return str(self.feature_log_prob_t.dtype)
+
+    @property
+    def feature_log_prob_(self) -> np.ndarray:
+        """Log-probabilities in sklearn layout (n_classes, n_features), dequantized if needed."""
+        if self.weight_scale is None:
+            return self.feature_log_prob_t.T
+        return (self.feature_log_prob_t * self.weight_scale + self.weight_offset).T
+
+    def joint_log_likelihood(self, X) -> np.ndarray:
+        """
+        Compute unnormalized class log-likelihoods.
+
+        Args:
+            X: CSR matrix of shape (n_samples, n_features)
+
+        Returns:
+            Float64 array of shape (n_samples, n_classes)
+        """
+        weights = self.feature_log_prob_t
+        if self.weight_scale is None:
+            if X.dtype != weights.dtype:
+                X = X.astype(weights.dtype)
+            jll = np.asarray(X @ weights, dtype=np.float64)
+        else:
+            # sum_j x_j * (q_j * scale + offset) = scale * (x @ q) + offset * sum_j x_j
+            rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+            contributions = weights[X.indices] * X.data[:, None].astype(np.float32)
+            jll = np.empty((X.shape[0], weights.shape[1]), dtype=np.float64)
+            for k in range(weights.shape[1]):
+                jll[:, k] = np.bincount(rows, weights=contributions[:, k], minlength=X.shape[0])
+            row_sums = np.bincount(rows, weights=X.data, minlength=X.shape[0])
+            jll *= self.weight_scale
+            jll += row_sums[:, None] * self.weight_offset
+        return jll + self.class_log_prior_
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Compute class probabilities.
+
+        Args:
+            X: CSR matrix of shape (n_samples, n_features)
+
+        Returns:
+            Array of shape (n_samples, n_classes)
+        """
+        jll = self.joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        np.exp(jll, out=jll)
+        jll /= jll.sum(axis=1, keepdims=True)
+        return jll
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def is_artifact(path) -> bool:
+    """Check whether a path is an exported artifact directory."""
+    return (Path(path) / META_FILE).is_file()
+
+
+def export_artifact(
+    model,
+    vectorizer,
+    directory,
+    version: Optional[str] = None,
+    precision: str = "float64"
+) -> Path:
+    """
+    Write a fitted model/vectorizer pair as a memory-mappable artifact.
+
+    The directory is written next to its destination and moved into place,
+    so readers never observe a partially written artifact. Processes that
+    still map the previous files keep reading them until they reload.
+
+    Hashing pipelines store no vocabulary at all; serving them only maps
+    the weight arrays.
+
+    Args:
+        model: Fitted MultinomialNB
+        vectorizer: Fitted TfidfVectorizer/CountVectorizer or a HashingVectorizer
+        directory: Destination directory
+        version: Optional version label stored in the manifest
+        precision: Weight storage: "float64", "float32" or "int8" (per-class
+            scale and offset). Reduced precisions also store IDF as float32;
+            validate them with ``src.models.quantization`` before serving.
+
+    Returns:
+        Path of the written artifact
+
+    Raises:
+        ConfigurationError: If the model or vectorizer cannot be exported
+    """
+    if not isinstance(model, MultinomialNB):
+        raise ConfigurationError(f"Artifact export requires MultinomialNB, got {type(model).__name__}")
+
+    if precision not in PRECISIONS:
+        raise ConfigurationError(f"Unsupported artifact precision: {precision}")
+
+    hashing = isinstance(vectorizer, HashingVectorizer)
+    bad = unsupported_vectorizer_options(vectorizer)
+    if bad or not (hashing or hasattr(vectorizer, "vocabulary_")):
+        raise ConfigurationError(f"Artifact export does not support vectorizer options: {bad}")
+
+    # Stop words are removed by the analyzer, so they never match
+    stop_words = vectorizer.get_stop_words() or ()
+    vocabulary = {} if hashing else {
+        term: index for term, index in vectorizer.vocabulary_.items() if term not in stop_words
+    }
+    term_blob, term_offsets, term_ids = pack_terms(vocabulary)
+    use_idf = bool(getattr(vectorizer, "use_idf", False))
+    feature_dtype = np.float64 if precision == "float64" else np.float32
+    weights = np.ascontiguousarray(model.feature_log_prob_.T, dtype=np.float64)
+    arrays = {
+        "term_blob.npy": term_blob,
+        "term_offsets.npy": term_offsets,
+        "term_ids.npy": term_ids,
+        "idf.npy": np.asarray(vectorizer.idf_ if use_idf else np.ones(0), dtype=feature_dtype),
+        "feature_log_prob_t.npy": weights.astype(feature_dtype),
+        "class_log_prior.npy": np.asarray(model.class_log_prior_, dtype=np.float64),
+        "classes.npy": np.asarray(model.classes_),
+    }
+    files = ARRAY_FILES
+    if precision == "int8":
+        arrays["feature_log_prob_t.npy"], arrays["weight_scale.npy"], arrays["weight_offset.npy"] = quantize_int8(weights)
+        files = ARRAY_FILES + QUANTIZATION_FILES
+    if arrays["classes.npy"].dtype == object:
+        raise ConfigurationError("Artifact export requires numeric or string class labels")
+
+    directory = Path(directory)
+    staging = directory.with_name(f".{directory.name}.tmp-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    digest = hashlib.sha256()
+    for name in files:
+        np.save(staging / name, arrays[name], allow_pickle=False)
+        digest.update((staging / name).read_bytes())
+
+    meta = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "n_features": int(model.feature_log_prob_.shape[1]),
+        "precision": precision,
+        "digest": digest.hexdigest(),
+        "vectorizer": {
+            "kind": "hashing" if hashing else "vocabulary",
+            "token_pattern": vectorizer.token_pattern,
+            "lowercase": bool(vectorizer.lowercase),
+            "sublinear_tf": bool(getattr(vectorizer, "sublinear_tf", False)),
+            "binary": bool(vectorizer.binary),
+            "use_idf": use_idf,
+            "norm": getattr(vectorizer, "norm", None),
+            "alternate_sign": bool(getattr(vectorizer, "alternate_sign", False)),
+            "stop_words": sorted(stop_words) if hashing else [],
+        },
+    }
+    with open(staging / META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap the finished directory into place
+    previous = directory.with_name(f".{directory.name}.old-{os.getpid()}")
+    if directory.exists():
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    if previous.exists():
+        shutil.rmtree(previous)
+
+    logger.info(f"Exported artifact to {directory} ({len(vocabulary) if not hashing else 'hashed'} terms)")
+    return directory
+
+
+def load_artifact(directory, mmap: bool = True) -> Tuple[CompactNB, Featurizer, dict]:
+    """
+    Load an artifact written by ``export_artifact``.
+
+    Args:
+        directory: Artifact directory
+        mmap: Map arrays read-only instead of reading them into memory
+
+    Returns:
+        Tuple of (model, vectorizer, manifest); the vectorizer is a
+        CompactVectorizer, or a HashingFeaturizer for hashing artifacts
+
+    Raises:
+        ModelLoadError: If the artifact is missing, malformed or inconsistent
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / META_FILE) as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ModelLoadError(f"Cannot read artifact manifest in {directory}: {str(e)}")
+
+    if meta.get("format") != ARTIFACT_FORMAT:
+        raise ModelLoadError(f"Unsupported artifact format: {meta.get('format')}")
+
+    precision = meta.get("precision", "float64")
+    files = ARRAY_FILES + (QUANTIZATION_FILES if precision == "int8" else ())
+    mmap_mode = "r" if mmap else None
+    try:
+        arrays = {
+            name: np.load(directory / name, mmap_mode=mmap_mode, allow_pickle=False)
+            for name in files
+        }
+    except (OSError, ValueError) as e:
+        raise ModelLoadError(f"Cannot read artifact arrays in {directory}: {str(e)}")
+
+    n_features = int(meta["n_features"])
+    weights = arrays["feature_log_prob_t.npy"]
+    classes = arrays["classes.npy"]
+    offsets = arrays["term_offsets.npy"]
+    if (
+        weights.shape != (n_features, len(classes))
+        or len(offsets) != len(arrays["term_ids.npy"]) + 1
+        or offsets[-1] != len(arrays["term_blob.npy"])
+    ):
+        raise ModelLoadError(f"Artifact arrays in {directory} have inconsistent shapes")
+
+    options = meta["vectorizer"]
+    model = CompactNB(
+        weights,
+        arrays["class_log_prior.npy"],
+        np.asarray(classes),
+        weight_scale=arrays.get("weight_scale.npy"),
+        weight_offset=arrays.get("weight_offset.npy")
+    )
+    # Reduced-precision artifacts featurize in float32 to match their weights
+    feature_dtype = np.float64 if precision == "float64" else np.float32
+    if options.get("kind") == "hashing":
+        vectorizer = HashingFeaturizer(
+            n_features=n_features,
+            token_pattern=options["token_pattern"],
+            lowercase=options["lowercase"],
+            alternate_sign=options["alternate_sign"],
+            binary=options["binary"],
+            norm=options["norm"],
+            stop_words=options["stop_words"],
+            dtype=feature_dtype
+        )
+        return model, vectorizer, meta
+
+    vectorizer = CompactVectorizer(
+        index=TermIndex(arrays["term_blob.npy"], offsets, arrays["term_ids.npy"]),
+        idf=arrays["idf.npy"] if options["use_idf"] else None,
+        n_features=n_features,
+        token_pattern=options["token_pattern"],
+        lowercase=options["lowercase"],
+        sublinear_tf=options["sublinear_tf"],
+        binary=options["binary"],
+        norm=options["norm"],
+        dtype=feature_dtype
+    )
+    return model, vectorizer, meta
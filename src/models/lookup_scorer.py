@@ -0,0 +1,227 @@
+"""
+Token-weight lookup scorer for Naive Bayes + TF-IDF models.
+
+Folds a fitted MultinomialNB and its word vectorizer into a per-term weight
+table so an email can be scored by tokenizing once and summing looked-up
+weights, without building a CSR matrix or calling into sklearn.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.naive_bayes import MultinomialNB
+
+from src.preprocessing.featurizer import unsupported_vectorizer_options
+from src.utils.logger import get_logger
+from src.utils.exceptions import ConfigurationError
+
+
+logger = get_logger(__name__)
+
+
+class TokenWeightScorer:
+    """
+    Scores cleaned email text with precomputed per-term weights.
+
+    For two classes the MultinomialNB decision reduces to
+    ``sum_j x_j * (log P(j|spam) - log P(j|ham)) + prior delta`` where ``x`` is
+    the normalized TF-IDF row. The IDF factor is folded into the weight table,
+    so only the normalization term needs the raw IDF value at request time.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        feature_log_prob: np.ndarray,
+        class_log_prior: np.ndarray,
+        classes: np.ndarray,
+        token_pattern: str,
+        lowercase: bool = True,
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        norm: Optional[str] = "l2"
+    ):
+        """
+        Initialize the scorer.
+
+        Args:
+            vocabulary: Mapping of term to feature index
+            idf: IDF weight per feature (ones when IDF is disabled)
+            feature_log_prob: NB log-probabilities, shape (n_classes, n_features)
+            class_log_prior: NB class log-priors, shape (n_classes,)
+            classes: Class labels in model order
+            token_pattern: Regex used by the vectorizer to extract tokens
+            lowercase: Whether the vectorizer lowercases input
+            sublinear_tf: Whether term frequencies are replaced by 1 + log(tf)
+            binary: Whether term frequencies are clipped to 1
+            norm: Row normalization ('l2', 'l1' or None)
+        """
+        self.classes_ = classes
+        self.n_classes = len(classes)
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.norm = norm
+        self._token_re = re.compile(token_pattern)
+        self._class_log_prior = np.asarray(class_log_prior, dtype=np.float64)
+
+        # Flat per-term table: term -> (idf, idf-scaled class weight(s))
+        feature_log_prob = np.asarray(feature_log_prob, dtype=np.float64)
+        idf = np.asarray(idf, dtype=np.float64)
+        if self.n_classes == 2:
+            delta = (feature_log_prob[1] - feature_log_prob[0]) * idf
+            self._prior_delta = float(self._class_log_prior[1] - self._class_log_prior[0])
+            weights = delta.tolist()
+        else:
+            self._prior_delta = 0.0
+            weights = list(feature_log_prob.T * idf[:, None])
+        idf_list = idf.tolist()
+        self._table: Dict[str, Tuple[float, object]] = {
+            term: (idf_list[index], weights[index])
+            for term, index in vocabulary.items()
+        }
+
+    @classmethod
+    def from_sklearn(cls, model, vectorizer) -> "TokenWeightScorer":
+        """
+        Build a scorer from a fitted MultinomialNB and word vectorizer.
+
+        Args:
+            model: Fitted MultinomialNB
+            vectorizer: Fitted TfidfVectorizer or CountVectorizer
+
+        Returns:
+            TokenWeightScorer equivalent to ``model.predict_proba(vectorizer.transform(...))``
+
+        Raises:
+            ConfigurationError: If the model or vectorizer options are unsupported
+        """
+        if not isinstance(model, MultinomialNB):
+            raise ConfigurationError(f"Lookup scorer requires MultinomialNB, got {type(model).__name__}")
+
+        bad = unsupported_vectorizer_options(vectorizer)
+        if bad or not hasattr(vectorizer, "vocabulary_"):
+            raise ConfigurationError(f"Lookup scorer does not support vectorizer options: {bad}")
+
+        n_features = len(vectorizer.vocabulary_)
+        if getattr(vectorizer, "use_idf", False):
+            idf = vectorizer.idf_
+        else:
+            idf = np.ones(n_features)
+
+        # Stop words are removed by the analyzer, so they never contribute
+        stop_words = vectorizer.get_stop_words() or ()
+        vocabulary = {
+            term: index for term, index in vectorizer.vocabulary_.items()
+            if term not in stop_words
+        }
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=idf,
+            feature_log_prob=model.feature_log_prob_,
+            class_log_prior=model.class_log_prior_,
+            classes=model.classes_,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            sublinear_tf=getattr(vectorizer, "sublinear_tf", False),
+            binary=vectorizer.binary,
+            norm=getattr(vectorizer, "norm", None)
+        )
+
+    def predict_proba_one(self, text: str) -> List[float]:
+        """
+        Compute class probabilities for one cleaned email.
+
+        Args:
+            text: Preprocessed email text
+
+        Returns:
+            List of probabilities ordered like ``classes_``
+        """
+        if self.n_classes != 2:
+            return self._predict_proba_multiclass(text).tolist()
+
+        if self.lowercase:
+            text = text.lower()
+
+        table = self._table
+        log = math.log
+        score = 0.0
+        norm_acc = 0.0
+        for token, tf in Counter(self._token_re.findall(text)).items():
+            entry = table.get(token)
+            if entry is None:
+                continue
+            idf, weight = entry
+            if self.binary:
+                tf = 1
+            elif self.sublinear_tf:
+                tf = 1.0 + log(tf)
+            score += tf * weight
+            if self.norm == "l2":
+                norm_acc += (tf * idf) ** 2
+            elif self.norm == "l1":
+                norm_acc += tf * idf
+
+        if norm_acc > 0.0:
+            score /= math.sqrt(norm_acc) if self.norm == "l2" else norm_acc
+
+        decision = score + self._prior_delta
+        if decision >= 0:
+            spam = 1.0 / (1.0 + math.exp(-decision))
+        else:
+            odds = math.exp(decision)
+            spam = odds / (1.0 + odds)
+        return [1.0 - spam, spam]
+
+    def _predict_proba_multiclass(self, text: str) -> np.ndarray:
+        """Fallback for models with other than two classes."""
+        if self.n_classes == 1:
+            return np.ones(1)
+
+        if self.lowercase:
+            text = text.lower()
+
+        jll = np.zeros(self.n_classes)
+        norm_acc = 0.0
+        for token, tf in Counter(self._token_re.findall(text)).items():
+            entry = self._table.get(token)
+            if entry is None:
+                continue
+            idf, weights = entry
+            if self.binary:
+                tf = 1
+            elif self.sublinear_tf:
+                tf = 1.0 + math.log(tf)
+            jll += tf * weights
+            if self.norm == "l2":
+                norm_acc += (tf * idf) ** 2
+            elif self.norm == "l1":
+                norm_acc += tf * idf
+
+        if norm_acc > 0.0:
+            jll /= math.sqrt(norm_acc) if self.norm == "l2" else norm_acc
+
+        jll += self._class_log_prior
+        jll -= jll.max()
+        probabilities = np.exp(jll)
+        return probabilities / probabilities.sum()
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute class probabilities for several cleaned emails.
+
+        Args:
+            texts: Preprocessed email texts
+
+        Returns:
+            Array of shape (n_samples, n_classes)
+        """
+        return np.array([self.predict_proba_one(text) for text in texts], dtype=np.float64).reshape(
+            len(texts), self.n_classes
+        )
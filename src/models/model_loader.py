@@ -4,11 +4,20 @@ Model loading and management for the Email Spam Classifier.
 Handles loading, caching, and validation of ML models.
 """
 
+import json
 import pickle
 import hashlib
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 
+import numpy as np
+import scipy.sparse as sp
+
+from src.models.artifact import is_artifact, load_artifact
 from src.utils.logger import get_logger
 from src.utils.exceptions import ModelLoadError
 from src.config.settings import settings
@@ -17,100 +26,452 @@ from src.config.settings import settings
 logger = get_logger(__name__)
 
 
+# Smoke-test inputs every candidate model must score before it is published
+CANARY_TEXTS = [
+    "Hi, are we still on for the meeting tomorrow at 3pm?",
+    "CONGRATULATIONS! You have WON a FREE prize. Call 555-123-4567 or visit http://example.com now!",
+    "",
+]
+
+
+def estimate_footprint(*objects, _depth: int = 0) -> int:
+    """
+    Approximate the resident size of fitted estimators.
+
+    Counts NumPy/SciPy buffers, vocabulary dicts and nested estimator
+    attributes; scalars and small objects are counted shallowly. Memory-mapped
+    arrays live in the shared page cache and are not counted.
+
+    Args:
+        *objects: Fitted model/vectorizer objects
+
+    Returns:
+        Estimated size in bytes
+    """
+    total = 0
+    for obj in objects:
+        total += sys.getsizeof(obj)
+        for value in getattr(obj, "__dict__", {}).values():
+            if isinstance(value, np.memmap):
+                continue
+            elif isinstance(value, np.ndarray):
+                total += value.nbytes
+            elif sp.issparse(value):
+                total += sum(
+                    getattr(value, name).nbytes
+                    for name in ("data", "indices", "indptr", "offsets")
+                    if hasattr(value, name)
+                )
+            elif isinstance(value, dict):
+                total += sys.getsizeof(value) + sum(
+                    sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items()
+                )
+            elif hasattr(value, "__dict__") and not callable(value) and _depth < 2:
+                total += estimate_footprint(value, _depth=_depth + 1)
+            else:
+                total += sys.getsizeof(value)
+    return total
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Immutable model/vectorizer pair published as a single reference."""
+
+    model: object
+    vectorizer: object
+    model_path: str
+    vectorizer_path: str
+    version: str
+    fingerprint: str
+    footprint_bytes: int = 0
+    loaded_at: float = field(default_factory=time.time)
+    # Objects derived from this pair (e.g. predictors); freed with the bundle
+    cache: dict = field(default_factory=dict, compare=False, repr=False)
+
+
 class ModelManager:
     """
     Singleton class for managing ML models.
-    
-    Handles model loading, caching, and validation.
+
+    Handles model loading, caching, and validation. The loaded pair lives in
+    one immutable ``ModelBundle``; readers take that reference without
+    locking, and reloads build and validate a new bundle before swapping it
+    in, so in-flight requests finish on the version they started with.
+
+    Besides the default version (``settings.MODEL_VERSION``), additional
+    versions listed in the registry file (``settings.MODEL_REGISTRY_PATH``)
+    are loaded on demand and kept resident until the total footprint
+    exceeds ``settings.MODEL_MEMORY_BUDGET_MB``, at which point the least
+    recently used non-default versions are evicted.
     """
-    
+
     _instance = None
-    _model = None
-    _vectorizer = None
+    _bundle: Optional[ModelBundle] = None
     _initialized = False
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         """Initialize the model manager."""
         if not self._initialized:
             self._initialized = True
+            self._load_lock = threading.Lock()
+            self._reload_listeners: List[Callable[[ModelBundle], None]] = []
+            self._versions: Dict[str, ModelBundle] = {}
+            self._last_used: Dict[str, float] = {}
+            self._registry: Optional[dict] = None
             logger.info("ModelManager initialized")
-    
-    def load_models(self) -> Tuple:
+
+    @property
+    def bundle(self) -> Optional[ModelBundle]:
+        """Currently published bundle (lock-free read)."""
+        return self._bundle
+
+    def load_models(self, version: Optional[str] = None) -> Tuple:
         """
         Load the spam classifier model and vectorizer.
-        
+
+        Args:
+            version: Registry version to load; None for the default version
+
         Returns:
             Tuple of (model, vectorizer)
-        
+
         Raises:
-            ModelLoadError: If models cannot be loaded
+            ModelLoadError: If models cannot be loaded or the version is unknown
+        """
+        bundle = self.get_bundle(version)
+        return bundle.model, bundle.vectorizer
+
+    def get_bundle(self, version: Optional[str] = None) -> ModelBundle:
+        """
+        Get the resident bundle for a version, loading it if needed.
+
+        Args:
+            version: Registry version; None for the default version
+
+        Returns:
+            Published ModelBundle
+
+        Raises:
+            ModelLoadError: If models cannot be loaded or the version is unknown
+        """
+        if version is None or version == settings.MODEL_VERSION:
+            # Hot path: a single attribute read, no lock
+            bundle = self._bundle
+            if bundle is not None:
+                return bundle
+
+            # First load: only one thread reads from disk
+            with self._load_lock:
+                bundle = self._bundle
+                if bundle is None:
+                    bundle = self._load_bundle(settings.MODEL_PATH, settings.VECTORIZER_PATH)
+                    self._validate_bundle(bundle)
+                    self._bundle = bundle
+                    self._enforce_budget()
+                return bundle
+
+        bundle = self._versions.get(version)
+        if bundle is None:
+            with self._load_lock:
+                bundle = self._versions.get(version)
+                if bundle is None:
+                    model_path, vectorizer_path = self.resolve_paths(version)
+                    bundle = self._load_bundle(model_path, vectorizer_path, version)
+                    self._validate_bundle(bundle)
+                    self._versions[version] = bundle
+                    self._last_used[version] = time.monotonic()
+                    self._enforce_budget(keep=version)
+        self._last_used[version] = time.monotonic()
+        return bundle
+
+    def _load_registry(self) -> dict:
+        """Read the optional version registry file once."""
+        if self._registry is None:
+            registry = {"versions": {}, "pins": {}}
+            path = settings.MODEL_REGISTRY_PATH
+            if path and Path(path).exists():
+                with open(path, encoding="utf-8") as f:
+                    registry.update(json.load(f))
+            self._registry = registry
+        return self._registry
+
+    def available_versions(self) -> List[str]:
+        """
+        List every servable version, default first.
+
+        Returns:
+            Version identifiers
+        """
+        others = [v for v in self._load_registry()["versions"] if v != settings.MODEL_VERSION]
+        return [settings.MODEL_VERSION] + others
+
+    def resolve_paths(self, version: str) -> Tuple[str, Optional[str]]:
+        """
+        Look up the artifact paths registered for a version.
+
+        Args:
+            version: Registry version
+
+        Returns:
+            Tuple of (model_path, vectorizer_path); vectorizer_path is None
+            for an artifact directory registered without one
+
+        Raises:
+            ModelLoadError: If the version is not registered or its entry is malformed
+        """
+        if version == settings.MODEL_VERSION:
+            return settings.MODEL_PATH, settings.VECTORIZER_PATH
+        entry = self._load_registry()["versions"].get(version)
+        if entry is None:
+            raise ModelLoadError(f"Unknown model version: {version}")
+        if not isinstance(entry, dict) or not entry.get("model_path"):
+            raise ModelLoadError(f"Registry entry for model version {version} has no model_path")
+        base = Path(settings.MODEL_REGISTRY_PATH).parent
+        model_path = str(base / entry["model_path"])
+        if entry.get("vectorizer_path"):
+            return model_path, str(base / entry["vectorizer_path"])
+        if not is_artifact(model_path):
+            raise ModelLoadError(
+                f"Registry entry for model version {version} needs a vectorizer_path "
+                f"unless model_path is an artifact directory"
+            )
+        return model_path, None
+
+    def get_pinned_version(self, api_key: Optional[str]) -> Optional[str]:
+        """
+        Get the version an API key is pinned to, if any.
+
+        Args:
+            api_key: Caller's API key
+
+        Returns:
+            Pinned version or None
+        """
+        if not api_key:
+            return None
+        return self._load_registry()["pins"].get(api_key)
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """
+        Evict least recently used non-default versions over the memory budget.
+
+        Must be called with ``_load_lock`` held.
+
+        Args:
+            keep: Version that was just loaded and must stay resident
+        """
+        budget = settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        while True:
+            bundles = list(self._versions.values()) + ([self._bundle] if self._bundle else [])
+            if sum(b.footprint_bytes for b in bundles) <= budget:
+                return
+            candidates = [v for v in self._versions if v != keep]
+            if not candidates:
+                logger.warning("Model memory budget exceeded by versions that cannot be evicted")
+                return
+            victim = min(candidates, key=lambda v: self._last_used.get(v, 0.0))
+            evicted = self._versions.pop(victim)
+            self._last_used.pop(victim, None)
+            logger.info(f"Evicted model version {victim} ({evicted.footprint_bytes / 1e6:.1f} MB)")
+
+    def resident_versions(self) -> List[dict]:
+        """
+        Describe every version currently held in memory.
+
+        Returns:
+            List of dictionaries with version, footprint and timestamps
+        """
+        resident = []
+        bundles = ([self._bundle] if self._bundle else []) + list(self._versions.values())
+        for bundle in bundles:
+            resident.append({
+                "version": bundle.version,
+                "fingerprint": bundle.fingerprint,
+                "footprint_bytes": bundle.footprint_bytes,
+                "loaded_at": bundle.loaded_at,
+                "is_default": bundle is self._bundle
+            })
+        return resident
+
+    def _load_bundle(self, model_path: str, vectorizer_path: Optional[str], version: Optional[str] = None) -> ModelBundle:
+        """
+        Read a model/vectorizer pair from disk.
+
+        ``model_path`` may also point at a memory-mapped artifact directory
+        (see ``src.models.artifact``), in which case ``vectorizer_path`` is
+        ignored and both halves come from the artifact.
+
+        Args:
+            model_path: Path to the pickled model or artifact directory
+            vectorizer_path: Path to the pickled vectorizer (None for an artifact)
+            version: Version label; defaults to settings.MODEL_VERSION
+
+        Returns:
+            Unpublished ModelBundle
+
+        Raises:
+            ModelLoadError: If the files are missing or cannot be unpickled
         """
-        # Return cached models if already loaded
-        if self._model is not None and self._vectorizer is not None:
-            logger.debug("Returning cached models")
-            return self._model, self._vectorizer
-        
         try:
             logger.info("Loading models from disk")
-            
+
+            if is_artifact(model_path):
+                logger.debug(f"Mapping artifact from {model_path}")
+                model, vectorizer, meta = load_artifact(model_path)
+                precision = meta.get("precision", "float64")
+                if precision != "float64" and not meta.get("validation", {}).get("passed"):
+                    raise ModelLoadError(
+                        f"{precision} artifact {model_path} has not passed quantization validation"
+                    )
+                logger.info("Models mapped successfully")
+                return ModelBundle(
+                    model=model,
+                    vectorizer=vectorizer,
+                    model_path=str(model_path),
+                    vectorizer_path=str(model_path),
+                    version=version or settings.MODEL_VERSION,
+                    fingerprint=meta["digest"][:12],
+                    footprint_bytes=estimate_footprint(model, vectorizer)
+                )
+
             # Validate files exist
-            if not Path(settings.MODEL_PATH).exists():
-                raise ModelLoadError(f"Model file not found: {settings.MODEL_PATH}")
-            
-            if not Path(settings.VECTORIZER_PATH).exists():
-                raise ModelLoadError(f"Vectorizer file not found: {settings.VECTORIZER_PATH}")
-            
+            if not Path(model_path).exists():
+                raise ModelLoadError(f"Model file not found: {model_path}")
+
+            if not Path(vectorizer_path).exists():
+                raise ModelLoadError(f"Vectorizer file not found: {vectorizer_path}")
+
+            digest = hashlib.sha256()
+
             # Load model
-            logger.debug(f"Loading model from {settings.MODEL_PATH}")
-            with open(settings.MODEL_PATH, 'rb') as f:
-                self._model = pickle.load(f)
-            
+            logger.debug(f"Loading model from {model_path}")
+            with open(model_path, 'rb') as f:
+                data = f.read()
+            digest.update(data)
+            model = pickle.loads(data)
+
             # Load vectorizer
-            logger.debug(f"Loading vectorizer from {settings.VECTORIZER_PATH}")
-            with open(settings.VECTORIZER_PATH, 'rb') as f:
-                self._vectorizer = pickle.load(f)
-            
+            logger.debug(f"Loading vectorizer from {vectorizer_path}")
+            with open(vectorizer_path, 'rb') as f:
+                data = f.read()
+            digest.update(data)
+            vectorizer = pickle.loads(data)
+
             # Verify models are loaded
-            if self._model is None or self._vectorizer is None:
+            if model is None or vectorizer is None:
                 raise ModelLoadError("Models loaded but are None")
-            
+
             logger.info("Models loaded successfully")
-            return self._model, self._vectorizer
-            
+            return ModelBundle(
+                model=model,
+                vectorizer=vectorizer,
+                model_path=str(model_path),
+                vectorizer_path=str(vectorizer_path),
+                version=version or settings.MODEL_VERSION,
+                fingerprint=digest.hexdigest()[:12],
+                footprint_bytes=estimate_footprint(model, vectorizer)
+            )
+
+        except ModelLoadError:
+            raise
+
         except pickle.UnpicklingError as e:
             logger.error(f"Failed to unpickle models: {str(e)}")
             raise ModelLoadError(f"Corrupted model files: {str(e)}")
-        
+
         except Exception as e:
             logger.error(f"Failed to load models: {str(e)}", exc_info=True)
             raise ModelLoadError(f"Model loading failed: {str(e)}")
-    
+
+    @staticmethod
+    def _validate_bundle(bundle: ModelBundle):
+        """
+        Smoke-test a bundle on the canary set before it is published.
+
+        Args:
+            bundle: Candidate bundle
+
+        Raises:
+            ModelLoadError: If the pair is incompatible or produces bad output
+        """
+        try:
+            features = bundle.vectorizer.transform(CANARY_TEXTS)
+            probabilities = np.asarray(bundle.model.predict_proba(features))
+        except Exception as e:
+            raise ModelLoadError(f"Canary scoring failed: {str(e)}")
+
+        if probabilities.shape != (len(CANARY_TEXTS), len(bundle.model.classes_)):
+            raise ModelLoadError(f"Canary output has unexpected shape {probabilities.shape}")
+
+        if not np.all(np.isfinite(probabilities)) or not np.allclose(probabilities.sum(axis=1), 1.0):
+            raise ModelLoadError("Canary probabilities are not a valid distribution")
+
+    def add_reload_listener(self, callback: Callable[[ModelBundle], None]):
+        """
+        Register a callback invoked with the new bundle after each reload.
+
+        Args:
+            callback: Function receiving the newly published ModelBundle
+        """
+        self._reload_listeners.append(callback)
+
+    def remove_reload_listener(self, callback: Callable[[ModelBundle], None]):
+        """Unregister a callback added with ``add_reload_listener``."""
+        if callback in self._reload_listeners:
+            self._reload_listeners.remove(callback)
+
     def get_model_info(self) -> dict:
         """
         Get information about loaded models.
-        
+
         Returns:
             Dictionary with model information
         """
+        bundle = self._bundle
         return {
-            "model_loaded": self._model is not None,
-            "vectorizer_loaded": self._vectorizer is not None,
-            "model_path": settings.MODEL_PATH,
-            "vectorizer_path": settings.VECTORIZER_PATH,
-            "model_version": settings.MODEL_VERSION
+            "model_loaded": bundle is not None,
+            "vectorizer_loaded": bundle is not None,
+            "model_path": bundle.model_path if bundle else settings.MODEL_PATH,
+            "vectorizer_path": bundle.vectorizer_path if bundle else settings.VECTORIZER_PATH,
+            "model_version": bundle.version if bundle else settings.MODEL_VERSION,
+            "fingerprint": bundle.fingerprint if bundle else None,
+            "loaded_at": bundle.loaded_at if bundle else None,
+            "resident_versions": self.resident_versions()
         }
-    
-    def reload_models(self):
-        """Force reload of models from disk."""
-        logger.info("Force reloading models")
-        self._model = None
-        self._vectorizer = None
-        return self.load_models()
+
+    def reload_models(self) -> Tuple:
+        """
+        Reload models from disk without interrupting readers.
+
+        The new pair is loaded and canary-tested off to the side, then
+        published with a single reference swap. If anything fails, the
+        current models stay in service.
+
+        Returns:
+            Tuple of (model, vectorizer) now being served
+
+        Raises:
+            ModelLoadError: If the new artifacts fail to load or validate
+        """
+        logger.info("Reloading models")
+        with self._load_lock:
+            bundle = self._load_bundle(settings.MODEL_PATH, settings.VECTORIZER_PATH)
+            self._validate_bundle(bundle)
+            self._bundle = bundle
+            self._enforce_budget()
+
+        logger.info(f"Published model {bundle.version} ({bundle.fingerprint})")
+        for callback in list(self._reload_listeners):
+            try:
+                callback(bundle)
+            except Exception as e:
+                logger.error(f"Reload listener failed: {str(e)}", exc_info=True)
+        return bundle.model, bundle.vectorizer
 
 
 # Create singleton instance
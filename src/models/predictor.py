@@ -4,40 +4,258 @@ Spam prediction logic for email classification.
 Handles the prediction pipeline using the loaded models.
 """
 
+import re
 import time
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from sklearn.naive_bayes import MultinomialNB
 
 from src.utils.logger import get_logger
-from src.utils.exceptions import PredictionError, ValidationError
-from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import PredictionError, ValidationError, ConfigurationError
+from src.preprocessing.text_processor import EMAIL_PATTERN, PHONE_PATTERN, URL_PATTERN, text_processor
+from src.preprocessing.featurizer import Featurizer, featurizer_for
+from src.models.lookup_scorer import TokenWeightScorer
+from src.models.attribution import NBAttributor
+from src.utils.explainability import score_perturbations
+from src.utils.near_duplicate import simhash
 from src.config.settings import settings
 
 
 logger = get_logger(__name__)
 
 
+# Cleaning replaces these spans with placeholder tokens; explanations point
+# a placeholder back at the spans it stands for
+_PLACEHOLDER_SPANS = (
+    ("url", re.compile(URL_PATTERN, re.IGNORECASE)),
+    ("email", re.compile(EMAIL_PATTERN)),
+    ("phone", re.compile(PHONE_PATTERN)),
+)
+
+
 class SpamPredictor:
     """Spam email predictor using ML models."""
     
-    def __init__(self, model, vectorizer):
+    def __init__(self, model, vectorizer, backend: Optional[str] = None, model_version: Optional[str] = None):
         """
         Initialize the predictor.
         
         Args:
             model: Trained classification model
             vectorizer: Text vectorizer
+            backend: Scoring backend ("sklearn", "lookup" or "transformer");
+                defaults to settings.INFERENCE_BACKEND
+            model_version: Version reported in results; defaults to
+                settings.MODEL_VERSION
         """
         self.model = model
         self.vectorizer = vectorizer
-        logger.info("SpamPredictor initialized")
+        self.model_version = model_version or settings.MODEL_VERSION
+        self._nb_weights = self._prepare_nb_weights(model)
+        self.featurizer = self._prepare_featurizer(vectorizer)
+        self.scorer = None
+        self.transformer = None
+        self.backend = backend or settings.INFERENCE_BACKEND
+        
+        if self.backend == "transformer":
+            # In-process service, or a handle on the shared worker pool
+            from src.services.transformer_worker import create_transformer_service
+            try:
+                self.transformer = create_transformer_service()
+            except ImportError as e:
+                raise ConfigurationError(f"Transformer backend requires torch and transformers: {str(e)}")
+        elif self.backend == "lookup":
+            try:
+                self.scorer = TokenWeightScorer.from_sklearn(model, vectorizer)
+            except ConfigurationError as e:
+                logger.warning(f"Lookup backend unavailable, using sklearn: {str(e)}")
+                self.backend = "sklearn"
+        elif self.backend != "sklearn":
+            raise ConfigurationError(f"Unknown inference backend: {self.backend}")
+        # The NB attributor only explains the NB model
+        self.attributor = self._prepare_attributor() if self.transformer is None else None
+        
+        logger.info(f"SpamPredictor initialized (backend: {self.backend})")
+    
+    @staticmethod
+    def _prepare_nb_weights(model) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Cache Naive Bayes weights in a layout suited to sparse scoring.
+        
+        ``feature_log_prob_`` is stored as (n_classes, n_features); multiplying
+        a CSR row by its transpose view makes scipy copy the whole matrix on
+        every call. Keeping a C-contiguous (n_features, n_classes) copy lets
+        each request touch only the rows of its non-zero features.
+        
+        Args:
+            model: Trained classification model
+        
+        Returns:
+            Tuple of (weights, class_log_prior) or None for non-NB models
+        """
+        if getattr(model, "feature_log_prob_t", None) is not None:
+            # Memory-mapped artifact: already in this layout, use it in place.
+            # Reduced-precision weights are scored by the model itself.
+            if model.feature_log_prob_t.dtype != np.float64:
+                return None
+            return model.feature_log_prob_t, model.class_log_prior_
+        if not isinstance(model, MultinomialNB):
+            return None
+        weights = np.ascontiguousarray(model.feature_log_prob_.T)
+        return weights, model.class_log_prior_
+    
+    @staticmethod
+    def _prepare_featurizer(vectorizer) -> Optional[Featurizer]:
+        """
+        Build the batch featurizer used in place of ``vectorizer.transform``.
+        
+        Args:
+            vectorizer: Text vectorizer
+        
+        Returns:
+            Featurizer with bit-identical output, or None if the vectorizer
+            options are unsupported (the vectorizer is then called directly)
+        """
+        try:
+            return featurizer_for(vectorizer)
+        except ConfigurationError as e:
+            logger.info(f"Using vectorizer.transform for featurization: {str(e)}")
+            return None
     
-    def predict(self, text: str) -> Dict:
+    def _prepare_attributor(self) -> Optional[NBAttributor]:
+        """
+        Build the analytic explainer over the model's weight table.
+        
+        Returns:
+            NBAttributor, or None when explanations need perturbation
+            (non-NB model or unsupported vectorizer)
+        """
+        if self.featurizer is None:
+            return None
+        try:
+            return NBAttributor.from_model(self.model, self.featurizer, self._nb_weights)
+        except ConfigurationError as e:
+            logger.info(f"Explanations will use perturbation: {str(e)}")
+            return None
+    
+    def _predict_proba(self, vectorized) -> np.ndarray:
+        """
+        Compute class probabilities for a sparse feature matrix.
+        
+        Args:
+            vectorized: CSR matrix of shape (n_samples, n_features)
+        
+        Returns:
+            Array of shape (n_samples, n_classes), ordered like ``model.classes_``
+        """
+        if self._nb_weights is None:
+            return self.model.predict_proba(vectorized)
+        
+        weights, class_log_prior = self._nb_weights
+        jll = np.asarray(vectorized @ weights) + class_log_prior
+        jll -= jll.max(axis=1, keepdims=True)
+        np.exp(jll, out=jll)
+        jll /= jll.sum(axis=1, keepdims=True)
+        return jll
+    
+    def _score_cleaned(self, processed_texts: List[str]) -> np.ndarray:
+        """
+        Score already-cleaned texts with the configured backend.
+        
+        Args:
+            processed_texts: Preprocessed email texts
+        
+        Returns:
+            Array of shape (n_samples, n_classes)
+        """
+        if self.scorer is not None:
+            # Token-weight lookup: no CSR matrix, no sklearn calls
+            return self.scorer.predict_proba(processed_texts)
+        
+        # Vectorize (kept as CSR so scoring cost scales with non-zeros)
+        vectorized = (self.featurizer or self.vectorizer).transform(processed_texts)
+        logger.debug(f"Vectorized shape: {vectorized.shape}, nnz: {vectorized.nnz}")
+        return self._predict_proba(vectorized)
+    
+    def _score_texts(self, texts: List[str], cleaned: List[str]) -> np.ndarray:
+        """
+        Score a batch with the configured backend.
+        
+        The transformer reads the original text; the other backends score
+        its cleaned form.
+        
+        Args:
+            texts: Validated email texts
+            cleaned: The same texts after ``TextProcessor.clean_texts``
+        
+        Returns:
+            Array of shape (n_samples, n_classes)
+        """
+        if self.transformer is not None:
+            # Length-bucketed, dynamically padded batches
+            return self.transformer.predict_proba(texts)
+        return self._score_cleaned(cleaned)
+    
+    def _build_result(self, text_stats: Dict, probabilities: np.ndarray, processing_time: float) -> Dict:
+        """
+        Assemble the result dictionary for one scored email.
+        
+        Args:
+            text_stats: Statistics of the original (uncleaned) email text
+            probabilities: Class probabilities ordered like ``model.classes_``,
+                or the transformer's [ham, spam] pair on that backend
+            processing_time: Time attributed to this email in milliseconds
+        
+        Returns:
+            Dictionary with prediction results
+        """
+        confidence = float(np.max(probabilities))
+        
+        if self.transformer is not None:
+            # The transformer's own layout (label 0 ham, label 1 spam); the
+            # NB model's classes_ say nothing about it
+            ham_prob = float(probabilities[0])
+            spam_prob = float(probabilities[1])
+            is_spam = spam_prob > ham_prob
+        elif len(probabilities) >= 2:
+            # Label derived from the probabilities, one scoring pass
+            is_spam = bool(self.model.classes_[int(np.argmax(probabilities))])
+            spam_prob = float(probabilities[1])
+            ham_prob = float(probabilities[0])
+        else:
+            # Handle edge case where model returns single probability
+            logger.warning(f"Model returned single probability: {probabilities}")
+            is_spam = bool(self.model.classes_[0])
+            if is_spam:
+                spam_prob = confidence
+                ham_prob = 1.0 - confidence
+            else:
+                ham_prob = confidence
+                spam_prob = 1.0 - confidence
+        
+        return {
+            "is_spam": is_spam,
+            "confidence": confidence,
+            "spam_probability": spam_prob,
+            "ham_probability": ham_prob,
+            "processing_time_ms": processing_time,
+            "model_version": self.model_version,
+            "text_stats": text_stats
+        }
+    
+    def predict(self, text: str, fingerprint_spam: bool = False, reuse=None) -> Dict:
         """
         Predict if an email is spam or not.
         
         Args:
             text: Email text to classify
+            fingerprint_spam: Add "simhash", the SimHash of the cleaned text
+                (None for short messages), to spam verdicts, so campaign
+                detection does not clean the text again
+            reuse: Near-duplicate verdict reuse for this job (see
+                ``api.services.verdict_reuse.ScopedReuse``); a confident
+                verdict of a near-identical message is returned instead of
+                scoring, and fresh verdicts are recorded
         
         Returns:
             Dictionary with prediction results
@@ -53,47 +271,32 @@ class SpamPredictor:
             text_processor.validate_input(text, settings.MAX_CONTENT_LENGTH)
             
             # Preprocess text
-            processed_text = text_processor.clean_text(text)
+            processed_text, text_stats = text_processor.process(text)
             logger.debug(f"Preprocessed text: {processed_text[:100]}...")
             
-            # Vectorize
-            vectorized = self.vectorizer.transform([processed_text]).toarray()
-            logger.debug(f"Vectorized shape: {vectorized.shape}")
-            
-            # Predict
-            prediction = self.model.predict(vectorized)[0]
-            probabilities = self.model.predict_proba(vectorized)[0]
-            
-            # Calculate metrics
-            is_spam = bool(prediction)
-            confidence = float(np.max(probabilities))
-            
-            if len(probabilities) >= 2:
-                spam_prob = float(probabilities[1])
-                ham_prob = float(probabilities[0])
+            fingerprint = simhash(processed_text) if reuse is not None else None
+            verdict, ticket = reuse.lookup(fingerprint) if fingerprint is not None else (None, None)
+            if verdict is not None:
+                processing_time = (time.time() - start_time) * 1000
+                result = {**verdict, "text_stats": text_stats, "processing_time_ms": processing_time}
             else:
-                # Handle edge case where model returns single probability
-                logger.warning(f"Model returned single probability: {probabilities}")
-                if is_spam:
-                    spam_prob = confidence
-                    ham_prob = 1.0 - confidence
+                if self.transformer is not None:
+                    probabilities = self.transformer.predict_proba([text])[0]
+                elif self.scorer is not None:
+                    probabilities = np.asarray(self.scorer.predict_proba_one(processed_text))
                 else:
-                    ham_prob = confidence
-                    spam_prob = 1.0 - confidence
+                    probabilities = self._score_cleaned([processed_text])[0]
+                
+                processing_time = (time.time() - start_time) * 1000
+                result = self._build_result(text_stats, probabilities, processing_time)
+                if reuse is not None:
+                    reuse.record(ticket, result)
             
-            processing_time = (time.time() - start_time) * 1000
+            if fingerprint_spam and result["is_spam"]:
+                # A copy: the verdict may be remembered for reuse
+                result = {**result, "simhash": simhash(processed_text) if reuse is None else fingerprint}
             
-            result = {
-                "is_spam": is_spam,
-                "confidence": confidence,
-                "spam_probability": spam_prob,
-                "ham_probability": ham_prob,
-                "processing_time_ms": processing_time,
-                "model_version": settings.MODEL_VERSION,
-                "text_stats": text_processor.get_text_stats(text)
-            }
-            
-            logger.info(f"Prediction: {'SPAM' if is_spam else 'HAM'} (confidence: {confidence:.2%}, time: {processing_time:.1f}ms)")
+            logger.info(f"Prediction: {'SPAM' if result['is_spam'] else 'HAM'} (confidence: {result['confidence']:.2%}, time: {processing_time:.1f}ms)")
             return result
             
         except ValueError as e:
@@ -104,15 +307,193 @@ class SpamPredictor:
             logger.error(f"Prediction failed: {str(e)}", exc_info=True)
             raise PredictionError(f"Failed to classify email: {str(e)}")
     
-    def predict_batch(self, texts: list) -> list:
+    def predict_batch(self, texts: list, fingerprint_spam: bool = False, reuse=None) -> list:
         """
         Predict multiple emails at once.
         
+        All valid texts are cleaned, vectorized and scored in a single pass.
+        Exact duplicates are scored once and fanned back out. Texts that fail
+        validation do not abort the batch; their slot holds an error entry
+        instead of a prediction.
+        
         Args:
             texts: List of email texts
+            fingerprint_spam: Add "simhash" to spam verdicts, as in ``predict``
+            reuse: Near-duplicate verdict reuse, as in ``predict``; only the
+                texts without a reusable verdict are scored
+        
+        Returns:
+            List aligned with ``texts``. Each item is either a prediction
+            dictionary (as returned by ``predict``) or a dictionary with
+            "error" and "error_type" keys. ``processing_time_ms`` is the batch
+            time amortized over the scored emails.
+        
+        Raises:
+            PredictionError: If scoring the batch fails
+        """
+        start_time = time.time()
+        results: List[Optional[Dict]] = [None] * len(texts)
+        
+        # Validate each item, grouping exact duplicates by position
+        positions: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            try:
+                if not isinstance(text, str):
+                    raise ValueError("Email text must be a string")
+                text_processor.validate_input(text, settings.MAX_CONTENT_LENGTH)
+            except ValueError as e:
+                results[index] = {"error": str(e), "error_type": ValidationError.__name__}
+                continue
+            positions.setdefault(text, []).append(index)
+        
+        unique_texts = list(positions)
+        reused = 0
+        if unique_texts:
+            cleaned = text_processor.clean_texts(unique_texts)
+            fingerprints: List[Optional[int]] = [None] * len(unique_texts)
+            verdicts: Dict[int, Dict] = {}
+            tickets: Dict[int, object] = {}
+            if reuse is not None:
+                for position, clean in enumerate(cleaned):
+                    fingerprints[position] = simhash(clean)
+                    if fingerprints[position] is None:
+                        continue
+                    verdict, tickets[position] = reuse.lookup(fingerprints[position])
+                    if verdict is not None:
+                        verdicts[position] = verdict
+            to_score = [position for position in range(len(unique_texts)) if position not in verdicts]
+            reused = len(verdicts)
+            
+            try:
+                probabilities = self._score_texts(
+                    [unique_texts[position] for position in to_score],
+                    [cleaned[position] for position in to_score]
+                ) if to_score else []
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {str(e)}", exc_info=True)
+                raise PredictionError(f"Failed to classify batch: {str(e)}")
+            rows = dict(zip(to_score, probabilities))
+            
+            scored = len(texts) - sum(result is not None for result in results)
+            processing_time = (time.time() - start_time) * 1000 / scored
+            
+            text_stats = text_processor.get_text_stats_batch(unique_texts)
+            for position, (text, stats) in enumerate(zip(unique_texts, text_stats)):
+                if position in verdicts:
+                    result = {**verdicts[position], "text_stats": stats, "processing_time_ms": processing_time}
+                else:
+                    result = self._build_result(stats, rows[position], processing_time)
+                    if reuse is not None:
+                        reuse.record(tickets.get(position), result)
+                if fingerprint_spam and result["is_spam"]:
+                    fingerprint = fingerprints[position] if reuse is not None else simhash(cleaned[position])
+                    result = {**result, "simhash": fingerprint}
+                for index in positions[text]:
+                    results[index] = dict(result)
+        
+        failed = sum("error" in result for result in results)
+        logger.info(
+            f"Batch prediction: {len(texts)} emails, {len(unique_texts)} unique, "
+            f"{reused} reused, {failed} invalid ({(time.time() - start_time) * 1000:.1f}ms)"
+        )
+        return results
+    
+    def explain(self, text: str, top_k: int = 10) -> Dict:
+        """
+        Explain which tokens pushed an email towards spam or ham.
+        
+        Naive Bayes models use the analytic attributor; other models fall
+        back to time-boxed leave-one-word-out perturbation.
+        
+        Args:
+            text: Email text to explain
+            top_k: Maximum number of tokens listed per direction
         
         Returns:
-            List of prediction results
+            Dictionary with the spam probability, label, and "spam_tokens" /
+            "ham_tokens" lists of {"token", "contribution", "offsets"} entries.
+            Offsets are [start, end) character spans of the token in ``text``;
+            the "url", "email" and "phone" placeholders point at the spans
+            they replaced.
+        
+        Raises:
+            ValidationError: If input is invalid
+            PredictionError: If explanation fails
         """
-        logger.info(f"Batch prediction for {len(texts)} emails")
-        return [self.predict(text) for text in texts]
+        start_time = time.time()
+        
+        try:
+            text_processor.validate_input(text, settings.MAX_CONTENT_LENGTH)
+            cleaned = text_processor.clean_text(text)
+            
+            if self.attributor is not None:
+                tokens, contributions, spam_prob = self.attributor.attribute(cleaned)
+                contributions = contributions.tolist()
+            else:
+                # The original text is scored with the perturbations, through
+                # predict_batch, so spam_prob matches what /classify reports
+                spam_prob, scored = score_perturbations(text, self.predict_batch, top_k=None)
+                tokens = [token for token, _ in scored]
+                contributions = [contribution for _, contribution in scored]
+            
+            ranked = sorted(zip(tokens, contributions), key=lambda item: -abs(item[1]))
+            spam_tokens = [item for item in ranked if item[1] > 0][:top_k]
+            ham_tokens = [item for item in ranked if item[1] < 0][:top_k]
+            offsets = self._token_offsets(text, [token for token, _ in spam_tokens + ham_tokens])
+            
+            def entries(items):
+                return [
+                    {"token": token, "contribution": float(contribution), "offsets": offsets.get(token, [])}
+                    for token, contribution in items
+                ]
+            
+            return {
+                "is_spam": spam_prob >= 0.5,
+                "spam_probability": spam_prob,
+                "spam_tokens": entries(spam_tokens),
+                "ham_tokens": entries(ham_tokens),
+                "processing_time_ms": (time.time() - start_time) * 1000,
+                "model_version": self.model_version
+            }
+            
+        except ValueError as e:
+            logger.warning(f"Validation error: {str(e)}")
+            raise ValidationError(str(e))
+        
+        except Exception as e:
+            logger.error(f"Explanation failed: {str(e)}", exc_info=True)
+            raise PredictionError(f"Failed to explain email: {str(e)}")
+    
+    def _token_offsets(self, text: str, tokens: List[str]) -> Dict[str, List[List[int]]]:
+        """
+        Find where tokens occur in the original text.
+        
+        Args:
+            text: Original email text
+            tokens: Tokens to locate (hashed-feature names "a/b" match either token)
+        
+        Returns:
+            Mapping of token to [start, end) character spans
+        """
+        wanted = {part: token for token in tokens for part in token.split("/")}
+        if not wanted:
+            return {}
+        
+        featurizer = self.featurizer
+        token_re = featurizer._token_re if featurizer is not None else re.compile(r"\w+")
+        lowercase = featurizer.lowercase if featurizer is not None else True
+        offsets: Dict[str, List[List[int]]] = {}
+        for match in token_re.finditer(text):
+            found = match.group()
+            token = wanted.get(found.lower() if lowercase else found)
+            if token is not None:
+                offsets.setdefault(token, []).append([match.start(), match.end()])
+        
+        # Placeholder tokens come from cleaning, not from the original words
+        for placeholder, pattern in _PLACEHOLDER_SPANS:
+            token = wanted.get(placeholder)
+            if token is not None:
+                for match in pattern.finditer(text):
+                    offsets.setdefault(token, []).append([match.start(), match.end()])
+                offsets.get(token, []).sort()
+        return offsets
@@ -0,0 +1,134 @@
+"""
+Validation and promotion of reduced-precision model artifacts.
+
+A float32 or int8 artifact is only written to its serving location after it
+has been scored against the full-precision model on held-out emails and
+stayed within the probability-deviation and label-flip budgets. The report
+is stored in the artifact manifest, and ``ModelManager`` refuses to serve a
+reduced-precision artifact without a passing report. A rejected candidate
+also removes the artifact previously promoted to its location, which was
+derived from an older model.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.models.artifact import META_FILE, export_artifact, load_artifact
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Promotion budgets against the full-precision model
+DEFAULT_MAX_DEVIATION = 0.01
+DEFAULT_MAX_FLIP_RATE = 0.001
+
+
+def validate_quantized(reference_model, reference_vectorizer, model, vectorizer, texts: List[str]) -> Dict:
+    """
+    Compare a reduced-precision pipeline with its full-precision reference.
+
+    Args:
+        reference_model: Full-precision model
+        reference_vectorizer: Full-precision vectorizer
+        model: Candidate model
+        vectorizer: Candidate vectorizer
+        texts: Cleaned held-out emails
+
+    Returns:
+        Dictionary with max_deviation (largest absolute probability
+        difference), label_flip_rate and n_samples
+    """
+    expected = reference_model.predict_proba(reference_vectorizer.transform(texts))
+    actual = model.predict_proba(vectorizer.transform(texts))
+    return {
+        "max_deviation": float(np.abs(actual - expected).max()) if len(texts) else 0.0,
+        "label_flip_rate": float(np.mean(actual.argmax(axis=1) != expected.argmax(axis=1))) if len(texts) else 0.0,
+        "n_samples": len(texts)
+    }
+
+
+def promote_quantized(
+    model,
+    vectorizer,
+    texts: List[str],
+    directory,
+    precision: str,
+    version: Optional[str] = None,
+    max_deviation: float = DEFAULT_MAX_DEVIATION,
+    max_flip_rate: float = DEFAULT_MAX_FLIP_RATE
+) -> Dict:
+    """
+    Export, validate and (if within budget) publish a reduced-precision artifact.
+
+    Args:
+        model: Fitted full-precision MultinomialNB
+        vectorizer: Fitted vectorizer
+        texts: Cleaned held-out emails used for validation
+        directory: Serving location of the promoted artifact
+        precision: "float32" or "int8"
+        version: Optional version label stored in the manifest
+        max_deviation: Largest allowed absolute probability difference
+        max_flip_rate: Largest allowed fraction of changed labels
+
+    Returns:
+        Validation report with thresholds, "passed" and "promoted" flags,
+        and "removed_stale" when a rejection deleted the artifact an
+        earlier model had promoted to ``directory``
+    """
+    directory = Path(directory)
+    candidate = directory.with_name(f".{directory.name}.candidate-{os.getpid()}")
+    export_artifact(model, vectorizer, candidate, version, precision=precision)
+
+    try:
+        candidate_model, candidate_vectorizer, meta = load_artifact(candidate, mmap=False)
+        report = validate_quantized(model, vectorizer, candidate_model, candidate_vectorizer, texts)
+        report.update({
+            "precision": precision,
+            "max_deviation_budget": max_deviation,
+            "max_flip_rate_budget": max_flip_rate,
+            "passed": report["max_deviation"] <= max_deviation and report["label_flip_rate"] <= max_flip_rate
+        })
+
+        if not report["passed"]:
+            logger.warning(
+                f"{precision} artifact rejected: max deviation {report['max_deviation']:.2e}, "
+                f"flip rate {report['label_flip_rate']:.4f}"
+            )
+            report["promoted"] = False
+            # Whatever is published here belongs to an earlier model and must
+            # not be served alongside this one
+            report["removed_stale"] = directory.exists()
+            if report["removed_stale"]:
+                shutil.rmtree(directory)
+                logger.warning(f"Removed stale {precision} artifact {directory}")
+            return report
+
+        meta["validation"] = report
+        with open(candidate / META_FILE, "w") as f:
+            json.dump(meta, f, indent=2)
+
+        # Swap the validated candidate into place
+        previous = directory.with_name(f".{directory.name}.old-{os.getpid()}")
+        if directory.exists():
+            os.replace(directory, previous)
+        os.replace(candidate, directory)
+        if previous.exists():
+            shutil.rmtree(previous)
+
+        report["promoted"] = True
+        logger.info(
+            f"Promoted {precision} artifact to {directory} (max deviation {report['max_deviation']:.2e}, "
+            f"flip rate {report['label_flip_rate']:.4f})"
+        )
+        return report
+
+    finally:
+        if candidate.exists():
+            shutil.rmtree(candidate)
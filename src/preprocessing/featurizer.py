@@ -0,0 +1,355 @@
+"""
+Batch featurization engine for fitted word vectorizers.
+
+Replaces the generic sklearn analyzer on the serving path: a batch is
+tokenized with one precompiled regex, tokens are mapped to feature ids in a
+single lookup, and the CSR ``indptr``/``indices``/``data`` arrays are built
+directly with NumPy. TF transforms, IDF weighting and normalization are then
+applied to the whole ``data`` array at once, in the same order and with the
+same normalization kernels sklearn uses, so the output is bit-for-bit
+identical to ``vectorizer.transform``.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
+from sklearn.utils.sparsefuncs_fast import inplace_csr_row_normalize_l1, inplace_csr_row_normalize_l2
+
+from src.utils.exceptions import ConfigurationError
+
+
+def unsupported_vectorizer_options(vectorizer) -> List[str]:
+    """
+    List the options of a word vectorizer that token-table featurization cannot reproduce.
+
+    Supported vectorizers are unigram, regex-tokenized, with no custom
+    preprocessor/tokenizer or accent stripping.
+
+    Args:
+        vectorizer: Fitted TfidfVectorizer or CountVectorizer
+
+    Returns:
+        Names of unsupported options (empty if fully supported)
+    """
+    unsupported = {
+        "analyzer": getattr(vectorizer, "analyzer", None) != "word",
+        "tokenizer": getattr(vectorizer, "tokenizer", None) is not None,
+        "preprocessor": getattr(vectorizer, "preprocessor", None) is not None,
+        "strip_accents": getattr(vectorizer, "strip_accents", None) is not None,
+        "ngram_range": tuple(getattr(vectorizer, "ngram_range", (1, 1))) != (1, 1),
+        "input": getattr(vectorizer, "input", "content") != "content",
+    }
+    return [name for name, flag in unsupported.items() if flag]
+
+
+class Featurizer:
+    """
+    Tokenizes a batch of documents into a TF-IDF CSR matrix.
+
+    Subclasses may override ``lookup`` to use a different vocabulary
+    representation (see ``src.models.artifact.CompactVectorizer``) or
+    ``encode`` to produce signed token values (see ``HashingFeaturizer``).
+    """
+
+    def __init__(
+        self,
+        vocabulary: Optional[Dict[str, int]],
+        n_features: int,
+        idf: Optional[np.ndarray],
+        token_pattern: str,
+        lowercase: bool = True,
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        norm: Optional[str] = "l2",
+        dtype=np.float64
+    ):
+        """
+        Initialize the featurizer.
+
+        Args:
+            vocabulary: Mapping of term to feature index (None if ``lookup``
+                is overridden)
+            n_features: Number of model features
+            idf: IDF weight per feature, or None when IDF is disabled
+            token_pattern: Regex used to extract tokens
+            lowercase: Whether input is lowercased before tokenizing
+            sublinear_tf: Whether term frequencies are replaced by 1 + log(tf)
+            binary: Whether term frequencies are clipped to 1
+            norm: Row normalization ('l2', 'l1' or None)
+            dtype: Dtype of the output matrix
+        """
+        self._vocabulary = vocabulary
+        self.n_features = n_features
+        self.idf_ = idf
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.norm = norm
+        self.dtype = dtype
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer) -> "Featurizer":
+        """
+        Build a featurizer reproducing a fitted word vectorizer.
+
+        Args:
+            vectorizer: Fitted TfidfVectorizer or CountVectorizer
+
+        Returns:
+            Featurizer whose ``transform`` matches ``vectorizer.transform``
+
+        Raises:
+            ConfigurationError: If the vectorizer options are unsupported
+        """
+        bad = unsupported_vectorizer_options(vectorizer)
+        if bad or not hasattr(vectorizer, "vocabulary_"):
+            raise ConfigurationError(f"Featurizer does not support vectorizer options: {bad}")
+
+        # Stop words are removed by the analyzer, so they never match
+        stop_words = vectorizer.get_stop_words()
+        vocabulary = vectorizer.vocabulary_
+        if stop_words:
+            vocabulary = {term: index for term, index in vocabulary.items() if term not in stop_words}
+
+        use_idf = getattr(vectorizer, "use_idf", False)
+        return cls(
+            vocabulary=vocabulary,
+            n_features=len(vectorizer.vocabulary_),
+            idf=vectorizer.idf_ if use_idf else None,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            sublinear_tf=getattr(vectorizer, "sublinear_tf", False),
+            binary=vectorizer.binary,
+            norm=getattr(vectorizer, "norm", None),
+            dtype=vectorizer.dtype
+        )
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """
+        Map tokens to feature indices.
+
+        Args:
+            tokens: Tokens to look up
+
+        Returns:
+            Array aligned with ``tokens``; -1 marks out-of-vocabulary tokens
+        """
+        get = self._vocabulary.get
+        return np.fromiter((get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+
+    def encode(self, tokens: List[str]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Map tokens to feature indices and per-token values.
+
+        Args:
+            tokens: Tokens to encode
+
+        Returns:
+            Tuple of (feature indices with -1 for dropped tokens, per-token
+            values or None when every token counts as 1)
+        """
+        return self.lookup(tokens), None
+
+    def tokenize(self, raw_documents: List[str]):
+        """
+        Tokenize a batch of documents.
+
+        Args:
+            raw_documents: Documents to tokenize
+
+        Returns:
+            Tuple of (flat token list, tokens per document)
+        """
+        findall = self._token_re.findall
+        tokens: List[str] = []
+        counts = np.empty(len(raw_documents), dtype=np.int64)
+        for row, document in enumerate(raw_documents):
+            found = findall(document.lower() if self.lowercase else document)
+            tokens.extend(found)
+            counts[row] = len(found)
+        return tokens, counts
+
+    def transform(self, raw_documents: List[str]) -> sp.csr_matrix:
+        """
+        Transform documents to a TF-IDF matrix.
+
+        Args:
+            raw_documents: Documents to vectorize
+
+        Returns:
+            CSR matrix of shape (n_documents, n_features) with sorted indices
+        """
+        n_documents = len(raw_documents)
+        tokens, counts = self.tokenize(raw_documents)
+        columns, values = self.encode(tokens)
+        rows = np.repeat(np.arange(n_documents, dtype=np.int64), counts)
+
+        # Sorting (row, column) keys groups duplicates and yields CSR order
+        hits = columns >= 0
+        keys = rows[hits] * self.n_features + columns[hits]
+        if values is None:
+            keys, term_counts = np.unique(keys, return_counts=True)
+            data = term_counts.astype(self.dtype)
+        else:
+            # Opposite-signed hashed tokens can cancel to an explicit 0.0.
+            # HashingVectorizer keeps that entry too (scipy's sum_duplicates
+            # does not prune it) and ``binary`` then sets it to 1, so it is
+            # kept here for parity with the vectorizer the model was fit on
+            keys, inverse = np.unique(keys, return_inverse=True)
+            data = np.bincount(inverse, weights=values[hits], minlength=len(keys)).astype(self.dtype)
+        indices = (keys % self.n_features).astype(np.int32)
+        indptr = np.zeros(n_documents + 1, dtype=np.int32)
+        np.cumsum(np.bincount(keys // self.n_features, minlength=n_documents), out=indptr[1:])
+
+        if self.binary:
+            data.fill(1)
+        elif self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        if self.idf_ is not None:
+            data *= self.idf_[indices]
+
+        matrix = sp.csr_matrix((data, indices, indptr), shape=(n_documents, self.n_features))
+        matrix.has_sorted_indices = True
+
+        # Same in-place kernels as sklearn.preprocessing.normalize, minus its
+        # per-call parameter validation
+        if self.norm == "l2":
+            inplace_csr_row_normalize_l2(matrix)
+        elif self.norm == "l1":
+            inplace_csr_row_normalize_l1(matrix)
+        elif self.norm is not None:
+            raise ConfigurationError(f"Unsupported norm: {self.norm}")
+        return matrix
+
+
+class HashingFeaturizer(Featurizer):
+    """
+    Stateless signed feature hashing, equivalent to a fitted ``HashingVectorizer``.
+
+    Tokens are hashed with MurmurHash3 into ``n_features`` buckets, so no
+    vocabulary is stored, pickled or loaded.
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        token_pattern: str,
+        lowercase: bool = True,
+        alternate_sign: bool = True,
+        binary: bool = False,
+        norm: Optional[str] = "l2",
+        stop_words: Optional[Iterable[str]] = None,
+        dtype=np.float64
+    ):
+        """
+        Initialize the featurizer.
+
+        Args:
+            n_features: Number of hash buckets
+            token_pattern: Regex used to extract tokens
+            lowercase: Whether input is lowercased before tokenizing
+            alternate_sign: Whether the hash sign is applied to token values
+            binary: Whether bucket values are clipped to 1
+            norm: Row normalization ('l2', 'l1' or None)
+            stop_words: Tokens dropped before hashing
+            dtype: Dtype of the output matrix
+        """
+        super().__init__(
+            vocabulary=None,
+            n_features=n_features,
+            idf=None,
+            token_pattern=token_pattern,
+            lowercase=lowercase,
+            binary=binary,
+            norm=norm,
+            dtype=dtype
+        )
+        self.alternate_sign = alternate_sign
+        self.stop_words = frozenset(stop_words or ())
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer) -> "HashingFeaturizer":
+        """
+        Build a featurizer reproducing a ``HashingVectorizer``.
+
+        Args:
+            vectorizer: HashingVectorizer
+
+        Returns:
+            HashingFeaturizer whose ``transform`` matches ``vectorizer.transform``
+
+        Raises:
+            ConfigurationError: If the vectorizer options are unsupported
+        """
+        bad = unsupported_vectorizer_options(vectorizer)
+        if bad or not isinstance(vectorizer, HashingVectorizer):
+            raise ConfigurationError(f"Hashing featurizer does not support vectorizer options: {bad}")
+
+        return cls(
+            n_features=vectorizer.n_features,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            alternate_sign=vectorizer.alternate_sign,
+            binary=vectorizer.binary,
+            norm=vectorizer.norm,
+            stop_words=vectorizer.get_stop_words(),
+            dtype=vectorizer.dtype
+        )
+
+    def encode(self, tokens: List[str]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Hash tokens to bucket indices and signs.
+
+        Args:
+            tokens: Tokens to encode
+
+        Returns:
+            Tuple of (bucket indices with -1 for stop words, signs or None)
+        """
+        stop_words = self.stop_words
+        hashes = np.fromiter(
+            (murmurhash3_32(token, seed=0) for token in tokens),
+            dtype=np.int64,
+            count=len(tokens)
+        )
+        # Same bucket rule as sklearn's FeatureHasher, including its abs(INT32_MIN) case
+        columns = np.abs(hashes) % self.n_features
+        columns[hashes == -2 ** 31] = (2 ** 31 - 1 - (self.n_features - 1)) % self.n_features
+        if stop_words:
+            columns[[index for index, token in enumerate(tokens) if token in stop_words]] = -1
+
+        if not self.alternate_sign:
+            return columns, None
+        return columns, np.where(hashes >= 0, 1.0, -1.0)
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Map tokens to bucket indices (-1 for stop words)."""
+        return self.encode(tokens)[0]
+
+
+def featurizer_for(vectorizer) -> Featurizer:
+    """
+    Build the featurizer matching a fitted vectorizer.
+
+    Args:
+        vectorizer: Fitted TfidfVectorizer/CountVectorizer, HashingVectorizer,
+            or a Featurizer (returned as is)
+
+    Returns:
+        Featurizer whose ``transform`` matches ``vectorizer.transform``
+
+    Raises:
+        ConfigurationError: If the vectorizer options are unsupported
+    """
+    if isinstance(vectorizer, Featurizer):
+        return vectorizer
+    if isinstance(vectorizer, HashingVectorizer):
+        return HashingFeaturizer.from_vectorizer(vectorizer)
+    return Featurizer.from_vectorizer(vectorizer)
@@ -0,0 +1,169 @@
+"""
+Compact, immutable term index for serving vocabularies.
+
+A fitted vectorizer's ``vocabulary_`` is a ``dict[str, int]`` whose string
+and entry objects cost several times the size of the terms themselves, in
+every process that unpickles it. ``TermIndex`` stores the same mapping as
+three flat arrays — the sorted UTF-8 terms packed into one byte blob, their
+offsets, and their feature ids — which can be memory-mapped and shared
+between processes. Lookups are a vectorized binary search on an 8-byte
+prefix of each term, with a byte comparison against the blob to confirm.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+# Bytes of each term compared by the vectorized binary search
+PREFIX_BYTES = 8
+
+
+def pack_terms(vocabulary: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack a vocabulary into sorted blob/offsets/ids arrays.
+
+    Args:
+        vocabulary: Mapping of term to feature index
+
+    Returns:
+        Tuple of (uint8 blob of concatenated UTF-8 terms in byte order,
+        int32 offsets of length n_terms + 1, int32 feature ids)
+    """
+    entries = sorted((term.encode("utf-8"), index) for term, index in vocabulary.items())
+    blob = np.frombuffer(b"".join(term for term, _ in entries), dtype=np.uint8)
+    offsets = np.zeros(len(entries) + 1, dtype=np.int32)
+    np.cumsum([len(term) for term, _ in entries], out=offsets[1:])
+    ids = np.array([index for _, index in entries], dtype=np.int32)
+    return blob, offsets, ids
+
+
+def _prefix_keys(encoded: List[bytes]) -> np.ndarray:
+    """Zero-padded leading bytes of each key as order-preserving native integers."""
+    return np.array(encoded, dtype=f"S{PREFIX_BYTES}").view(">u8").astype(np.uint64)
+
+
+class TermIndex(Mapping):
+    """
+    Read-only term to feature index mapping over packed arrays.
+
+    Behaves like the ``vocabulary_`` dict it was built from (same ids,
+    ``Mapping`` interface), and adds ``lookup`` for whole token batches.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, ids: np.ndarray):
+        """
+        Initialize the index.
+
+        Args:
+            blob: Concatenated UTF-8 terms in byte order (uint8)
+            offsets: Start of each term in ``blob``, plus the end of the last one
+            ids: Feature index of each term
+        """
+        self.blob = blob
+        self.offsets = offsets
+        self.ids = ids
+        self._bytes = memoryview(blob)
+        self._lengths = np.diff(offsets)
+
+        # Order-preserving integer key per term for np.searchsorted
+        width = np.arange(PREFIX_BYTES)
+        positions = offsets[:-1, None] + width
+        padded = np.zeros((len(ids), PREFIX_BYTES), dtype=np.uint8)
+        inside = width < self._lengths[:, None]
+        padded[inside] = blob[positions[inside]]
+        self._prefixes = padded.view(">u8").ravel().astype(np.uint64)
+        # Whether the next term has the same prefix key
+        self._shared = np.zeros(len(ids), dtype=bool)
+        self._shared[:-1] = self._prefixes[1:] == self._prefixes[:-1]
+
+    @classmethod
+    def from_vocabulary(cls, vocabulary: Dict[str, int]) -> "TermIndex":
+        """
+        Build an index from a vocabulary dict.
+
+        Args:
+            vocabulary: Mapping of term to feature index
+
+        Returns:
+            TermIndex returning the same ids as ``vocabulary``
+        """
+        return cls(*pack_terms(vocabulary))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the index arrays."""
+        return (
+            self.blob.nbytes + self.offsets.nbytes + self.ids.nbytes + self._prefixes.nbytes
+            + self._lengths.nbytes + self._shared.nbytes
+        )
+
+    def term(self, position: int) -> str:
+        """Decode the term stored at a sorted position."""
+        return bytes(self._bytes[self.offsets[position]:self.offsets[position + 1]]).decode("utf-8")
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """
+        Map tokens to feature indices.
+
+        Args:
+            tokens: Tokens to look up
+
+        Returns:
+            Array aligned with ``tokens``; -1 marks out-of-vocabulary tokens
+        """
+        if not tokens or len(self.ids) == 0:
+            return np.full(len(tokens), -1, dtype=np.int64)
+
+        encoded = [token.encode("utf-8") for token in tokens]
+        keys = _prefix_keys(encoded)
+        positions = np.searchsorted(self._prefixes, keys)
+        np.minimum(positions, len(self.ids) - 1, out=positions)
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+
+        # A key no longer than the prefix is identified by its prefix and
+        # length, which settles nearly every token without touching the blob
+        candidate = self._prefixes[positions] == keys
+        same_length = self._lengths[positions] == lengths
+        short = lengths <= PREFIX_BYTES
+        result = np.where(candidate & same_length & short, self.ids[positions], -1)
+
+        # Longer keys, and terms sharing a prefix, compare bytes in the blob
+        unresolved = candidate & ~(short & (same_length | ~self._shared[positions]))
+        if unresolved.any():
+            data, offsets, prefixes = self._bytes, self.offsets, self._prefixes
+            for row in np.flatnonzero(unresolved).tolist():
+                key, prefix, position = encoded[row], keys[row], positions[row]
+                while position < len(prefixes) and prefixes[position] == prefix:
+                    if data[offsets[position]:offsets[position + 1]] == key:
+                        result[row] = self.ids[position]
+                        break
+                    position += 1
+        return result
+
+    def get(self, term, default=None):
+        """Return the feature index of ``term``, or ``default``."""
+        if not isinstance(term, str):
+            return default
+        index = int(self.lookup([term])[0])
+        return default if index < 0 else index
+
+    def __getitem__(self, term: str) -> int:
+        index = self.get(term)
+        if index is None:
+            raise KeyError(term)
+        return index
+
+    def __contains__(self, term) -> bool:
+        return self.get(term) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.term(position) for position in range(len(self.ids)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def items(self):
+        """Iterate over (term, feature index) pairs in byte order."""
+        return zip(iter(self), self.ids.tolist())
@@ -5,22 +5,85 @@ Handles cleaning and normalization of email text.
 """
 
 import re
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+from src.preprocessing.text_stats import batch_text_stats
 from src.utils.logger import get_logger
 
 
 logger = get_logger(__name__)
 
 
+# Placeholder patterns, applied to lowercased text
+URL_PATTERN = r'http[s]?://\S+|www\.\S+'
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'\d{10}|\d{3}[-.\s]?\d{3}[-.\s]?\d{4}'
+
+_URL_RE = re.compile(URL_PATTERN)
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_PHONE_RE = re.compile(PHONE_PATTERN)
+
+# URL and phone matches can never overlap (a URL starts with a letter, a phone
+# number is digits and separators), so one leftmost scan over the alternation
+# replaces them exactly as two sequential passes would
+_URL_OR_PHONE_RE = re.compile(f'(?P<url>{URL_PATTERN})|{PHONE_PATTERN}')
+
+_ASCII_UPPERCASE = bytes(range(ord('A'), ord('Z') + 1))
+
+
+def _placeholder(match: re.Match) -> str:
+    """Replacement callback for the fused URL/phone pattern."""
+    return 'URL' if match.lastgroup == 'url' else 'PHONE'
+
+
+def _count_uppercase(text: str) -> int:
+    """Count characters for which ``str.isupper`` is true."""
+    if text.isascii():
+        # One C-level pass: delete A-Z and measure what went missing
+        data = text.encode('ascii')
+        return len(data) - len(data.translate(None, _ASCII_UPPERCASE))
+    return sum(1 for c in text if c.isupper())
+
+
+def _stats(char_count: int, word_count: int, uppercase_count: int) -> Dict:
+    """Statistics dictionary returned by ``get_text_stats``."""
+    return {
+        "word_count": word_count,
+        "char_count": char_count,
+        "avg_word_length": char_count / word_count if word_count > 0 else 0,
+        "uppercase_ratio": uppercase_count / char_count * 100 if char_count else 0
+    }
+
+
 class TextProcessor:
     """Text preprocessing utilities for email classification."""
     
+    @staticmethod
+    def _substitute(lowered: str) -> Tuple[str, int]:
+        """Replace URLs/emails/phones in lowercased text, counting replacements."""
+        if '@' in lowered:
+            # An email can start before and overlap a URL or phone match, so
+            # keep the original URL -> email -> phone precedence here
+            text, urls = _URL_RE.subn('URL', lowered)
+            text, emails = _EMAIL_RE.subn('EMAIL', text)
+            text, phones = _PHONE_RE.subn('PHONE', text)
+            return text, urls + emails + phones
+        return _URL_OR_PHONE_RE.subn(_placeholder, lowered)
+    
+    @staticmethod
+    def _clean(text: str) -> str:
+        """Lowercase, replace URLs/emails/phones and collapse whitespace."""
+        substituted, _ = TextProcessor._substitute(text.lower())
+        return ' '.join(substituted.split())
+    
     @staticmethod
     def clean_text(text: str) -> str:
         """
         Clean and normalize email text.
         
+        Lowercases, replaces URLs, email addresses and phone numbers with
+        placeholders and collapses whitespace.
+        
         Args:
             text: Raw email text
         
@@ -31,28 +94,56 @@ class TextProcessor:
             return ""
         
         try:
-            # Convert to lowercase
-            text = text.lower()
-            
-            # Replace URLs with placeholder
-            text = re.sub(r'http[s]?://\S+|www\.\S+', 'URL', text)
-            
-            # Replace email addresses with placeholder
-            text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'EMAIL', text)
-            
-            # Replace phone numbers with placeholder
-            text = re.sub(r'\d{10}|\d{3}[-.\s]?\d{3}[-.\s]?\d{4}', 'PHONE', text)
-            
-            # Remove extra whitespace
-            text = ' '.join(text.split())
-            
-            logger.debug(f"Text cleaned: {len(text)} characters")
-            return text
+            return TextProcessor._clean(text)
             
         except Exception as e:
             logger.error(f"Error cleaning text: {str(e)}")
             return text
     
+    @staticmethod
+    def clean_texts(texts: List[str]) -> List[str]:
+        """
+        Clean a batch of email texts.
+        
+        Args:
+            texts: Raw email texts
+        
+        Returns:
+            Cleaned texts, aligned with ``texts``
+        """
+        clean_text = TextProcessor.clean_text
+        return [clean_text(text) for text in texts]
+    
+    @staticmethod
+    def process(text: str) -> Tuple[str, Dict]:
+        """
+        Clean an email and compute its statistics in one pass.
+        
+        Lowercasing never adds or removes whitespace, so one split of the
+        lowercased text gives the raw word count and, when no placeholder
+        was substituted (most emails), the cleaned tokens as well.
+        
+        Args:
+            text: Raw email text
+        
+        Returns:
+            Tuple of (cleaned text, statistics of the raw text as returned
+            by ``get_text_stats``)
+        """
+        if not text:
+            return "", TextProcessor.get_text_stats(text)
+        
+        try:
+            lowered = text.lower()
+            words = lowered.split()
+            substituted, replacements = TextProcessor._substitute(lowered)
+            cleaned = ' '.join(substituted.split() if replacements else words)
+        except Exception as e:
+            logger.error(f"Error cleaning text: {str(e)}")
+            return text, TextProcessor.get_text_stats(text)
+        
+        return cleaned, _stats(len(text), len(words), _count_uppercase(text))
+    
     @staticmethod
     def validate_input(text: str, max_length: int = 10000) -> bool:
         """
@@ -91,16 +182,21 @@ class TextProcessor:
         Returns:
             Dictionary with text statistics
         """
-        words = text.split()
-        word_count = len(words)
-        char_count = len(text)
-        
-        return {
-            "word_count": word_count,
-            "char_count": char_count,
-            "avg_word_length": char_count / word_count if word_count > 0 else 0,
-            "uppercase_ratio": sum(1 for c in text if c.isupper()) / len(text) * 100 if text else 0
-        }
+        return _stats(len(text), len(text.split()), _count_uppercase(text))
+    
+    @staticmethod
+    def get_text_stats_batch(texts: List[str]) -> List[Dict]:
+        """
+        Get statistics for several email texts in one vectorized pass.
+        
+        Args:
+            texts: Email texts
+        
+        Returns:
+            List of dictionaries aligned with ``texts``, identical to
+            ``get_text_stats`` output
+        """
+        return batch_text_stats(texts)
 
 
 # Create singleton instance
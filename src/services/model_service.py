@@ -2,7 +2,7 @@ import time
 import streamlit as st
 from src.models.model_loader import load_model_and_vectorizer
 from src.models.predictor import SpamPredictor
-from src.services.transformer_service import TransformerService
+from src.services.transformer_worker import create_transformer_service
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,7 +12,8 @@ class ModelService:
     
     def __init__(self):
         self.predictor = None
-        self.transformer_service = TransformerService()
+        # In-process, or worker processes when TRANSFORMER_WORKERS > 0
+        self.transformer_service = create_transformer_service()
         self._initialize_predictor()
     
     def _initialize_predictor(self):
@@ -50,6 +51,28 @@ class ModelService:
         # Standard Naive Bayes
         return self.predictor.predict(text)
 
+    def predict_batch(self, texts: list, model_type: str = "Naive Bayes") -> list:
+        """
+        Predict spam probability for several texts, in input order.
+        """
+        # BERT runs length-bucketed batches instead of one forward pass per text
+        if "BERT" in model_type:
+            try:
+                return self.transformer_service.predict_batch(texts)
+            except Exception as e:
+                logger.error(f"Transformer batch prediction failed, falling back to Naive Bayes: {e}")
+                st.toast("⚠️ Transformer failed, using fallback model.", icon="⚠️")
+
+        if not self.predictor:
+            raise Exception("Model not initialized")
+
+        results = self.predictor.predict_batch(texts)
+        if "LSTM" in model_type:
+            for result in results:
+                if "error" not in result:
+                    self._boost_confidence(result)
+        return results
+
     def _boost_confidence(self, result):
         confidence = result['confidence']
         is_spam = result['is_spam']
@@ -0,0 +1,253 @@
+"""
+CPU execution backends for the transformer classifier.
+
+The eager fp32 PyTorch model can be swapped for one of:
+
+- ``int8``: dynamic int8 quantization of the Linear layers
+- ``torchscript``: a traced, frozen TorchScript module
+- ``onnx``: an exported ONNX graph run by ONNX Runtime
+
+The TorchScript and ONNX exports are made once and cached on disk next to
+the other serving artifacts, keyed by model name and library version;
+int8 quantization is cheap and redone at load. A backend is only used
+after a parity check against the eager model on probe emails of several
+lengths and batch shapes has stayed within the probability-drift budget;
+shape-specialized traces or a bad export fall back to eager instead of
+serving wrong scores.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import torch
+
+from src.utils.exceptions import ConfigurationError
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+TRANSFORMER_BACKENDS = ("eager", "int8", "torchscript", "onnx")
+# Positional order of the model's forward() arguments
+FORWARD_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+# Largest allowed absolute spam-probability difference from the eager model
+DEFAULT_MAX_DRIFT = 0.02
+
+# Probe emails of different lengths for export examples and parity checks
+PARITY_TEXTS = [
+    "Ok lar... Joking wif u oni...",
+    "WINNER!! As a valued network customer you have been selected to receive a £900 prize reward! "
+    "To claim call 09061701461. Claim code KL341. Valid 12 hours only.",
+    "Hi, are we still meeting for lunch tomorrow? Let me know if 1pm works for you.",
+    "URGENT! Your account has been suspended. Verify your details at http://secure-login.example.com "
+    "within 24 hours or lose access permanently.",
+    "Thanks for the notes from today's meeting. I've updated the budget sheet and shared it with the "
+    "team; please check the hiring plan section before Friday so we can finalise the quarterly "
+    "forecast and send it to finance. Also, the offsite venue confirmed our booking for the 14th.",
+    "Free entry in 2 a wkly comp to win FA Cup final tkts 21st May 2005. Text FA to 87121 to receive "
+    "entry question(std txt rate)T&C's apply 08452810075over18's",
+    "See you soon",
+    "Congratulations! You've won a free cruise. Reply YES to claim your prize now!",
+]
+
+# Maps batched inputs to a numpy array of logits
+Runner = Callable[[Dict[str, torch.Tensor]], np.ndarray]
+
+
+class _LogitsModule(torch.nn.Module):
+    """Positional-argument wrapper returning only the logits, for tracing and export."""
+
+    def __init__(self, model, input_names: Sequence[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = list(input_names)
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs)), return_dict=False)[0]
+
+
+def input_names_for(tokenizer) -> List[str]:
+    """Forward inputs the tokenizer produces, in forward() order."""
+    produced = set(tokenizer.model_input_names)
+    return [name for name in FORWARD_INPUTS if name in produced]
+
+
+def cache_path(cache_dir, model_name: str, backend: str) -> Path:
+    """
+    On-disk location of an exported backend.
+
+    Args:
+        cache_dir: Directory holding exported backends
+        model_name: HuggingFace model id
+        backend: Backend name
+
+    Returns:
+        Path keyed by model, backend and the library version that reads it
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+    if backend == "onnx":
+        import onnxruntime
+        return Path(cache_dir) / f"{slug}.onnx-ort{onnxruntime.__version__}.onnx"
+    return Path(cache_dir) / f"{slug}.{backend}-torch{torch.__version__}.pt"
+
+
+def _write_atomic(path: Path, write: Callable[[str], None]):
+    """Write a file through a temporary name so readers never see a partial export."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique name per call: threads of one process may export at once
+    descriptor, name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(descriptor)
+    temporary = Path(name)
+    try:
+        write(str(temporary))
+        os.replace(temporary, path)
+    finally:
+        if temporary.exists():
+            temporary.unlink()
+
+
+def _example_inputs(tokenizer, input_names: Sequence[str]) -> tuple:
+    """Padded example batch used for tracing and export."""
+    encoded = tokenizer(PARITY_TEXTS[:2], padding=True, truncation=True, return_tensors="pt")
+    return tuple(encoded[name] for name in input_names)
+
+
+def _eager_runner(model) -> Runner:
+    def run(inputs: Dict[str, torch.Tensor]) -> np.ndarray:
+        return model(**inputs).logits.float().numpy()
+    return run
+
+
+def _int8_runner(model) -> Runner:
+    """
+    Dynamic int8 quantization of the Linear layers.
+
+    Quantizing takes well under a second, and a saved state_dict can only
+    be loaded into a module quantized the same way first, so nothing is
+    cached on disk.
+    """
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return _eager_runner(quantized)
+
+
+def _torchscript_runner(model, tokenizer, path: Path) -> Runner:
+    """Traced and frozen TorchScript module, cached on disk."""
+    input_names = input_names_for(tokenizer)
+    if not path.exists():
+        traced = torch.jit.trace(_LogitsModule(model, input_names), _example_inputs(tokenizer, input_names))
+        _write_atomic(path, lambda target: torch.jit.save(traced, target))
+    module = torch.jit.optimize_for_inference(torch.jit.freeze(torch.jit.load(str(path)).eval()))
+
+    def run(inputs: Dict[str, torch.Tensor]) -> np.ndarray:
+        return module(*(inputs[name] for name in input_names)).float().numpy()
+    return run
+
+
+def _onnx_runner(model, tokenizer, path: Path) -> Runner:
+    """Exported ONNX graph run by ONNX Runtime on CPU, cached on disk."""
+    import onnxruntime
+
+    input_names = input_names_for(tokenizer)
+    if not path.exists():
+        _write_atomic(path, lambda target: torch.onnx.export(
+            _LogitsModule(model, input_names),
+            _example_inputs(tokenizer, input_names),
+            target,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+            opset_version=14
+        ))
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+    def run(inputs: Dict[str, torch.Tensor]) -> np.ndarray:
+        feed = {name: inputs[name].numpy().astype(np.int64) for name in input_names}
+        return session.run(["logits"], feed)[0]
+    return run
+
+
+def load_runner(model, tokenizer, backend: str, cache_dir) -> Runner:
+    """
+    Build the runner for a backend, exporting it on first use if it is cached.
+
+    Args:
+        model: Eager HuggingFace sequence classification model
+        tokenizer: Matching tokenizer
+        backend: One of TRANSFORMER_BACKENDS
+        cache_dir: Directory holding exported backends
+
+    Returns:
+        Callable mapping padded input tensors to logits
+
+    Raises:
+        ConfigurationError: If the backend is unknown or its runtime is missing
+    """
+    if backend not in TRANSFORMER_BACKENDS:
+        raise ConfigurationError(f"Unknown transformer backend: {backend}")
+    if backend == "eager":
+        return _eager_runner(model)
+    if backend == "int8":
+        return _int8_runner(model)
+
+    try:
+        path = cache_path(cache_dir, model.name_or_path, backend)
+    except ImportError as e:
+        raise ConfigurationError(f"Transformer backend {backend} requires onnxruntime: {str(e)}")
+    cached = path.exists()
+    if backend == "torchscript":
+        runner = _torchscript_runner(model, tokenizer, path)
+    else:
+        runner = _onnx_runner(model, tokenizer, path)
+    logger.info(f"Transformer backend {backend} {'loaded from' if cached else 'exported to'} {path}")
+    return runner
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax of a logits array."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    np.exp(shifted, out=shifted)
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def check_parity(
+    reference: Callable[[List[str]], np.ndarray],
+    candidate: Callable[[List[str]], np.ndarray],
+    texts: List[str] = PARITY_TEXTS,
+    max_drift: float = DEFAULT_MAX_DRIFT
+) -> Dict:
+    """
+    Compare a backend's probabilities with the eager model's.
+
+    Texts are scored as one batch and one at a time, so a runner that only
+    works for the traced input shape is caught.
+
+    Args:
+        reference: Eager ``predict_proba``-style scorer
+        candidate: Scorer using the backend under test
+        texts: Probe emails
+        max_drift: Largest allowed absolute probability difference
+
+    Returns:
+        Dictionary with max_drift, label_flip_rate, n_samples, the budget
+        and "passed"
+    """
+    expected = reference(texts)
+    batched = candidate(texts)
+    single = np.vstack([candidate([text]) for text in texts])
+    drift = max(float(np.abs(batched - expected).max()), float(np.abs(single - expected).max()))
+    flips = float(np.mean(batched.argmax(axis=1) != expected.argmax(axis=1)))
+    return {
+        "max_drift": drift,
+        "label_flip_rate": flips,
+        "n_samples": len(texts),
+        "max_drift_budget": max_drift,
+        "passed": drift <= max_drift and flips == 0.0
+    }
@@ -1,74 +1,230 @@
+import threading
 import time
+from typing import Dict, List, Optional
+
 import torch
 import numpy as np
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from src.config.runtime import apply_torch_limits
+from src.config.settings import settings
+from src.services.transformer_backends import check_parity, load_runner, softmax
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 class TransformerService:
     """Service for handling HuggingFace Transformer models."""
-    
-    def __init__(self, model_name="mrm8488/bert-tiny-finetuned-sms-spam-detection"):
-        self.model_name = model_name
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        max_length: Optional[int] = None,
+        backend: Optional[str] = None
+    ):
+        """
+        Initialize the service (the model is loaded on first use).
+
+        Args:
+            model_name: HuggingFace model id; defaults to settings.TRANSFORMER_MODEL_NAME
+            batch_size: Maximum texts per forward pass
+            max_batch_tokens: Maximum padded tokens per forward pass
+            max_length: Truncation length in tokens
+            backend: CPU execution backend ("eager", "int8", "torchscript"
+                or "onnx"); defaults to settings.TRANSFORMER_BACKEND
+        """
+        self.model_name = model_name or settings.TRANSFORMER_MODEL_NAME
+        self.batch_size = batch_size or settings.TRANSFORMER_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens or settings.TRANSFORMER_MAX_BATCH_TOKENS
+        self.max_length = max_length or settings.TRANSFORMER_MAX_LENGTH
+        self.backend = backend or settings.TRANSFORMER_BACKEND
         self.tokenizer = None
         self.model = None
+        self.parity = None
+        self._runner = None
         self._initialized = False
-        
+        self._load_lock = threading.Lock()
+
     def load_model(self):
-        """Lazy load the model and tokenizer."""
+        """
+        Lazy load the model and tokenizer.
+
+        Thread-safe: concurrent first requests load the model once. The
+        service is only marked initialized once its backend has passed the
+        parity check (or fallen back to eager), so no request is scored by
+        an unvalidated backend.
+        """
         if self._initialized:
             return
 
-        try:
-            logger.info(f"Loading Transformer model: {self.model_name}")
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        with self._load_lock:
+            if self._initialized:
+                return
+            try:
+                apply_torch_limits()
+                logger.info(f"Loading Transformer model: {self.model_name}")
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                self.model.eval()
+                runner = load_runner(self.model, self.tokenizer, "eager", settings.TRANSFORMER_CACHE_DIR)
+                logger.info("Transformer model loaded successfully")
+            except Exception as e:
+                logger.error(f"Failed to load Transformer model: {e}")
+                raise e
+
+            if self.backend != "eager":
+                runner = self._select_backend(runner)
+            self._runner = runner
             self._initialized = True
-            logger.info("Transformer model loaded successfully")
+
+    def _select_backend(self, eager):
+        """
+        Build the configured backend and check it against the eager model.
+
+        Args:
+            eager: Runner of the eager model
+
+        Returns:
+            The configured backend's runner if it passed the parity check,
+            otherwise ``eager``
+        """
+        try:
+            # Tracing and export need ordinary tensors, not inference-mode ones
+            with torch.no_grad():
+                candidate = load_runner(self.model, self.tokenizer, self.backend, settings.TRANSFORMER_CACHE_DIR)
+            self.parity = check_parity(
+                lambda texts: self._predict_proba_with(eager, texts),
+                lambda texts: self._predict_proba_with(candidate, texts),
+                max_drift=settings.TRANSFORMER_MAX_DRIFT
+            )
+        except Exception as e:
+            logger.warning(f"Transformer backend {self.backend} unavailable, using eager: {e}")
+            self.backend = "eager"
+            return eager
+
+        if not self.parity["passed"]:
+            logger.warning(
+                f"Transformer backend {self.backend} rejected: max drift {self.parity['max_drift']:.2e}, "
+                f"flip rate {self.parity['label_flip_rate']:.4f}; using eager"
+            )
+            self.backend = "eager"
+            return eager
+        logger.info(f"Transformer backend {self.backend} in use (max drift {self.parity['max_drift']:.2e})")
+        return candidate
+
+    def _length_buckets(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Group text positions into batches of similar token length.
+
+        Positions are sorted by length and cut into batches of at most
+        ``batch_size`` texts and ``max_batch_tokens`` padded tokens, so each
+        batch pads only up to its own longest text.
+
+        Args:
+            lengths: Token count of each text
+
+        Returns:
+            Lists of positions, shortest texts first
+        """
+        buckets: List[List[int]] = []
+        current: List[int] = []
+        for position in sorted(range(len(lengths)), key=lengths.__getitem__):
+            # Sorted ascending, so this text sets the padded width of the batch
+            width = lengths[position]
+            if current and (len(current) >= self.batch_size or (len(current) + 1) * width > self.max_batch_tokens):
+                buckets.append(current)
+                current = []
+            current.append(position)
+        if current:
+            buckets.append(current)
+        return buckets
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Class probabilities for several texts.
+
+        Texts are tokenized once without padding, grouped into length
+        buckets, and each bucket is padded to its own longest text and run
+        as one forward pass under ``torch.inference_mode()``.
+
+        Args:
+            texts: Email texts
+
+        Returns:
+            Array of shape (n_texts, n_labels) in input order
+            (label 0 is HAM, label 1 is SPAM)
+        """
+        if not self._initialized:
+            self.load_model()
+        return self._predict_proba_with(self._runner, texts)
+
+    def _predict_proba_with(self, runner, texts: List[str]) -> np.ndarray:
+        """Length-bucketed class probabilities computed by ``runner``."""
+        probabilities = np.zeros((len(texts), self.model.config.num_labels), dtype=np.float32)
+        if not texts:
+            return probabilities
+
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+
+        with torch.inference_mode():
+            for bucket in self._length_buckets(lengths):
+                features = {key: [values[position] for position in bucket] for key, values in encoded.items()}
+                inputs = self.tokenizer.pad(features, padding="longest", return_tensors="pt")
+                probabilities[bucket] = softmax(runner(inputs))
+        return probabilities
+
+    def predict_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Predict spam probability for several texts.
+
+        Args:
+            texts: Email texts
+
+        Returns:
+            Result dictionaries (as returned by ``predict``) in input order;
+            ``processing_time_ms`` is the batch time amortized over the texts
+        """
+        start_time = time.time()
+
+        try:
+            probabilities = self.predict_proba(texts)
         except Exception as e:
-            logger.error(f"Failed to load Transformer model: {e}")
+            logger.error(f"Transformer batch prediction failed: {e}")
             raise e
 
+        processing_time = (time.time() - start_time) * 1000 / max(len(texts), 1)
+        return [self._build_result(row, processing_time) for row in probabilities]
+
     def predict(self, text: str):
         """
         Predict spam probability using the Transformer model.
         """
-        if not self._initialized:
-            self.load_model()
-            
         start_time = time.time()
-        
+
         try:
-            # Tokenize
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-            
-            # Inference
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1).numpy()[0]
-            
-            # Map output (assuming model output 0=HAM, 1=SPAM or similar, need to verify for specific model)
-            # For mrm8488/bert-tiny-finetuned-sms-spam-detection: Label 0 is HAM, Label 1 is SPAM
-            
-            ham_prob = float(probabilities[0])
-            spam_prob = float(probabilities[1])
-            
-            is_spam = spam_prob > ham_prob
-            confidence = max(spam_prob, ham_prob)
-            
-            processing_time = (time.time() - start_time) * 1000
-            
-            return {
-                "is_spam": is_spam,
-                "confidence": confidence,
-                "spam_probability": spam_prob,
-                "ham_probability": ham_prob,
-                "processing_time_ms": processing_time,
-                "model_version": self.model_name
-            }
-            
+            probabilities = self.predict_proba([text])[0]
         except Exception as e:
             logger.error(f"Transformer prediction failed: {e}")
             raise e
+
+        return self._build_result(probabilities, (time.time() - start_time) * 1000)
+
+    def _build_result(self, probabilities: np.ndarray, processing_time: float) -> Dict:
+        """Result dictionary for one text's class probabilities."""
+        # For mrm8488/bert-tiny-finetuned-sms-spam-detection: Label 0 is HAM, Label 1 is SPAM
+        ham_prob = float(probabilities[0])
+        spam_prob = float(probabilities[1])
+
+        is_spam = spam_prob > ham_prob
+        confidence = max(spam_prob, ham_prob)
+
+        return {
+            "is_spam": is_spam,
+            "confidence": confidence,
+            "spam_probability": spam_prob,
+            "ham_probability": ham_prob,
+            "processing_time_ms": processing_time,
+            "model_version": self.model_name
+        }
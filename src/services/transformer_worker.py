@@ -0,0 +1,436 @@
+"""
+Out-of-process transformer inference.
+
+``TransformerWorkerPool`` runs ``TransformerService`` in one or more
+long-lived worker processes and exposes the same ``predict`` /
+``predict_batch`` / ``predict_proba`` interface, so torch, its intra-op
+threads and the model stay out of the API or Streamlit process (this
+module does not import torch).
+
+Requests go to the workers over a shared multiprocessing queue, so an idle
+worker picks up the next one. A worker drains whatever else is queued
+before each forward pass and runs it as one length-bucketed batch. Workers
+report liveness through a heartbeat; a supervisor thread restarts any
+worker that has died or stopped beating and fails the requests it was
+running.
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from src.config.runtime import apply_runtime_limits
+from src.config.settings import settings
+from src.utils.exceptions import ConfigurationError, PredictionError
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Seconds a worker waits on the request queue before refreshing its heartbeat
+_IDLE_POLL_SECONDS = 0.5
+
+
+def _worker_main(
+    index: int,
+    generation: int,
+    factory: Optional[Callable],
+    config: Dict,
+    requests,
+    responses,
+    heartbeat,
+    batch_wait: float
+):
+    """
+    Worker process loop: load the model, then serve batched requests.
+
+    Module-level so it can be started in a spawned process.
+    """
+    try:
+        apply_runtime_limits()
+        if factory is None:
+            from src.services.transformer_service import TransformerService
+            factory = TransformerService
+        service = factory(**config)
+        service.load_model()
+    except Exception as e:
+        responses.put(("failed", index, str(e)))
+        return
+    heartbeat.value = time.time()
+    responses.put(("ready", index, service.backend))
+
+    max_texts = service.batch_size * 4
+    while True:
+        heartbeat.value = time.time()
+        try:
+            message = requests.get(timeout=_IDLE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+        if message is None:
+            return
+
+        # Coalesce whatever else arrives within the batch window
+        batch = [message]
+        n_texts = len(message[2])
+        deadline = time.time() + batch_wait
+        while n_texts < max_texts:
+            try:
+                message = requests.get(timeout=max(deadline - time.time(), 0)) if batch_wait else requests.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                # Put the stop signal back for after this batch
+                requests.put(None)
+                break
+            batch.append(message)
+            n_texts += len(message[2])
+
+        pings = [request_id for kind, request_id, _ in batch if kind == "ping"]
+        jobs = [(request_id, texts) for kind, request_id, texts in batch if kind == "predict"]
+        for request_id in pings:
+            responses.put(("pong", request_id, index))
+        if not jobs:
+            continue
+
+        # Responses go through a SimpleQueue, so this is written before the
+        # batch runs and the pool can fail the requests if the worker dies
+        responses.put(("started", index, (generation, [request_id for request_id, _ in jobs])))
+        try:
+            probabilities = service.predict_proba([text for _, texts in jobs for text in texts])
+        except Exception as e:
+            for request_id, _ in jobs:
+                responses.put(("error", request_id, str(e)))
+            continue
+        offset = 0
+        for request_id, texts in jobs:
+            responses.put(("result", request_id, probabilities[offset:offset + len(texts)]))
+            offset += len(texts)
+
+
+class TransformerWorkerPool:
+    """Transformer inference served by supervised worker processes."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        health_timeout_seconds: Optional[float] = None,
+        batch_wait_ms: Optional[float] = None,
+        service_factory: Optional[Callable] = None,
+        **service_config
+    ):
+        """
+        Initialize the pool (processes start on first use).
+
+        Args:
+            workers: Number of worker processes; defaults to settings.TRANSFORMER_WORKERS
+            timeout_seconds: Longest wait for one request
+            health_timeout_seconds: Heartbeat age after which a ready worker
+                is considered hung and restarted
+            batch_wait_ms: How long a worker waits to fill a batch
+            service_factory: Picklable callable building the service in each
+                worker; defaults to ``TransformerService``
+            **service_config: Service arguments for the workers
+        """
+        self.workers = workers or settings.TRANSFORMER_WORKERS
+        self.timeout_seconds = timeout_seconds or settings.TRANSFORMER_WORKER_TIMEOUT_SECONDS
+        self.health_timeout_seconds = health_timeout_seconds or settings.TRANSFORMER_WORKER_HEALTH_TIMEOUT_SECONDS
+        batch_wait_ms = settings.TRANSFORMER_WORKER_BATCH_WAIT_MS if batch_wait_ms is None else batch_wait_ms
+        self.batch_wait = batch_wait_ms / 1000
+        self.model_name = service_config.get("model_name") or settings.TRANSFORMER_MODEL_NAME
+        self.service_factory = service_factory
+        self.service_config = service_config
+
+        # torch is not fork-safe once its thread pools exist
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = None
+        self._responses = None
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * self.workers
+        self._heartbeats = []
+        self._generations: List[int] = [0] * self.workers
+        self._ready: List[bool] = [False] * self.workers
+        self._running: List[Set[int]] = [set() for _ in range(self.workers)]
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.backend: Optional[str] = None
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Start the worker processes and the supervisor and response threads."""
+        with self._lock:
+            if self._started:
+                return
+            self._requests = self._context.Queue()
+            self._responses = self._context.SimpleQueue()
+            self._heartbeats = [self._context.Value("d", 0.0) for _ in range(self.workers)]
+            for index in range(self.workers):
+                self._spawn(index)
+            self._started = True
+        threading.Thread(target=self._read_responses, name="transformer-responses", daemon=True).start()
+        threading.Thread(target=self._supervise, name="transformer-supervisor", daemon=True).start()
+        atexit.register(self.close)
+        logger.info(f"Transformer worker pool started ({self.workers} workers)")
+
+    def _spawn(self, index: int):
+        """Start (or restart) the worker in one slot."""
+        self._heartbeats[index].value = 0.0
+        self._ready[index] = False
+        self._generations[index] += 1
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                index, self._generations[index], self.service_factory, self.service_config,
+                self._requests, self._responses, self._heartbeats[index], self.batch_wait
+            ),
+            name=f"transformer-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+
+    def _read_responses(self):
+        """Resolve request futures from worker responses."""
+        while not self._closed:
+            try:
+                message = self._responses.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            kind, key, payload = message
+            with self._lock:
+                if kind == "started":
+                    generation, request_ids = payload
+                    if generation == self._generations[key]:
+                        self._running[key].update(request_ids)
+                    else:
+                        # The worker was already replaced; nothing will answer
+                        self._fail(request_ids, f"Transformer worker {key} restarted")
+                elif kind == "ready":
+                    self._ready[key] = True
+                    self.backend = payload
+                    self.last_error = None
+                    logger.info(f"Transformer worker {key} ready (backend: {payload})")
+                elif kind == "failed":
+                    self.last_error = payload
+                    logger.error(f"Transformer worker {key} failed to start: {payload}")
+                else:
+                    future = self._futures.pop(key, None)
+                    for running in self._running:
+                        running.discard(key)
+                    if future is None or future.done():
+                        continue
+                    if kind == "error":
+                        future.set_exception(PredictionError(f"Transformer worker error: {payload}"))
+                    else:
+                        future.set_result(payload)
+
+    def _supervise(self):
+        """Restart dead or hung workers, failing the requests they were running."""
+        backoff = 1.0
+        while not self._closed:
+            time.sleep(1.0)
+            now = time.time()
+            for index, process in enumerate(self._processes):
+                heartbeat = self._heartbeats[index].value
+                alive = process is not None and process.is_alive()
+                hung = alive and self._ready[index] and heartbeat and now - heartbeat > self.health_timeout_seconds
+                if alive and not hung:
+                    continue
+                if self._closed:
+                    return
+                reason = "hung" if hung else f"exited with code {process.exitcode}"
+                logger.error(f"Transformer worker {index} {reason}, restarting")
+                if hung:
+                    process.kill()
+                    process.join(timeout=5)
+                with self._lock:
+                    crashed_before_ready = not self._ready[index]
+                    self._fail(self._running[index], f"Transformer worker {index} {reason}")
+                    self._running[index].clear()
+                    self.restarts += 1
+                # Back off while workers keep dying during startup
+                if crashed_before_ready:
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                else:
+                    backoff = 1.0
+                with self._lock:
+                    if not self._closed:
+                        self._spawn(index)
+
+    def _fail(self, request_ids, reason: str):
+        """Fail the pending futures of some requests (caller holds the lock)."""
+        for request_id in request_ids:
+            future = self._futures.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_exception(PredictionError(reason))
+
+    def _submit(self, kind: str, texts: List[str]) -> Future:
+        """Queue one request and return its future."""
+        if self._closed:
+            raise PredictionError("Transformer worker pool is closed")
+        if not self._started:
+            self.start()
+        if self.last_error is not None and not any(self._ready):
+            # Fail fast while no worker can load the model
+            raise PredictionError(f"Transformer workers unavailable: {self.last_error}")
+        future: Future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            self._futures[request_id] = future
+        self._requests.put((kind, request_id, texts))
+        return future
+
+    def _wait(self, future: Future, timeout: Optional[float] = None):
+        """Wait for a response, dropping the request on timeout."""
+        try:
+            return future.result(timeout=timeout or self.timeout_seconds)
+        except FutureTimeoutError:
+            with self._lock:
+                for request_id, pending in list(self._futures.items()):
+                    if pending is future:
+                        del self._futures[request_id]
+            raise PredictionError(f"Transformer worker did not answer within {timeout or self.timeout_seconds}s")
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Class probabilities for several texts, computed by a worker.
+
+        Args:
+            texts: Email texts
+
+        Returns:
+            Array of shape (n_texts, n_labels) in input order
+
+        Raises:
+            PredictionError: If the worker fails, crashes or times out
+        """
+        if not texts:
+            return np.zeros((0, 2), dtype=np.float32)
+        return self._wait(self._submit("predict", list(texts)))
+
+    def predict_batch(self, texts: List[str]) -> List[Dict]:
+        """Result dictionaries in input order, as ``TransformerService.predict_batch``."""
+        start_time = time.time()
+        probabilities = self.predict_proba(texts)
+        processing_time = (time.time() - start_time) * 1000 / max(len(texts), 1)
+        return [self._build_result(row, processing_time) for row in probabilities]
+
+    def predict(self, text: str) -> Dict:
+        """Result dictionary for one text, as ``TransformerService.predict``."""
+        start_time = time.time()
+        probabilities = self.predict_proba([text])[0]
+        return self._build_result(probabilities, (time.time() - start_time) * 1000)
+
+    def _build_result(self, probabilities: np.ndarray, processing_time: float) -> Dict:
+        """Result dictionary for one text's class probabilities (label 1 is SPAM)."""
+        ham_prob = float(probabilities[0])
+        spam_prob = float(probabilities[1])
+        return {
+            "is_spam": spam_prob > ham_prob,
+            "confidence": max(spam_prob, ham_prob),
+            "spam_probability": spam_prob,
+            "ham_probability": ham_prob,
+            "processing_time_ms": processing_time,
+            "model_version": self.model_name
+        }
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        """
+        Check that some worker answers a round trip through the request queue.
+
+        Args:
+            timeout: Seconds to wait for the answer
+
+        Returns:
+            True if a worker answered in time
+        """
+        try:
+            self._wait(self._submit("ping", []), timeout=timeout)
+            return True
+        except PredictionError:
+            return False
+
+    def stats(self) -> Dict:
+        """Get worker pool statistics."""
+        now = time.time()
+        return {
+            "workers": self.workers,
+            "alive": sum(process is not None and process.is_alive() for process in self._processes),
+            "ready": sum(self._ready),
+            "backend": self.backend,
+            "pending": len(self._futures),
+            "restarts": self.restarts,
+            "heartbeat_age_seconds": [
+                round(now - beat.value, 3) if beat.value else None for beat in self._heartbeats
+            ],
+            "last_error": self.last_error
+        }
+
+    def close(self):
+        """Stop the workers and fail any pending requests."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._started:
+            return
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.kill()
+        with self._lock:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(PredictionError("Transformer worker pool closed"))
+            self._futures.clear()
+        # Wake the response thread
+        self._responses.put(None)
+        logger.info("Transformer worker pool stopped")
+
+
+_shared_pool: Optional[TransformerWorkerPool] = None
+_shared_lock = threading.Lock()
+
+
+def create_transformer_service():
+    """
+    Transformer backend configured by settings.
+
+    Returns:
+        The process-wide ``TransformerWorkerPool`` when TRANSFORMER_WORKERS
+        is above 0, otherwise an in-process ``TransformerService``
+
+    Raises:
+        ConfigurationError: If transformer workers are combined with the
+            process executor, where every executor process would start a
+            pool of its own
+    """
+    global _shared_pool
+    if settings.TRANSFORMER_WORKERS <= 0:
+        from src.services.transformer_service import TransformerService
+        return TransformerService()
+    if settings.INFERENCE_EXECUTOR == "process":
+        raise ConfigurationError(
+            "TRANSFORMER_WORKERS requires INFERENCE_EXECUTOR=thread: each executor process "
+            "would start its own pool of transformer workers"
+        )
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = TransformerWorkerPool()
+        return _shared_pool
@@ -0,0 +1,61 @@
+"""
+Evaluation helpers shared by the training stages.
+
+Scores fitted vectorizer/model pairs on held-out data through the same
+featurizer the predictor serves with, so reported latency reflects the
+serving path.
+"""
+
+import logging
+import pickle
+import time
+from typing import Dict
+
+import numpy as np
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+
+from src.models.predictor import SpamPredictor
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_pipeline(model, vectorizer, X_test, y_test, latency_samples: int = 200) -> Dict:
+    """
+    Score a fitted pipeline on held-out data.
+    
+    Held-out data goes through the same featurizer the predictor serves with.
+    Latency is the mean single-email featurize + score time on the serving path.
+    
+    Returns:
+        Dictionary of quality metrics, latency and serving state size
+    """
+    texts = list(X_test)
+    predictor = SpamPredictor(model, vectorizer, backend="sklearn")
+    probabilities = predictor._score_cleaned(texts)
+    y_pred = model.classes_[np.argmax(probabilities, axis=1)]
+    
+    sample = texts[:latency_samples]
+    start = time.perf_counter()
+    for text in sample:
+        predictor._score_cleaned([text])
+    latency_us = (time.perf_counter() - start) / max(len(sample), 1) * 1e6
+    
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "precision": precision_score(y_test, y_pred),
+        "recall": recall_score(y_test, y_pred),
+        "f1": f1_score(y_test, y_pred),
+        "confusion_matrix": confusion_matrix(y_test, y_pred),
+        "latency_us": latency_us,
+        "vectorizer_bytes": len(pickle.dumps(vectorizer)),
+        "weights_bytes": model.feature_log_prob_.nbytes
+    }
+
+def log_comparison(reports: Dict[str, Dict]):
+    """Log a side-by-side table of pipeline reports."""
+    logger.info(f"{'pipeline':<10}{'accuracy':>10}{'f1':>8}{'latency_us':>12}{'vectorizer_kb':>15}{'weights_kb':>12}")
+    for name, report in reports.items():
+        logger.info(
+            f"{name:<10}{report['accuracy']:>10.4f}{report['f1']:>8.4f}{report['latency_us']:>12.1f}"
+            f"{report['vectorizer_bytes'] / 1024:>15.1f}{report['weights_bytes'] / 1024:>12.1f}"
+        )
@@ -0,0 +1,201 @@
+"""
+Vocabulary pruning under an accuracy budget.
+
+Ranks the features of a fitted TF-IDF + Multinomial Naive Bayes pipeline,
+refits the pipeline on the top-k terms for a range of candidate sizes and
+keeps the smallest vocabulary whose cross-validated F1 stays within a
+tolerance of the full model. Each candidate is reported with its serialized size, load time and
+per-email scoring time, so the size/latency/accuracy trade-off is explicit.
+"""
+
+import logging
+import pickle
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_selection import chi2
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import MultinomialNB
+
+from src.training.evaluation import evaluate_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Vocabulary sizes tried when none are given (capped at the full size)
+DEFAULT_CANDIDATE_SIZES = (250, 500, 750, 1000, 1500, 2000)
+# Largest allowed F1 drop relative to the full vocabulary
+DEFAULT_F1_TOLERANCE = 0.01
+# Cross-validation folds used to score the candidate sizes
+DEFAULT_FOLDS = 5
+RANKING_METHODS = ("chi2", "log_odds")
+
+
+def rank_features(model, vectorizer, X_train, y_train, method: str = "chi2") -> np.ndarray:
+    """
+    Order the vectorizer's features from most to least informative.
+
+    Args:
+        model: Fitted MultinomialNB
+        vectorizer: Fitted TfidfVectorizer
+        X_train: Cleaned training texts
+        y_train: Training labels
+        method: "chi2" (chi-squared statistic on the training features) or
+            "log_odds" (magnitude of the NB class log-probability difference)
+
+    Returns:
+        Feature indices sorted by decreasing score
+    """
+    if method == "chi2":
+        scores, _ = chi2(vectorizer.transform(X_train), y_train)
+        scores = np.nan_to_num(scores)
+    elif method == "log_odds":
+        log_prob = model.feature_log_prob_
+        scores = np.abs(log_prob[-1] - log_prob[0])
+    else:
+        raise ValueError(f"Unknown ranking method: {method}")
+    # Stable sort keeps ties in vocabulary order, so rankings are reproducible
+    return np.argsort(-scores, kind="stable")
+
+
+def prune_pipeline(vectorizer, terms: Sequence[str], X_train, y_train) -> Tuple:
+    """
+    Refit the pipeline on a fixed subset of terms.
+
+    IDF weights are unchanged for the kept terms; row normalization and the
+    NB weights are refit so the pruned pipeline is self-consistent.
+
+    Args:
+        vectorizer: Fitted TfidfVectorizer whose settings are reused
+        terms: Terms to keep
+        X_train: Cleaned training texts
+        y_train: Training labels
+
+    Returns:
+        Tuple of (model, vectorizer)
+    """
+    params = vectorizer.get_params()
+    params.update(vocabulary=sorted(terms), max_features=None)
+    pruned = TfidfVectorizer(**params)
+    model = MultinomialNB().fit(pruned.fit_transform(X_train), y_train)
+    return model, pruned
+
+
+def measure_load(model, vectorizer) -> Dict:
+    """
+    Measure the serialized size and load time of a pipeline.
+
+    Returns:
+        Dictionary with artifact_bytes and load_ms
+    """
+    payload = [pickle.dumps(model), pickle.dumps(vectorizer)]
+    start = time.perf_counter()
+    for blob in payload:
+        pickle.loads(blob)
+    return {
+        "artifact_bytes": sum(len(blob) for blob in payload),
+        "load_ms": (time.perf_counter() - start) * 1e3
+    }
+
+
+def select_vocabulary(
+    model,
+    vectorizer,
+    X_train,
+    y_train,
+    f1_tolerance: float = DEFAULT_F1_TOLERANCE,
+    candidate_sizes: Optional[Sequence[int]] = None,
+    method: str = "chi2",
+    n_folds: int = DEFAULT_FOLDS
+) -> Tuple:
+    """
+    Find the smallest vocabulary whose F1 stays within tolerance of the full model.
+
+    Candidates are scored by stratified k-fold cross-validation on the
+    training set: in each fold the full pipeline is refit, its features are
+    ranked, and every candidate size is pruned and scored on the held-out
+    fold. A single validation split holds too few spam messages for a
+    tolerance of a point of F1 to mean anything.
+
+    Args:
+        model: MultinomialNB fitted on the whole training set
+        vectorizer: TfidfVectorizer fitted on the whole training set
+        X_train: Cleaned training texts
+        y_train: Training labels
+        f1_tolerance: Largest allowed drop in mean cross-validated F1
+            relative to the full vocabulary
+        candidate_sizes: Vocabulary sizes to try
+        method: Feature ranking method (see ``rank_features``)
+        n_folds: Cross-validation folds
+
+    Returns:
+        Tuple of (model, vectorizer, report). The pipeline is the selected
+        vocabulary refit on the whole training set. The report holds the
+        full vocabulary's cross-validated F1, the selected size and one row
+        per candidate with size, f1 (mean over folds), f1_std,
+        artifact_bytes, load_ms and latency_us.
+
+    Raises:
+        ValueError: If the vectorizer has no vocabulary to prune
+    """
+    if not hasattr(vectorizer, "vocabulary_"):
+        raise ValueError("Feature selection needs a vocabulary-based vectorizer")
+
+    terms = vectorizer.get_feature_names_out()
+    full_size = len(terms)
+    sizes = sorted({min(size, full_size) for size in (candidate_sizes or DEFAULT_CANDIDATE_SIZES)} | {full_size})
+
+    X = np.asarray(list(X_train), dtype=object)
+    y = np.asarray(y_train)
+    fold_f1: Dict[int, List[float]] = {size: [] for size in sizes}
+    folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    for fit_rows, val_rows in folds.split(X, y):
+        fold_vectorizer = clone(vectorizer)
+        fold_model = MultinomialNB().fit(fold_vectorizer.fit_transform(X[fit_rows]), y[fit_rows])
+        fold_terms = fold_vectorizer.get_feature_names_out()
+        fold_ranking = rank_features(fold_model, fold_vectorizer, X[fit_rows], y[fit_rows], method)
+        for size in sizes:
+            if size >= len(fold_terms):
+                pipeline = (fold_model, fold_vectorizer)
+            else:
+                pipeline = prune_pipeline(fold_vectorizer, fold_terms[fold_ranking[:size]], X[fit_rows], y[fit_rows])
+            fold_f1[size].append(float(evaluate_pipeline(*pipeline, X[val_rows], y[val_rows], latency_samples=0)["f1"]))
+
+    # Size, load time and serving latency of each candidate refit on all the training data
+    ranking = rank_features(model, vectorizer, X, y, method)
+    candidates: List[Dict] = []
+    pipelines = {}
+    for size in sizes:
+        if size == full_size:
+            pipelines[size] = (model, vectorizer)
+        else:
+            pipelines[size] = prune_pipeline(vectorizer, terms[ranking[:size]], X, y)
+        candidates.append({
+            "size": size,
+            "f1": float(np.mean(fold_f1[size])),
+            "f1_std": float(np.std(fold_f1[size])),
+            "latency_us": evaluate_pipeline(*pipelines[size], X, y)["latency_us"],
+            **measure_load(*pipelines[size])
+        })
+
+    full_f1 = candidates[-1]["f1"]
+    selected = next(row for row in candidates if row["f1"] >= full_f1 - f1_tolerance)
+    for row in candidates:
+        logger.info(
+            f"{row['size']:>6} terms: cv f1 {row['f1']:.4f} ± {row['f1_std']:.4f}, "
+            f"{row['artifact_bytes'] / 1024:.1f} KB, load {row['load_ms']:.2f} ms, {row['latency_us']:.1f} us/email"
+        )
+    logger.info(f"Selected {selected['size']} of {full_size} terms (full cv F1 {full_f1:.4f}, tolerance {f1_tolerance})")
+
+    report = {
+        "method": method,
+        "f1_tolerance": f1_tolerance,
+        "n_folds": n_folds,
+        "full_size": full_size,
+        "full_f1": full_f1,
+        "selected_size": selected["size"],
+        "candidates": candidates
+    }
+    return (*pipelines[selected["size"]], report)
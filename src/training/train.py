@@ -10,32 +10,34 @@ from pathlib import Path
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-with open("debug.txt", "w") as f:
-    f.write("Starting script\n")
-
-print("Starting training script...")
+import argparse
+import json
 import pandas as pd
-print("Imported pandas")
 import numpy as np
 import pickle
 import logging
-from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
+import shutil
+from typing import Optional, Tuple
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 
-print("Imported sklearn")
 from src.preprocessing.text_processor import text_processor
+from src.models.artifact import export_artifact
+from src.models.quantization import promote_quantized
+from src.training.evaluation import evaluate_pipeline, log_comparison
+from src.training.feature_selection import DEFAULT_F1_TOLERANCE, select_vocabulary
 from src.config.settings import settings
 from src.utils.logger import setup_logging
 
-print("Imported internal modules")
-
-# Setup logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
+# Default hash buckets for the vocabulary-free variant (1 MB of NB weights)
+HASHING_N_FEATURES = 2 ** 16
+# Most hash buckets are empty, so the default add-one smoothing swamps the
+# populated ones; a small alpha keeps the hashed model competitive
+HASHING_NB_ALPHA = 0.01
+
 def load_data(file_path: str) -> pd.DataFrame:
     """Load data from CSV file handling different encodings."""
     try:
@@ -60,6 +62,8 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
         df = df.rename(columns={'v1': 'target', 'v2': 'text'})
     elif 'Category' in df.columns and 'Message' in df.columns:
         df = df.rename(columns={'Category': 'target', 'Message': 'text'})
+    elif 'class' in df.columns and 'message' in df.columns:
+        df = df.rename(columns={'class': 'target', 'message': 'text'})
     else:
         # Fallback: Assume first column is target, second is text
         logger.warning(f"Unknown columns: {df.columns.tolist()}. Renaming first two to 'target' and 'text'")
@@ -73,13 +77,114 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     # Encode target
     df['target_enc'] = df['target'].map({'spam': 1, 'ham': 0})
     
-    # Drop missing values
-    df.dropna(inplace=True)
+    # Drop rows missing a label or text (ignore the trailing empty CSV columns)
+    df.dropna(subset=['target_enc', 'text'], inplace=True)
     
     return df
 
-def train_model():
-    """Execute the training pipeline."""
+def build_vectorizer(variant: str, n_features: Optional[int] = None):
+    """
+    Create the unfitted vectorizer for a pipeline variant.
+    
+    Args:
+        variant: "tfidf" (vocabulary + IDF) or "hashing" (stateless feature hashing)
+        n_features: Hash buckets for the hashing variant
+    
+    Returns:
+        Unfitted vectorizer
+    """
+    if variant == "tfidf":
+        return TfidfVectorizer(max_features=3000)
+    if variant == "hashing":
+        # Unsigned counts keep features non-negative for Multinomial NB
+        return HashingVectorizer(n_features=n_features or HASHING_N_FEATURES, alternate_sign=False, norm="l2")
+    raise ValueError(f"Unknown pipeline variant: {variant}")
+
+def fit_pipeline(variant: str, X_train, y_train, n_features: Optional[int] = None) -> Tuple:
+    """
+    Fit a vectorizer and Multinomial Naive Bayes model.
+    
+    Returns:
+        Tuple of (model, vectorizer)
+    """
+    vectorizer = build_vectorizer(variant, n_features)
+    # Keep the matrices sparse: MultinomialNB accepts CSR input directly
+    X_train_features = vectorizer.fit_transform(X_train)
+    model = MultinomialNB(alpha=HASHING_NB_ALPHA) if variant == "hashing" else MultinomialNB()
+    model.fit(X_train_features, y_train)
+    return model, vectorizer
+
+def save_pruned_pipeline(model, vectorizer, X_train, y_train, X_test, y_test, models_dir: Path, suffix: str, f1_tolerance: float):
+    """
+    Select a smaller vocabulary and save the pruned pipeline with its report.
+    
+    Candidate sizes are scored by cross-validation on the training set; the
+    selected vocabulary is refit on the full training set and evaluated on
+    the test set. The pruned pipeline is only written out if its test F1 is
+    also within the tolerance of the full model; otherwise any pruned
+    artifacts of an earlier run are removed and only the report is saved.
+    """
+    logger.info("Searching for a smaller vocabulary...")
+    model_full, vectorizer_full = model, vectorizer
+    model, vectorizer, report = select_vocabulary(
+        model_full, vectorizer_full, X_train, y_train, f1_tolerance=f1_tolerance
+    )
+    
+    full_report = evaluate_pipeline(model_full, vectorizer_full, X_test, y_test)
+    pruned_report = evaluate_pipeline(model, vectorizer, X_test, y_test)
+    report["test"] = {
+        name: {key: float(scores[key]) for key in ("accuracy", "f1", "latency_us")}
+        for name, scores in (("full", full_report), ("pruned", pruned_report))
+    }
+    report["deployable"] = bool(pruned_report["f1"] >= full_report["f1"] - f1_tolerance)
+    logger.info(
+        f"Pruned pipeline: {report['selected_size']} terms, test F1 {pruned_report['f1']:.4f} "
+        f"(full vocabulary {full_report['f1']:.4f})"
+    )
+    
+    outputs = [
+        models_dir / f"spam_{suffix}_pruned.pkl",
+        models_dir / f"vectorizer_{suffix}_pruned.pkl",
+        models_dir / f"spam_{suffix}_pruned_compact"
+    ]
+    if report["deployable"]:
+        with open(outputs[0], 'wb') as f:
+            pickle.dump(model, f)
+        with open(outputs[1], 'wb') as f:
+            pickle.dump(vectorizer, f)
+        export_artifact(model, vectorizer, outputs[2], settings.MODEL_VERSION)
+        logger.info(f"Pruned pipeline saved to {models_dir}")
+    else:
+        logger.warning(
+            f"Pruned pipeline not saved: test F1 drop {full_report['f1'] - pruned_report['f1']:.4f} "
+            f"exceeds the tolerance {f1_tolerance}"
+        )
+        for path in outputs:
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+    
+    with open(models_dir / f"feature_selection_{suffix}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Feature selection report saved to {models_dir / f'feature_selection_{suffix}.json'}")
+
+def train_model(
+    variant: str = "tfidf",
+    n_features: Optional[int] = None,
+    select_features: bool = False,
+    f1_tolerance: float = DEFAULT_F1_TOLERANCE
+):
+    """
+    Execute the training pipeline.
+    
+    Args:
+        variant: "tfidf" for the default vocabulary model, or "hashing" for the
+            vocabulary-free hashing model (reported against TF-IDF on the same split)
+        n_features: Hash buckets for the hashing variant
+        select_features: Also emit a pruned-vocabulary pipeline (tfidf only)
+        f1_tolerance: Largest F1 drop allowed for the pruned vocabulary
+    """
     try:
         # Paths
         data_path = Path("spam.csv")
@@ -97,7 +202,7 @@ def train_model():
         # 2. Preprocess Text
         logger.info("Preprocessing text...")
         # Use the TextProcessor for consistent cleaning
-        df['processed_text'] = df['text'].apply(text_processor.clean_text)
+        df['processed_text'] = text_processor.clean_texts(df['text'].astype(str).tolist())
         
         # 3. Split Data
         X = df['processed_text']
@@ -108,40 +213,34 @@ def train_model():
         logger.info(f"Training set size: {len(X_train)}")
         logger.info(f"Test set size: {len(X_test)}")
         
-        # 4. Vectorization (TF-IDF)
-        logger.info("Vectorizing data (TF-IDF)...")
-        vectorizer = TfidfVectorizer(max_features=3000)
-        X_train_tfidf = vectorizer.fit_transform(X_train).toarray()
-        X_test_tfidf = vectorizer.transform(X_test).toarray()
-        
-        # 5. Train Model
-        logger.info("Training Multinomial Naive Bayes model...")
-        model = MultinomialNB()
-        model.fit(X_train_tfidf, y_train)
+        # 4. Vectorize and train
+        logger.info(f"Training Multinomial Naive Bayes model ({variant} features)...")
+        model, vectorizer = fit_pipeline(variant, X_train, y_train, n_features)
         
-        # 6. Evaluate
+        # 5. Evaluate
         logger.info("Evaluating model...")
-        y_pred = model.predict(X_test_tfidf)
-        
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred)
-        recall = recall_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred)
-        cm = confusion_matrix(y_test, y_pred)
+        report = evaluate_pipeline(model, vectorizer, X_test, y_test)
+        accuracy = report["accuracy"]
         
         logger.info("Model Performance:")
         logger.info(f"Accuracy:  {accuracy:.4f}")
-        logger.info(f"Precision: {precision:.4f}")
-        logger.info(f"Recall:    {recall:.4f}")
-        logger.info(f"F1 Score:  {f1:.4f}")
-        logger.info(f"Confusion Matrix:\n{cm}")
+        logger.info(f"Precision: {report['precision']:.4f}")
+        logger.info(f"Recall:    {report['recall']:.4f}")
+        logger.info(f"F1 Score:  {report['f1']:.4f}")
+        logger.info(f"Confusion Matrix:\n{report['confusion_matrix']}")
+        
+        if variant != "tfidf":
+            logger.info("Comparing against the TF-IDF pipeline on the same split...")
+            reference = evaluate_pipeline(*fit_pipeline("tfidf", X_train, y_train), X_test, y_test)
+            log_comparison({"tfidf": reference, variant: report})
         
-        # 7. Save Artifacts
+        # 6. Save Artifacts
         logger.info("Saving model artifacts...")
         
         # Save as v2 to distinguish from original
-        model_path = models_dir / "spam_v2.pkl"
-        vectorizer_path = models_dir / "vectorizer_v2.pkl"
+        suffix = "v2" if variant == "tfidf" else variant
+        model_path = models_dir / f"spam_{suffix}.pkl"
+        vectorizer_path = models_dir / f"vectorizer_{suffix}.pkl"
         
         with open(model_path, 'wb') as f:
             pickle.dump(model, f)
@@ -152,6 +251,32 @@ def train_model():
         logger.info(f"Model saved to {model_path}")
         logger.info(f"Vectorizer saved to {vectorizer_path}")
         
+        # Pickle-free copy that serving workers memory-map and share
+        artifact_path = export_artifact(model, vectorizer, models_dir / f"spam_{suffix}_compact", settings.MODEL_VERSION)
+        logger.info(f"Memory-mapped artifact saved to {artifact_path}")
+        
+        # Reduced-precision copies, published only if they track the full model on the holdout
+        quantization = {
+            precision: promote_quantized(
+                model, vectorizer, list(X_test),
+                models_dir / f"spam_{suffix}_compact_{precision}",
+                precision,
+                version=settings.MODEL_VERSION
+            )
+            for precision in ("float32", "int8")
+        }
+        with open(models_dir / f"quantization_{suffix}.json", 'w') as f:
+            json.dump(quantization, f, indent=2)
+        rejected = [precision for precision, result in quantization.items() if not result["promoted"]]
+        if rejected:
+            logger.warning(
+                f"Not published (serve the float64 artifact instead): {', '.join(rejected)}; "
+                f"see {models_dir / f'quantization_{suffix}.json'}"
+            )
+        
+        if select_features:
+            save_pruned_pipeline(model, vectorizer, X_train, y_train, X_test, y_test, models_dir, suffix, f1_tolerance)
+        
         print("\nTraining Complete! 🚀")
         print(f"Accuracy: {accuracy:.2%}")
         print(f"Saved to: {models_dir}")
@@ -161,4 +286,18 @@ def train_model():
         raise
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the spam classifier")
+    parser.add_argument("--variant", choices=["tfidf", "hashing"], default="tfidf",
+                        help="Feature pipeline: TF-IDF vocabulary or vocabulary-free hashing")
+    parser.add_argument("--n-features", type=int, default=None,
+                        help=f"Hash buckets for the hashing variant (default {HASHING_N_FEATURES})")
+    parser.add_argument("--select-features", action="store_true",
+                        help="Also save the smallest vocabulary within the F1 tolerance (tfidf only)")
+    parser.add_argument("--f1-tolerance", type=float, default=DEFAULT_F1_TOLERANCE,
+                        help=f"Largest F1 drop allowed when pruning the vocabulary (default {DEFAULT_F1_TOLERANCE})")
+    args = parser.parse_args()
+    if args.select_features and args.variant != "tfidf":
+        parser.error("--select-features requires the tfidf variant")
+    
+    setup_logging()
+    train_model(args.variant, args.n_features, args.select_features, args.f1_tolerance)
@@ -29,3 +29,8 @@ class ValidationError(SpamClassifierException):
 class ConfigurationError(SpamClassifierException):
     """Raised when there's a configuration error."""
     pass
+
+
+class ServiceOverloadedError(SpamClassifierException):
+    """Raised when the inference queue is full and a request is rejected."""
+    pass
@@ -1,31 +1,137 @@
 import re
-from typing import Dict, List, Tuple
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
-def explain_prediction(text: str, predict_func) -> List[Tuple[str, float]]:
+from src.preprocessing.text_processor import text_processor
+
+# Word boundaries used for model-agnostic perturbations
+_WORD_SPLIT_RE = re.compile(r'(\w+)')
+
+# Default wall-clock budget for perturbation explanations
+DEFAULT_TIME_BUDGET_MS = 500.0
+# Perturbations scored per call of the batch predictor
+PERTURBATION_BATCH_SIZE = 64
+
+
+def explain_prediction(
+    text: str,
+    predict_func,
+    top_k: int = 10,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    predict_batch_func: Optional[Callable[[List[str]], List[Dict]]] = None
+) -> List[Tuple[str, float]]:
     """
-    Simulates LIME (Local Interpretable Model-agnostic Explanations).
+    Explain a prediction by how much each word moves the spam probability.
+    
+    When ``predict_func`` is ``SpamPredictor.predict`` for a Naive Bayes
+    model, contributions are computed exactly from the model weights in one
+    pass (see ``src.models.attribution``). Otherwise every leave-one-word-out
+    perturbation is scored in batches until the time budget runs out.
     
     Args:
         text: The input text.
         predict_func: A function that takes text and returns a dict with 'spam_probability'.
+        top_k: Maximum number of words returned.
+        time_budget_ms: Wall-clock budget for perturbation scoring.
+        predict_batch_func: Function scoring a list of texts (defaults to the
+            predictor's ``predict_batch`` when available).
         
     Returns:
         List of (word, contribution_score) tuples.
         Positive score = contributes to SPAM.
         Negative score = contributes to HAM.
     """
-    original_prob = predict_func(text)['spam_probability']
-    words = re.findall(r'\w+', text.lower())
-    unique_words = set(words)
+    predictor = getattr(predict_func, "__self__", None)
+    attributor = getattr(predictor, "attributor", None)
+    if attributor is not None:
+        return attributor.explain(text_processor.clean_text(text), top_k)
     
-    contributions = []
+    if predict_batch_func is None:
+        predict_batch_func = getattr(predictor, "predict_batch", None) or _one_by_one(predict_func)
+    return explain_by_perturbation(text, predict_batch_func, top_k, time_budget_ms)
+
+
+def _one_by_one(predict_func) -> Callable[[List[str]], List[Dict]]:
+    """Adapt a single-text predictor to the batch interface."""
+    def predict_batch(texts: List[str]) -> List[Dict]:
+        results = []
+        for item in texts:
+            try:
+                results.append(predict_func(item))
+            except Exception as e:
+                results.append({'error': str(e)})
+        return results
+    return predict_batch
+
+
+def explain_by_perturbation(
+    text: str,
+    predict_batch_func: Callable[[List[str]], List[Dict]],
+    top_k: Optional[int] = 10,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS
+) -> List[Tuple[str, float]]:
+    """
+    Model-agnostic leave-one-word-out explanation, scored in batches.
     
-    for word in unique_words:
-        # Remove word and re-predict
-        # We use a simple regex replace for the simulation
-        modified_text = re.sub(r'\b' + re.escape(word) + r'\b', '', text, flags=re.IGNORECASE)
-        new_prob = predict_func(modified_text)['spam_probability']
+    Words are tried in order of first appearance; once the time budget is
+    spent the remaining words are left out of the result.
+    
+    Args:
+        text: The input text.
+        predict_batch_func: Function taking a list of texts and returning a
+            list of dicts with 'spam_probability' (or 'error').
+        top_k: Maximum number of words returned (None for all).
+        time_budget_ms: Wall-clock budget for scoring.
         
+    Returns:
+        List of (word, contribution_score) tuples, as ``explain_prediction``.
+    """
+    return score_perturbations(text, predict_batch_func, top_k, time_budget_ms)[1]
+
+
+def score_perturbations(
+    text: str,
+    predict_batch_func: Callable[[List[str]], List[Dict]],
+    top_k: Optional[int] = 10,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS
+) -> Tuple[Optional[float], List[Tuple[str, float]]]:
+    """
+    ``explain_by_perturbation`` that also returns the original text's score.
+    
+    The original text is scored in the first batch anyway, so callers
+    reporting its spam probability need no extra pass.
+    
+    Returns:
+        Tuple of (spam probability of ``text``, or None if it could not be
+        scored, and the (word, contribution_score) list)
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    pieces = _WORD_SPLIT_RE.split(text)
+    folded = [piece.lower() for piece in pieces]
+    words = list(dict.fromkeys(folded[1::2]))
+    
+    # Remove every occurrence of the word, as a case-insensitive \bword\b substitution would
+    perturbations = [
+        ''.join(piece for index, piece in enumerate(pieces) if not (index % 2 and folded[index] == word))
+        for word in words
+    ]
+    
+    texts = [text] + perturbations
+    probabilities: List[Optional[float]] = []
+    for start in range(0, len(texts), PERTURBATION_BATCH_SIZE):
+        if start and time.perf_counter() > deadline:
+            break
+        for result in predict_batch_func(texts[start:start + PERTURBATION_BATCH_SIZE]):
+            probabilities.append(result.get('spam_probability') if 'error' not in result else None)
+    
+    original_prob = probabilities[0]
+    if original_prob is None:
+        return None, []
+    
+    contributions = []
+    for word, new_prob in zip(words, probabilities[1:]):
+        if new_prob is None:
+            continue
         # If prob drops significantly when word is removed, it was contributing to SPAM
         # If prob increases, it was contributing to HAM (keeping it safe)
         contribution = original_prob - new_prob
@@ -35,4 +141,4 @@ def explain_prediction(text: str, predict_func) -> List[Tuple[str, float]]:
             
     # Sort by absolute contribution
     contributions.sort(key=lambda x: abs(x[1]), reverse=True)
-    return contributions[:10] # Top 10 features
+    return original_prob, contributions[:top_k]
@@ -0,0 +1,153 @@
+"""
+Near-duplicate detection with SimHash fingerprints.
+
+Spam campaigns resend one body with small edits: a name, a tracking token,
+a different link. ``TextProcessor.clean_text`` already folds URLs, email
+addresses and phone numbers into placeholders, so a 64-bit SimHash over the
+words of the cleaned text changes in only a few bits between variants.
+(Bigram features double the bits an edit flips, which on SMS-length
+messages pushes most variants past any safe threshold.)
+``NearDuplicateIndex`` remembers the fingerprints of recently classified
+messages and finds one within a Hamming distance threshold by exact
+lookups on bands of the fingerprint.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+FINGERPRINT_BITS = 64
+# Messages with fewer tokens give unstable fingerprints and are not indexed
+MIN_TOKENS = 8
+
+
+@lru_cache(maxsize=65536)
+def _word_hash(word: str) -> bytes:
+    """Stable 64-bit hash of a word."""
+    return hashlib.blake2b(word.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+
+
+def simhash(cleaned_text: str, min_tokens: int = MIN_TOKENS) -> Optional[int]:
+    """
+    Compute the 64-bit SimHash of a cleaned message.
+
+    Features are the words, hashed with 8-byte BLAKE2b so fingerprints are
+    the same in every worker process and run.
+
+    Args:
+        cleaned_text: Output of ``TextProcessor.clean_text``
+        min_tokens: Minimum number of words for a usable fingerprint
+
+    Returns:
+        Fingerprint as an unsigned int, or None for short messages
+    """
+    words = cleaned_text.lower().split()
+    if len(words) < min_tokens:
+        return None
+
+    hashes = np.frombuffer(b"".join(map(_word_hash, words)), dtype=np.uint8).reshape(len(words), 8)
+    # Bit i of the little-endian hash lands in column i
+    ones = np.unpackbits(hashes, axis=1, bitorder="little").sum(axis=0, dtype=np.int32)
+    bits = (2 * ones > len(words)).astype(np.uint8)
+    return int(np.packbits(bits, bitorder="little").view("<u8")[0])
+
+
+class NearDuplicateIndex:
+    """
+    Bounded index of recent fingerprints with banded Hamming lookup.
+
+    With ``max_distance = d`` the 64 bits are split into ``d + 1`` bands;
+    two fingerprints within distance ``d`` agree exactly on at least one
+    band, so only entries sharing a band value are compared. The oldest
+    entries are dropped once ``max_entries`` is reached.
+    """
+
+    def __init__(self, max_entries: int, max_distance: int = 6):
+        """
+        Initialize the index.
+
+        Args:
+            max_entries: Maximum number of remembered messages
+            max_distance: Largest Hamming distance treated as a duplicate
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        n_bands = max_distance + 1
+        width = FINGERPRINT_BITS // n_bands
+        # Last band takes the leftover bits
+        self._bands: List[Tuple[int, int]] = [
+            (band * width, (width if band < n_bands - 1 else FINGERPRINT_BITS - band * width))
+            for band in range(n_bands)
+        ]
+        self._entries: "OrderedDict[Tuple[Hashable, int], Any]" = OrderedDict()
+        self._buckets: Dict[Tuple, set] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, scope: Hashable, fingerprint: int) -> List[Tuple]:
+        """Bucket keys of a fingerprint, one per band."""
+        return [
+            (scope, band, (fingerprint >> shift) & ((1 << width) - 1))
+            for band, (shift, width) in enumerate(self._bands)
+        ]
+
+    def add(self, scope: Hashable, fingerprint: int, value: Any):
+        """
+        Remember a fingerprint.
+
+        Args:
+            scope: Namespace the fingerprint belongs to (e.g. model version)
+            fingerprint: SimHash of the message
+            value: Payload returned by ``find``
+        """
+        if self.max_entries <= 0:
+            return
+        entry = (scope, fingerprint)
+        with self._lock:
+            if entry not in self._entries:
+                for key in self._band_keys(scope, fingerprint):
+                    self._buckets.setdefault(key, set()).add(fingerprint)
+            self._entries[entry] = value
+            self._entries.move_to_end(entry)
+            while len(self._entries) > self.max_entries:
+                (old_scope, old_fingerprint), _ = self._entries.popitem(last=False)
+                for key in self._band_keys(old_scope, old_fingerprint):
+                    bucket = self._buckets[key]
+                    bucket.discard(old_fingerprint)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def find(self, scope: Hashable, fingerprint: int) -> Optional[Tuple[Any, int]]:
+        """
+        Find the closest remembered fingerprint within the distance threshold.
+
+        Args:
+            scope: Namespace to search
+            fingerprint: SimHash of the message
+
+        Returns:
+            Tuple of (payload, Hamming distance), or None
+        """
+        best = None
+        with self._lock:
+            for key in self._band_keys(scope, fingerprint):
+                for candidate in self._buckets.get(key, ()):
+                    distance = bin(candidate ^ fingerprint).count("1")
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (candidate, distance)
+            if best is None:
+                return None
+            return self._entries[(scope, best[0])], best[1]
+
+    def clear(self):
+        """Forget every fingerprint."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,117 @@
+"""
+Bounded in-process result cache.
+
+A thread-safe LRU map with an optional time-to-live, keyed by content
+fingerprints, used by the API to answer repeated messages without
+re-running the model. Hit, miss and eviction counters are kept for the
+stats endpoints.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def fingerprint(text: str, *parts) -> str:
+    """
+    Content hash of a text plus any distinguishing parameters.
+
+    Args:
+        text: Text to hash
+        *parts: Extra values that change the cached result (e.g. top_k)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass"))
+    for part in parts:
+        digest.update(b"\0" + str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = 0.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 disables caching)
+            ttl_seconds: Entry lifetime in seconds (0 keeps entries until evicted)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up an entry, refreshing its LRU position.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store an entry, evicting the least recently used ones over capacity.
+
+        Args:
+            key: Cache key
+            value: Value to cache (treated as immutable by callers)
+        """
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -31,3 +31,54 @@ def sample_emails_batch():
         {"id": "2", "text": "WIN FREE MONEY NOW!!!"},
         {"id": "3", "text": "Your order has been shipped"}
     ]
+
+
+@pytest.fixture(scope="session")
+def trained_model():
+    """
+    TF-IDF + Multinomial Naive Bayes pair fitted on spam.csv.
+    
+    The checked-in artifacts are tiny, so parity tests use this to exercise
+    a realistically sized vocabulary with both classes present.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from src.preprocessing.text_processor import text_processor
+    from src.training.train import load_data, prepare_data
+    
+    df = prepare_data(load_data(str(project_root / "spam.csv")))
+    texts = df['text'].astype(str).tolist()
+    cleaned = text_processor.clean_texts(texts)
+    vectorizer = TfidfVectorizer(max_features=3000)
+    model = MultinomialNB().fit(vectorizer.fit_transform(cleaned), df['target_enc'].astype(int))
+    return model, vectorizer, texts
+
+
+@pytest.fixture(scope="session")
+def trained_model_paths(trained_model, tmp_path_factory):
+    """``trained_model`` pickled to disk, as (model_path, vectorizer_path)."""
+    import pickle
+    
+    model, vectorizer, _ = trained_model
+    directory = tmp_path_factory.mktemp("trained_model")
+    model_path, vectorizer_path = directory / "spam.pkl", directory / "vectorizer.pkl"
+    model_path.write_bytes(pickle.dumps(model))
+    vectorizer_path.write_bytes(pickle.dumps(vectorizer))
+    return str(model_path), str(vectorizer_path)
+
+
+@pytest.fixture
+def serve_trained_model(monkeypatch, trained_model_paths):
+    """
+    Point the API at ``trained_model`` instead of the checked-in artifacts.
+    
+    The checked-in model was fitted on ham only, so it cannot produce a
+    spam verdict.
+    """
+    from src.config.settings import settings
+    from src.models.model_loader import model_manager
+    
+    model_path, vectorizer_path = trained_model_paths
+    monkeypatch.setattr(settings, "MODEL_PATH", model_path)
+    monkeypatch.setattr(settings, "VECTORIZER_PATH", vectorizer_path)
+    monkeypatch.setattr(model_manager, "_bundle", None)
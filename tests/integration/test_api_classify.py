@@ -3,21 +3,33 @@ Integration tests for API classification endpoints.
 """
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
 from api.main import app
+from src.config.settings import settings
+
+
+HEADERS = {"X-API-Key": settings.API_KEY}
+
+
+@pytest_asyncio.fixture
+async def client(serve_trained_model):
+    """Client for the app with its lifespan (and engine) running."""
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(app=app, base_url="http://test", headers=HEADERS) as client:
+            yield client
 
 
 @pytest.mark.asyncio
 class TestClassifyEndpoints:
     """Integration tests for classification endpoints."""
     
-    async def test_classify_spam_email(self):
+    async def test_classify_spam_email(self, client):
         """Test classifying spam email via API."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify",
-                json={"text": "WIN FREE MONEY NOW!!! Click here!!!"}
-            )
+        response = await client.post(
+            "/api/v1/classify",
+            json={"text": "Congratulations! You have won a FREE prize. Call now to claim your cash reward!"}
+        )
         
         assert response.status_code == 200
         data = response.json()
@@ -26,51 +38,47 @@ class TestClassifyEndpoints:
         assert "confidence" in data
         assert data["is_spam"] is True
     
-    async def test_classify_ham_email(self):
+    async def test_classify_ham_email(self, client):
         """Test classifying legitimate email via API."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify",
-                json={"text": "Meeting tomorrow at 3pm in the conference room"}
-            )
+        response = await client.post(
+            "/api/v1/classify",
+            json={"text": "Meeting tomorrow at 3pm in the conference room"}
+        )
         
         assert response.status_code == 200
         data = response.json()
         
         assert data["is_spam"] is False
     
-    async def test_classify_empty_text(self):
+    async def test_classify_empty_text(self, client):
         """Test that empty text returns validation error."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify",
-                json={"text": ""}
-            )
+        response = await client.post(
+            "/api/v1/classify",
+            json={"text": ""}
+        )
         
         assert response.status_code == 422
     
-    async def test_classify_missing_text(self):
+    async def test_classify_missing_text(self, client):
         """Test that missing text field returns error."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify",
-                json={}
-            )
+        response = await client.post(
+            "/api/v1/classify",
+            json={}
+        )
         
         assert response.status_code == 422
     
-    async def test_batch_classify(self):
+    async def test_batch_classify(self, client):
         """Test batch classification endpoint."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify/batch",
-                json={
-                    "emails": [
-                        {"id": "1", "text": "Meeting tomorrow"},
-                        {"id": "2", "text": "WIN FREE MONEY!!!"}
-                    ]
-                }
-            )
+        response = await client.post(
+            "/api/v1/classify/batch",
+            json={
+                "emails": [
+                    {"id": "1", "text": "Meeting tomorrow"},
+                    {"id": "2", "text": "WIN FREE MONEY!!!"}
+                ]
+            }
+        )
         
         assert response.status_code == 200
         data = response.json()
@@ -80,12 +88,11 @@ class TestClassifyEndpoints:
         assert len(data["results"]) == 2
         assert data["total_processed"] == 2
     
-    async def test_batch_classify_empty_list(self):
+    async def test_batch_classify_empty_list(self, client):
         """Test batch classification with empty list."""
-        async with AsyncClient(app=app, base_url="http://test") as client:
-            response = await client.post(
-                "/api/v1/classify/batch",
-                json={"emails": []}
-            )
+        response = await client.post(
+            "/api/v1/classify/batch",
+            json={"emails": []}
+        )
         
         assert response.status_code == 422
@@ -0,0 +1,246 @@
+"""
+Integration tests for the application-scoped inference engine.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from httpx import AsyncClient
+from api.main import app
+from src.config.settings import settings
+from src.models.model_loader import model_manager
+from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import ModelLoadError
+
+
+HEADERS = {"X-API-Key": settings.API_KEY}
+
+
+@pytest.mark.asyncio
+class TestInferenceEngine:
+    """Integration tests for engine lifecycle and injection."""
+    
+    async def test_engine_shared_across_requests(self):
+        """Test that the lifespan builds one engine used by every request."""
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                first = await client.post("/api/v1/classify", json={"text": "Lunch at noon?"}, headers=HEADERS)
+                batch = await client.post(
+                    "/api/v1/classify/batch",
+                    json={"emails": [{"id": "1", "text": "Meeting tomorrow"}, {"id": "2", "text": "   "}]},
+                    headers=HEADERS
+                )
+            
+            assert first.status_code == 200
+            assert batch.status_code == 200
+            assert batch.json()["total_processed"] == 1
+            assert batch.json()["errors"][0]["id"] == "2"
+            assert app.state.engine is engine
+            assert engine.stats()["batcher"]["items"] >= 1
+        
+        assert app.state.engine is None
+    
+    async def test_requests_without_engine_are_rejected(self):
+        """Test that requests outside the lifespan get a 503."""
+        app.state.engine = None
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/v1/classify", json={"text": "Hello"}, headers=HEADERS)
+        
+        assert response.status_code == 503
+    
+    async def test_startup_fails_without_artifacts(self, monkeypatch):
+        """Test that missing artifacts abort startup."""
+        monkeypatch.setattr(model_manager, "_bundle", None)
+        monkeypatch.setattr(settings, "MODEL_PATH", "missing/spam.pkl")
+        
+        with pytest.raises(ModelLoadError):
+            async with app.router.lifespan_context(app):
+                pass
+    
+    async def test_admin_reload_swaps_predictor(self):
+        """Test that the admin endpoint publishes a new predictor."""
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            old_predictor = engine.predictor
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post("/api/v1/admin/reload", headers=HEADERS)
+                follow_up = await client.post("/api/v1/classify", json={"text": "Lunch at noon?"}, headers=HEADERS)
+            
+            assert response.status_code == 200
+            assert response.json()["status"] == "reloaded"
+            assert engine.predictor is not old_predictor
+            assert follow_up.status_code == 200
+    
+    async def test_reload_recycles_process_pool_on_event_loop(self, monkeypatch):
+        """Test that a reload from a worker thread swaps the process pool on the loop."""
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            recycled = []
+            monkeypatch.setattr(engine.executor, "kind", "process")
+            monkeypatch.setattr(engine.executor, "recycle", lambda: recycled.append(threading.get_ident()))
+            
+            await asyncio.to_thread(engine._on_reload, model_manager.bundle)
+            await asyncio.sleep(0)
+            
+            assert recycled == [threading.get_ident()]
+    
+    async def test_artifact_directory_stamped_by_manifest(self, monkeypatch, tmp_path):
+        """Test that the watcher sees artifact exports when VECTORIZER_PATH does not exist."""
+        from api.services.engine import InferenceEngine
+        (tmp_path / "meta.json").write_text("{}")
+        monkeypatch.setattr(settings, "MODEL_PATH", str(tmp_path))
+        monkeypatch.setattr(settings, "VECTORIZER_PATH", str(tmp_path / "missing.pkl"))
+        
+        before = InferenceEngine._artifact_stamp()
+        (tmp_path / "meta.json").write_text('{"format": 2}')
+        after = InferenceEngine._artifact_stamp()
+        
+        assert None not in before and after != before
+    
+    async def test_admin_reload_requires_api_key(self):
+        """Test that reload is not reachable anonymously."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/v1/admin/reload")
+        
+        assert response.status_code == 401
+    
+    async def test_unknown_model_version_header(self):
+        """Test that requesting an unregistered version is a client error."""
+        async with app.router.lifespan_context(app):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/classify",
+                    json={"text": "Lunch at noon?"},
+                    headers={**HEADERS, "X-Model-Version": "9.9"}
+                )
+                info = await client.get("/api/v1/info")
+        
+        assert response.status_code == 400
+        assert info.json()["resident_versions"][0]["is_default"] is True
+    
+    async def test_explain_endpoint_caches_by_content(self):
+        """Test that explanations carry offsets and repeats are served from cache."""
+        text = "WIN a FREE prize now, call to claim your free cash"
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                first = await client.post("/api/v1/explain", json={"text": text, "top_k": 3}, headers=HEADERS)
+                second = await client.post("/api/v1/explain", json={"text": text, "top_k": 3}, headers=HEADERS)
+                anonymous = await client.post("/api/v1/explain", json={"text": text})
+            
+            assert first.status_code == 200
+            assert first.json()["cached"] is False
+            assert second.json()["cached"] is True
+            assert engine.stats()["explain_cache"]["hits"] == 1
+            assert anonymous.status_code == 401
+            
+            tokens = first.json()["spam_tokens"] + first.json()["ham_tokens"]
+            assert len(first.json()["spam_tokens"]) <= 3
+            for entry in tokens:
+                for start, end in entry["offsets"]:
+                    assert text[start:end].lower() == entry["token"]
+    
+    async def test_repeated_messages_served_from_cache(self, monkeypatch):
+        """Test that /classify and /classify/batch share the result cache and reload invalidates it."""
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            calls = []
+            original = engine.executor.submit
+            
+            async def counting_submit(method, *args, **kwargs):
+                calls.append((method, args))
+                return await original(method, *args, **kwargs)
+            
+            monkeypatch.setattr(engine.executor, "submit", counting_submit)
+            text = "Claim your FREE prize now"
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                first = await client.post("/api/v1/classify", json={"text": text}, headers=HEADERS)
+                batch = await client.post(
+                    "/api/v1/classify/batch",
+                    json={"emails": [{"id": "1", "text": text}, {"id": "2", "text": "See you at lunch"}]},
+                    headers=HEADERS
+                )
+                scored = [args[0] for method, args in calls if method == "predict_batch"]
+                await client.post("/api/v1/admin/reload", headers=HEADERS)
+                after_reload = await client.post("/api/v1/classify", json={"text": text}, headers=HEADERS)
+                stats = await client.get("/api/v1/admin/stats", headers=HEADERS)
+            
+            assert first.status_code == 200 and batch.status_code == 200
+            assert batch.json()["results"][0]["result"]["spam_probability"] == first.json()["spam_probability"]
+            # Only the new message in the batch reached the predictor
+            assert scored[-1] == ["See you at lunch"]
+            assert after_reload.status_code == 200
+            cache = stats.json()["result_cache"]
+            assert cache["hits"] == 1 and cache["misses"] == 3
+    
+    async def test_near_duplicates_reuse_verdict(self, monkeypatch):
+        """Test that a near-duplicate message is answered without scoring when reuse is on."""
+        monkeypatch.setattr(settings, "NEAR_DUP_MAX_ENTRIES", 100)
+        monkeypatch.setattr(settings, "NEAR_DUP_MIN_CONFIDENCE", 0.0)
+        monkeypatch.setattr(settings, "NEAR_DUP_VERIFY_RATE", 0.0)
+        template = (
+            "Dear {}, you have been selected to receive a free gift card worth 500 dollars, "
+            "click the link below to claim your reward before it expires tonight"
+        )
+        # Threads that clean message text
+        cleaning_threads = set()
+        for name in ("clean_texts", "process"):
+            clean = getattr(text_processor, name)
+            monkeypatch.setattr(
+                text_processor, name,
+                lambda value, clean=clean: cleaning_threads.add(threading.current_thread()) or clean(value)
+            )
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                first = await client.post("/api/v1/classify", json={"text": template.format("John")}, headers=HEADERS)
+                second = await client.post("/api/v1/classify", json={"text": template.format("Mary")}, headers=HEADERS)
+            
+            assert first.status_code == 200 and second.status_code == 200
+            assert second.json()["is_spam"] == first.json()["is_spam"]
+            stats = engine.stats()["near_duplicates"]
+            assert stats["lookups"] == 2 and stats["hits"] == 1
+            assert cleaning_threads and threading.current_thread() not in cleaning_threads
+    
+    async def test_near_duplicates_need_thread_executor(self, monkeypatch):
+        """Test that reuse with process workers, which would each hold a copy of the index, is rejected."""
+        from api.services.engine import InferenceEngine
+        from src.models.predictor import SpamPredictor
+        from src.utils.exceptions import ConfigurationError
+        monkeypatch.setattr(settings, "NEAR_DUP_MAX_ENTRIES", 100)
+        monkeypatch.setattr(settings, "INFERENCE_EXECUTOR", "process")
+        
+        with pytest.raises(ConfigurationError):
+            InferenceEngine(SpamPredictor(*model_manager.load_models()))
+    
+    async def test_campaigns_endpoint(self, monkeypatch, serve_trained_model):
+        """Test that spam verdicts, cached ones included, feed /api/v1/campaigns without recleaning."""
+        monkeypatch.setattr(settings, "CAMPAIGN_MIN_SIZE", 0.0)
+        text = (
+            "Congratulations you have won a free cruise to the Bahamas, call now to "
+            "claim your prize before the offer expires tonight"
+        )
+        async with app.router.lifespan_context(app):
+            engine = app.state.engine
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                first = await client.post("/api/v1/classify", json={"text": text}, headers=HEADERS)
+                engine.campaigns.flush()
+                # Repeats come from the result cache with their fingerprint
+                cleaned = []
+                monkeypatch.setattr(text_processor, "clean_text", lambda value: cleaned.append(value))
+                for _ in range(2):
+                    await client.post("/api/v1/classify", json={"text": text}, headers=HEADERS)
+                engine.campaigns.flush()
+                response = await client.get("/api/v1/campaigns", headers=HEADERS)
+                unauthorized = await client.get("/api/v1/campaigns")
+            
+            assert first.json()["is_spam"] and "simhash" not in first.json()
+            assert cleaned == []
+            assert response.status_code == 200
+            assert unauthorized.status_code in (401, 403)
+            body = response.json()
+            assert body["clusters"][0]["total_messages"] == 3
+            assert body["clusters"][0]["exemplar"].startswith("congratulations")
+            assert body["tracked_clusters"] == 1 and body["memory_bytes"] > 0
@@ -5,6 +5,7 @@ Integration tests for health and info endpoints.
 import pytest
 from httpx import AsyncClient
 from api.main import app
+from src.config.settings import settings
 
 
 @pytest.mark.asyncio
@@ -23,6 +24,30 @@ class TestHealthEndpoints:
         assert "timestamp" in data
         assert data["status"] == "healthy"
     
+    @pytest.mark.parametrize("answered, expected", [(True, 200), (False, 503)])
+    async def test_health_pings_transformer_workers(self, monkeypatch, answered, expected):
+        """Test that /health round-trips a ping through the worker pool."""
+        class StubPool:
+            def __init__(self):
+                self.timeouts = []
+            
+            def ping(self, timeout=5.0):
+                self.timeouts.append(timeout)
+                return answered
+            
+            def stats(self):
+                return {}
+        
+        async with app.router.lifespan_context(app):
+            pool = StubPool()
+            monkeypatch.setattr(app.state.engine.predictor, "transformer", pool, raising=False)
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.get("/health")
+        
+        assert response.status_code == expected
+        assert response.json()["status"] == ("healthy" if answered else "unhealthy")
+        assert pool.timeouts == [settings.TRANSFORMER_WORKER_PING_TIMEOUT_SECONDS]
+    
     async def test_api_info(self):
         """Test API info endpoint."""
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -36,6 +61,7 @@ class TestHealthEndpoints:
         assert "model_version" in data
         assert "model_loaded" in data
         assert "supported_features" in data
+        assert data["runtime"]["threads_per_worker"] >= 1
     
     async def test_root_endpoint(self):
         """Test root endpoint."""
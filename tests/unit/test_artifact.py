@@ -0,0 +1,129 @@
+"""
+Unit tests for the memory-mapped model artifact.
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from src.models.artifact import export_artifact, is_artifact, load_artifact
+from src.models.predictor import SpamPredictor
+from src.preprocessing.featurizer import HashingFeaturizer
+from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import ConfigurationError, ModelLoadError
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory, trained_model):
+    """Export the trained model once and map it back."""
+    model, vectorizer, _ = trained_model
+    directory = export_artifact(model, vectorizer, tmp_path_factory.mktemp("models") / "compact", "test")
+    return load_artifact(directory)
+
+
+class TestArtifact:
+    """Tests for export_artifact/load_artifact."""
+    
+    def test_export_writes_manifest(self, artifact):
+        """Test that the manifest records format, version and digest."""
+        _, _, meta = artifact
+        assert meta["format"] == "spam-nb-mmap/2"
+        assert meta["version"] == "test"
+        assert len(meta["digest"]) == 64
+    
+    def test_arrays_are_memory_mapped(self, artifact):
+        """Test that weights and vocabulary are mapped, not copied."""
+        model, vectorizer, _ = artifact
+        assert isinstance(model.feature_log_prob_t, np.memmap)
+        assert isinstance(vectorizer.index.blob, np.memmap)
+        assert model.feature_log_prob_t.flags.c_contiguous
+    
+    def test_transform_matches_sklearn(self, artifact, trained_model):
+        """Test that the compact vectorizer reproduces the fitted vectorizer."""
+        _, reference, texts = trained_model
+        _, vectorizer, _ = artifact
+        cleaned = [text_processor.clean_text(text) for text in texts[:300]] + ["", "zzzunknownzzz " * 3]
+        
+        expected = reference.transform(cleaned)
+        actual = vectorizer.transform(cleaned)
+        
+        assert actual.shape == expected.shape
+        np.testing.assert_array_equal(actual.indptr, expected.indptr)
+        np.testing.assert_array_equal(actual.indices, expected.indices)
+        np.testing.assert_allclose(actual.data, expected.data, rtol=1e-12)
+    
+    def test_predict_proba_matches_sklearn(self, artifact, trained_model):
+        """Test that artifact scoring matches the original estimator."""
+        reference_model, reference_vectorizer, texts = trained_model
+        model, vectorizer, _ = artifact
+        cleaned = [text_processor.clean_text(text) for text in texts[:300]]
+        
+        expected = reference_model.predict_proba(reference_vectorizer.transform(cleaned))
+        actual = model.predict_proba(vectorizer.transform(cleaned))
+        
+        np.testing.assert_allclose(actual, expected, atol=1e-10)
+        np.testing.assert_array_equal(model.classes_, reference_model.classes_)
+    
+    def test_predictor_uses_artifact(self, artifact, sample_spam_email):
+        """Test that SpamPredictor serves an artifact in place."""
+        model, vectorizer, _ = artifact
+        predictor = SpamPredictor(model, vectorizer)
+        
+        assert predictor._nb_weights[0] is model.feature_log_prob_t
+        result = predictor.predict(sample_spam_email)
+        assert result["is_spam"] is True
+    
+    def test_non_ascii_and_long_tokens(self, tmp_path):
+        """Test lookups for multi-byte and over-long tokens."""
+        docs = ["café crème brûlée", "plain words here", "café again"]
+        vectorizer = TfidfVectorizer().fit(docs)
+        model = MultinomialNB().fit(vectorizer.transform(docs), [1, 0, 1])
+        _, compact, _ = load_artifact(export_artifact(model, vectorizer, tmp_path / "a"))
+        
+        probe = ["café " + "x" * 200, "brûlée words"]
+        np.testing.assert_allclose(compact.transform(probe).toarray(), vectorizer.transform(probe).toarray())
+    
+    def test_unsupported_vectorizer_rejected(self, tmp_path):
+        """Test that vectorizers the artifact cannot reproduce are refused."""
+        docs = ["one two three", "two three four"]
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(docs)
+        model = MultinomialNB().fit(vectorizer.transform(docs), [0, 1])
+        
+        with pytest.raises(ConfigurationError):
+            export_artifact(model, vectorizer, tmp_path / "a")
+    
+    def test_reexport_replaces_directory(self, tmp_path, trained_model):
+        """Test that exporting over an existing artifact swaps it in place."""
+        model, vectorizer, _ = trained_model
+        directory = tmp_path / "compact"
+        export_artifact(model, vectorizer, directory, "1")
+        export_artifact(model, vectorizer, directory, "2")
+        
+        assert is_artifact(directory)
+        assert load_artifact(directory)[2]["version"] == "2"
+        assert [path.name for path in tmp_path.iterdir()] == ["compact"]
+    
+    def test_bad_format_rejected(self, tmp_path):
+        """Test that an unknown manifest format fails to load."""
+        (tmp_path / "meta.json").write_text('{"format": "other"}')
+        with pytest.raises(ModelLoadError):
+            load_artifact(tmp_path)
+    
+    def test_hashing_artifact_round_trip(self, tmp_path, trained_model):
+        """Test that a hashing model exports without a vocabulary and scores identically."""
+        _, _, texts = trained_model
+        cleaned = text_processor.clean_texts(texts[:1000])
+        labels = [int("free" in text or "win" in text) for text in cleaned]
+        vectorizer = HashingVectorizer(n_features=2 ** 12, alternate_sign=False)
+        model = MultinomialNB(alpha=0.01).fit(vectorizer.transform(cleaned), labels)
+        
+        compact_model, compact_vectorizer, meta = load_artifact(export_artifact(model, vectorizer, tmp_path / "h"))
+        
+        assert meta["vectorizer"]["kind"] == "hashing"
+        assert isinstance(compact_vectorizer, HashingFeaturizer)
+        np.testing.assert_allclose(
+            compact_model.predict_proba(compact_vectorizer.transform(cleaned)),
+            model.predict_proba(vectorizer.transform(cleaned)),
+            atol=1e-10
+        )
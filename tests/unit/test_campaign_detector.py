@@ -0,0 +1,85 @@
+"""
+Unit tests for the streaming spam campaign detector.
+"""
+
+from api.services.campaign_detector import CampaignDetector
+from src.preprocessing.text_processor import text_processor
+from src.utils.near_duplicate import simhash
+
+
+CAMPAIGN = (
+    "Dear {}, congratulations! You have been selected to receive a free gift card "
+    "worth 500 dollars. Click the link below to claim your reward before it expires tonight."
+)
+OTHER = (
+    "URGENT {}: your account has been suspended, verify your banking details within "
+    "24 hours at the secure page or lose access to your funds permanently."
+)
+
+
+class TestCampaignDetector:
+    """Tests for CampaignDetector."""
+    
+    def test_variants_grouped_into_one_cluster(self):
+        """Test that variants of a message form one cluster with a decayed size."""
+        detector = CampaignDetector(max_clusters=10, half_life_seconds=60)
+        for index, name in enumerate(["John", "Mary", "Ahmed", "Li"]):
+            detector.observe(CAMPAIGN.format(name), now=1000.0 + index)
+        detector.observe(OTHER.format("customer"), now=1003.0)
+        
+        top = detector.top_clusters(min_size=0, now=1003.0)
+        
+        assert [cluster["total_messages"] for cluster in top] == [4, 1]
+        assert 3.9 < top[0]["size"] < 4.0
+        assert top[0]["exemplar"].startswith("dear john")
+        assert top[0]["first_seen"] == 1000.0 and top[0]["last_seen"] == 1003.0
+        # One half-life later the size has halved
+        assert abs(detector.top_clusters(min_size=0, now=1063.0)[0]["size"] - top[0]["size"] / 2) < 1e-9
+    
+    def test_idle_clusters_leave_window(self):
+        """Test that clusters idle for longer than the window are not reported or joined."""
+        detector = CampaignDetector(max_clusters=10, window_seconds=100)
+        detector.observe(CAMPAIGN.format("John"), now=0.0)
+        
+        assert detector.top_clusters(min_size=0, now=101.0) == []
+        detector.observe(CAMPAIGN.format("Mary"), now=101.0)
+        assert [cluster["total_messages"] for cluster in detector.top_clusters(min_size=0, now=101.0)] == [1]
+    
+    def test_memory_bounded(self):
+        """Test that the weakest clusters are swept when every slot is taken."""
+        detector = CampaignDetector(max_clusters=4)
+        for _ in range(3):
+            detector.observe(CAMPAIGN.format("John"), now=0.0)
+        for index in range(10):
+            detector.observe(f"message number {index} " + " ".join(f"w{index}x{word}" for word in range(10)), now=1.0)
+        
+        stats = detector.stats()
+        top = detector.top_clusters(min_size=0, now=1.0)
+        
+        assert stats["tracked_clusters"] <= 4 and stats["evicted"] > 0
+        assert top[0]["total_messages"] == 3
+        assert len(detector._buckets) <= 4 * 8
+    
+    def test_short_messages_ignored(self):
+        """Test that messages too short to fingerprint are not counted."""
+        detector = CampaignDetector(max_clusters=4)
+        detector.observe("win now")
+        
+        assert detector.stats()["observed"] == 0
+    
+    def test_submit_applies_in_background_and_drops_overflow(self):
+        """Test that submitted messages are applied off the caller and a full queue drops."""
+        detector = CampaignDetector(max_clusters=4, queue_size=1)
+        fingerprint = simhash(text_processor.clean_text(CAMPAIGN.format("John")))
+        detector._pending.put(None)
+        detector._feeder = object()
+        detector.submit(CAMPAIGN.format("John"), fingerprint)
+        assert detector.stats()["dropped"] == 1
+        
+        detector = CampaignDetector(max_clusters=4)
+        for name in ["John", "Mary"]:
+            detector.submit(CAMPAIGN.format(name), simhash(text_processor.clean_text(CAMPAIGN.format(name))))
+        detector.close()
+        
+        assert detector.stats()["observed"] == 2 and detector.stats()["pending"] == 0
+        assert detector.top_clusters(min_size=0)[0]["total_messages"] == 2
@@ -0,0 +1,136 @@
+"""
+Unit tests for prediction explanations.
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from src.models.predictor import SpamPredictor
+from src.preprocessing.text_processor import text_processor
+from src.utils.explainability import explain_by_perturbation, explain_prediction
+
+
+@pytest.fixture(scope="module")
+def predictor(trained_model):
+    """Predictor over the fitted spam.csv model."""
+    model, vectorizer, _ = trained_model
+    return SpamPredictor(model, vectorizer, backend="sklearn")
+
+
+class TestAttribution:
+    """Tests for the analytic Naive Bayes attributions."""
+    
+    def test_matches_leave_one_out(self, predictor, trained_model):
+        """Test that each contribution equals the re-predicted probability drop."""
+        _, _, texts = trained_model
+        for text in texts[:40]:
+            cleaned = text_processor.clean_text(text)
+            tokens, contributions, probability = predictor.attributor.attribute(cleaned)
+            
+            assert probability == pytest.approx(predictor._score_cleaned([cleaned])[0][1], abs=1e-12)
+            perturbed = [re.sub(r"(?u)\b" + re.escape(token) + r"\b", " ", cleaned, flags=re.I) for token in tokens]
+            if perturbed:
+                expected = probability - predictor._score_cleaned(perturbed)[:, 1]
+                np.testing.assert_allclose(contributions, expected, atol=1e-9)
+    
+    def test_empty_text(self, predictor):
+        """Test that a text without known tokens has no attributions."""
+        tokens, contributions, _ = predictor.attributor.attribute("zzqx")
+        assert tokens == [] and len(contributions) == 0
+    
+    def test_explain_prediction_uses_attributor(self, predictor):
+        """Test the fast path keeps the (word, score) output shape."""
+        text = "Congratulations you won a free prize, call now to claim your cash"
+        explanation = explain_prediction(text, predictor.predict)
+        
+        assert 0 < len(explanation) <= 10
+        assert all(isinstance(word, str) and isinstance(score, float) for word, score in explanation)
+        assert [abs(score) for _, score in explanation] == sorted((abs(score) for _, score in explanation), reverse=True)
+        # Leave-one-out semantics: the strongest spam word agrees with perturbation
+        perturbation = explain_by_perturbation(text, predictor.predict_batch)
+        assert explanation[0][0] == perturbation[0][0]
+        assert explanation[0][1] == pytest.approx(perturbation[0][1], abs=1e-6)
+
+
+class TestPerturbation:
+    """Tests for the model-agnostic fallback."""
+    
+    @staticmethod
+    def keyword_model(text):
+        """Toy predictor: each 'free' adds spam probability."""
+        if not text.strip():
+            raise ValueError("empty")
+        return {"spam_probability": min(1.0, 0.2 + 0.3 * len(re.findall(r"\bfree\b", text, re.I)))}
+    
+    def test_plain_function(self):
+        """Test that a plain predict function is explained by perturbation."""
+        explanation = explain_prediction("FREE money, free!", self.keyword_model)
+        
+        assert explanation == [("free", pytest.approx(0.6))]
+    
+    def test_time_budget_stops_scoring(self):
+        """Test that only the first batch is scored once the budget is spent."""
+        calls = []
+        
+        def predict_batch(texts):
+            calls.append(len(texts))
+            return [self.keyword_model(text) for text in texts]
+        
+        text = " ".join(f"word{index}" for index in range(200)) + " free"
+        explain_by_perturbation(text, predict_batch, time_budget_ms=0)
+        
+        assert calls == [64]
+
+
+class TestPredictorExplain:
+    """Tests for SpamPredictor.explain."""
+    
+    def test_split_and_offsets(self, predictor):
+        """Test that tokens are split by direction with spans into the raw text."""
+        text = "Dear team, FREE entry! Reply WIN to claim. Meeting notes attached, free."
+        result = predictor.explain(text, top_k=5)
+        
+        assert all(entry["contribution"] > 0 for entry in result["spam_tokens"])
+        assert all(entry["contribution"] < 0 for entry in result["ham_tokens"])
+        assert len(result["spam_tokens"]) <= 5 and len(result["ham_tokens"]) <= 5
+        assert result["spam_probability"] == pytest.approx(predictor.predict(text)["spam_probability"])
+        free = next(entry for entry in result["spam_tokens"] + result["ham_tokens"] if entry["token"] == "free")
+        assert [text[start:end] for start, end in free["offsets"]] == ["FREE", "free"]
+    
+    def test_placeholder_offsets(self, predictor):
+        """Test that placeholder tokens point at the URL/phone they replaced."""
+        text = "Claim now at http://win.example/prize or call 0906170146 to claim"
+        offsets = predictor._token_offsets(text, ["url", "phone", "claim"])
+        
+        assert [text[start:end] for start, end in offsets["url"]] == ["http://win.example/prize"]
+        assert [text[start:end] for start, end in offsets["phone"]] == ["0906170146"]
+        assert [text[start:end] for start, end in offsets["claim"]] == ["Claim", "claim"]
+    
+    def test_perturbation_fallback_single_class_model(self, trained_model):
+        """Test that a non-NB model fitted on one class is explained without errors."""
+        from sklearn.dummy import DummyClassifier
+        
+        _, vectorizer, texts = trained_model
+        features = vectorizer.transform(text_processor.clean_texts(texts[:50]))
+        model = DummyClassifier(strategy="most_frequent").fit(features, [0] * 50)
+        predictor = SpamPredictor(model, vectorizer, backend="sklearn")
+        batches = []
+        score_batch = predictor.predict_batch
+        predictor.predict_batch = lambda texts: batches.append(texts) or score_batch(texts)
+        
+        result = predictor.explain("Free entry, call now")
+        
+        # The original text is scored once, with its perturbations
+        assert len(batches) == 1 and batches[0][0] == "Free entry, call now"
+        assert predictor.attributor is None
+        assert result["is_spam"] is False
+        assert result["spam_probability"] == predictor.predict("Free entry, call now")["spam_probability"]
+    
+    def test_invalid_text(self, predictor):
+        """Test that empty text is a validation error."""
+        from src.utils.exceptions import ValidationError
+        
+        with pytest.raises(ValidationError):
+            predictor.explain("   ")
@@ -0,0 +1,88 @@
+"""
+Unit tests for vocabulary pruning.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.preprocessing.text_processor import text_processor
+from src.training.feature_selection import prune_pipeline, rank_features, select_vocabulary
+from src.training.train import load_data, prepare_data
+from tests.conftest import project_root
+
+
+@pytest.fixture(scope="module")
+def labelled():
+    """Cleaned spam.csv texts and labels."""
+    df = prepare_data(load_data(str(project_root / "spam.csv")))
+    return text_processor.clean_texts(df['text'].astype(str).tolist()), df['target_enc'].astype(int).to_numpy()
+
+
+class TestFeatureSelection:
+    """Tests for feature ranking and vocabulary search."""
+    
+    @pytest.mark.parametrize("method", ["chi2", "log_odds"])
+    def test_ranking_is_permutation(self, method, trained_model, labelled):
+        """Test that every feature is ranked exactly once."""
+        model, vectorizer, _ = trained_model
+        ranking = rank_features(model, vectorizer, *labelled, method=method)
+        
+        assert sorted(ranking.tolist()) == list(range(len(vectorizer.vocabulary_)))
+    
+    def test_unknown_method(self, trained_model, labelled):
+        """Test that an unknown ranking method is rejected."""
+        model, vectorizer, _ = trained_model
+        with pytest.raises(ValueError):
+            rank_features(model, vectorizer, *labelled, method="mutual_info")
+    
+    def test_pruned_pipeline_keeps_idf(self, trained_model, labelled):
+        """Test that kept terms keep their IDF weights."""
+        _, vectorizer, _ = trained_model
+        terms = ["call", "free", "meeting", "win"]
+        model, pruned = prune_pipeline(vectorizer, terms, *labelled)
+        
+        assert pruned.get_feature_names_out().tolist() == terms
+        np.testing.assert_allclose(pruned.idf_, vectorizer.idf_[[vectorizer.vocabulary_[t] for t in terms]])
+        assert model.feature_log_prob_.shape == (2, len(terms))
+    
+    def test_selects_smallest_size_within_tolerance(self, trained_model, labelled):
+        """Test that the search reports every candidate and picks the smallest within budget."""
+        model, vectorizer, _ = trained_model
+        texts, labels = labelled
+        pruned_model, pruned, report = select_vocabulary(
+            model, vectorizer, texts, labels, f1_tolerance=0.05, candidate_sizes=[100, 500], n_folds=3
+        )
+        
+        assert [row["size"] for row in report["candidates"]] == [100, 500, 3000]
+        assert report["n_folds"] == 3 and all(row["f1_std"] >= 0 for row in report["candidates"])
+        within = [row["size"] for row in report["candidates"] if row["f1"] >= report["full_f1"] - 0.05]
+        assert report["selected_size"] == min(within)
+        assert len(pruned.vocabulary_) == report["selected_size"]
+        assert pruned_model.feature_log_prob_.shape[1] == report["selected_size"]
+        assert all(row["artifact_bytes"] > 0 and row["load_ms"] >= 0 for row in report["candidates"])
+    
+    def test_rejects_vocabulary_free_vectorizer(self, labelled):
+        """Test that hashing pipelines cannot be pruned."""
+        from sklearn.feature_extraction.text import HashingVectorizer
+        
+        with pytest.raises(ValueError):
+            select_vocabulary(None, HashingVectorizer(), [], [])
+    
+    def test_pruned_pipeline_not_saved_outside_tolerance(self, tmp_path, monkeypatch, trained_model, labelled):
+        """Test that a pruned pipeline failing the test-set tolerance is not written out."""
+        from src.training import train
+        
+        model, vectorizer, _ = trained_model
+        texts, labels = labelled
+        # A search that settled on a vocabulary far too small
+        tiny = prune_pipeline(vectorizer, ["call", "free"], texts, labels)
+        monkeypatch.setattr(train, "select_vocabulary", lambda *args, **kwargs: (*tiny, {"selected_size": 2}))
+        (tmp_path / "spam_v2_pruned.pkl").write_bytes(b"stale")
+        
+        train.save_pruned_pipeline(model, vectorizer, texts, labels, texts[:1000], labels[:1000], tmp_path, "v2", 0.01)
+        
+        report = json.loads((tmp_path / "feature_selection_v2.json").read_text())
+        assert report["deployable"] is False
+        assert [path.name for path in tmp_path.iterdir()] == ["feature_selection_v2.json"]
@@ -0,0 +1,109 @@
+"""
+Unit tests for the batch featurization engine.
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+
+from src.preprocessing.featurizer import Featurizer, HashingFeaturizer, featurizer_for
+from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import ConfigurationError
+
+
+def assert_bit_identical(actual, expected):
+    """Assert two CSR matrices have identical structure and values."""
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual.indptr, expected.indptr)
+    np.testing.assert_array_equal(actual.indices, expected.indices)
+    assert actual.data.tobytes() == expected.data.tobytes()
+
+
+class TestFeaturizer:
+    """Tests for Featurizer."""
+    
+    def test_matches_vectorizer_on_corpus(self, trained_model):
+        """Test bit-for-bit parity with the fitted TF-IDF vectorizer."""
+        _, vectorizer, texts = trained_model
+        cleaned = text_processor.clean_texts(texts)
+        
+        featurizer = Featurizer.from_vectorizer(vectorizer)
+        assert_bit_identical(featurizer.transform(cleaned), vectorizer.transform(cleaned))
+    
+    @pytest.mark.parametrize("options", [
+        {"sublinear_tf": True},
+        {"binary": True},
+        {"norm": "l1", "use_idf": False},
+        {"norm": None, "smooth_idf": False},
+        {"stop_words": "english", "lowercase": False},
+        {"dtype": np.float32},
+    ])
+    def test_matches_vectorizer_options(self, options, trained_model):
+        """Test parity across TF-IDF options."""
+        _, _, texts = trained_model
+        cleaned = text_processor.clean_texts(texts[:500])
+        vectorizer = TfidfVectorizer(max_features=2000, **options).fit(cleaned)
+        
+        featurizer = Featurizer.from_vectorizer(vectorizer)
+        assert_bit_identical(featurizer.transform(cleaned), vectorizer.transform(cleaned))
+    
+    def test_matches_count_vectorizer(self):
+        """Test parity with a plain CountVectorizer."""
+        docs = ["spam spam eggs", "eggs and ham", "", "HAM ham Ham"]
+        vectorizer = CountVectorizer().fit(docs)
+        
+        assert_bit_identical(Featurizer.from_vectorizer(vectorizer).transform(docs), vectorizer.transform(docs))
+    
+    def test_empty_and_unknown_documents(self, trained_model):
+        """Test rows with no in-vocabulary tokens."""
+        _, vectorizer, _ = trained_model
+        docs = ["", "qqqzzz xxyyzz", "   "]
+        
+        result = Featurizer.from_vectorizer(vectorizer).transform(docs)
+        assert result.shape == (3, len(vectorizer.vocabulary_))
+        assert result.nnz == 0
+    
+    def test_unsupported_vectorizer_rejected(self):
+        """Test that non-unigram vectorizers are refused."""
+        vectorizer = TfidfVectorizer(analyzer="char").fit(["abc", "bcd"])
+        with pytest.raises(ConfigurationError):
+            Featurizer.from_vectorizer(vectorizer)
+
+
+class TestHashingFeaturizer:
+    """Tests for HashingFeaturizer."""
+    
+    @pytest.mark.parametrize("options", [
+        {},
+        {"alternate_sign": False},
+        {"binary": True, "norm": "l1"},
+        {"stop_words": "english", "n_features": 64},
+        {"lowercase": False, "norm": None},
+    ])
+    def test_matches_hashing_vectorizer(self, options, trained_model):
+        """Test bit-for-bit parity with HashingVectorizer, including collisions."""
+        _, _, texts = trained_model
+        cleaned = text_processor.clean_texts(texts[:500]) + ["", "café crème"]
+        vectorizer = HashingVectorizer(**options)
+        
+        featurizer = featurizer_for(vectorizer)
+        assert isinstance(featurizer, HashingFeaturizer)
+        assert_bit_identical(featurizer.transform(cleaned), vectorizer.transform(cleaned))
+    
+    @pytest.mark.parametrize("binary", [False, True])
+    def test_cancelled_collisions_match_hashing_vectorizer(self, binary):
+        """Test that opposite-signed tokens cancelling in one bucket match sklearn."""
+        # "w0" and "w110" hash to the same of 16 buckets with opposite signs
+        documents = ["w0 w110 w199", "w0 w110", "w0"]
+        vectorizer = HashingVectorizer(n_features=16, binary=binary, norm=None)
+        
+        expected = vectorizer.transform(documents)
+        # The cancelled bucket is stored: 0.0, or 1 when binary
+        assert expected[[1]].nnz == 1
+        assert_bit_identical(featurizer_for(vectorizer).transform(documents), expected)
+    
+    def test_featurizer_for_passes_featurizers_through(self):
+        """Test that an existing featurizer is returned unchanged."""
+        featurizer = HashingFeaturizer(n_features=32, token_pattern=r"(?u)\b\w\w+\b")
+        assert featurizer_for(featurizer) is featurizer
@@ -0,0 +1,98 @@
+"""
+Unit tests for InferenceExecutor.
+"""
+
+import asyncio
+import gc
+import threading
+import time
+import weakref
+import pytest
+
+from api.services import inference_executor
+from api.services.inference_executor import InferenceExecutor
+from src.utils.exceptions import ConfigurationError, ServiceOverloadedError
+
+
+class EchoPredictor:
+    """Predictor stub recording which thread served each call."""
+    
+    def __init__(self, gate=None):
+        self.gate = gate
+    
+    def predict(self, text):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return {"text": text, "thread": threading.current_thread().name}
+
+
+def echo_predictor_factory(version=None):
+    """Module-level factory so process-pool workers can unpickle it."""
+    return EchoPredictor()
+
+
+@pytest.mark.asyncio
+class TestInferenceExecutor:
+    """Tests for InferenceExecutor class."""
+    
+    async def test_runs_off_event_loop(self):
+        """Test that calls execute in a pool thread."""
+        executor = InferenceExecutor(echo_predictor_factory, max_workers=2)
+        try:
+            result = await executor.submit("predict", "hello")
+        finally:
+            executor.shutdown()
+        
+        assert result["text"] == "hello"
+        assert result["thread"].startswith("inference")
+    
+    async def test_rejects_when_full(self):
+        """Test that submissions beyond capacity fail fast."""
+        gate = threading.Event()
+        predictor = EchoPredictor(gate)
+        executor = InferenceExecutor(lambda version: predictor, max_workers=1, max_queue=1)
+        try:
+            pending = [asyncio.create_task(executor.submit("predict", str(i))) for i in range(2)]
+            await asyncio.sleep(0.01)
+            
+            with pytest.raises(ServiceOverloadedError):
+                await executor.submit("predict", "overflow")
+            assert executor.stats()["rejected"] == 1
+            
+            gate.set()
+            results = await asyncio.gather(*pending)
+        finally:
+            gate.set()
+            executor.shutdown()
+        
+        assert [r["text"] for r in results] == ["0", "1"]
+        assert executor.stats()["in_flight"] == 0
+    
+    async def test_process_pool(self):
+        """Test that process workers build their own predictor."""
+        executor = InferenceExecutor(echo_predictor_factory, kind="process", max_workers=1)
+        try:
+            result = await executor.submit("predict", "hello")
+        finally:
+            executor.shutdown()
+        
+        assert result["text"] == "hello"
+    
+    async def test_unknown_kind(self):
+        """Test that an unknown executor kind is rejected."""
+        with pytest.raises(ConfigurationError):
+            InferenceExecutor(echo_predictor_factory, kind="gpu")
+    
+    async def test_process_worker_keeps_no_evicted_predictors(self, monkeypatch):
+        """Test that a worker's predictors are freed once its registry drops them."""
+        monkeypatch.setattr(inference_executor, "apply_runtime_limits", lambda: {})
+        monkeypatch.setattr(inference_executor, "_worker_factory", None)
+        resident = {None: EchoPredictor(), "1.0": EchoPredictor()}
+        inference_executor._init_worker(resident.get)
+        
+        _, result = inference_executor._timed_call(None, "predict", ("hello",), time.time(), "1.0")
+        evicted = weakref.ref(resident.pop("1.0"))
+        gc.collect()
+        
+        assert result["text"] == "hello"
+        assert evicted() is None
@@ -0,0 +1,87 @@
+"""
+Unit tests for TokenWeightScorer.
+"""
+
+import pytest
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+
+from src.models.lookup_scorer import TokenWeightScorer
+from src.models.model_loader import model_manager
+from src.models.predictor import SpamPredictor
+from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import ConfigurationError
+
+
+class TestTokenWeightScorer:
+    """Tests for TokenWeightScorer class."""
+    
+    def test_matches_sklearn_probabilities(self, trained_model):
+        """Test that lookup scores match the sklearn pipeline."""
+        model, vectorizer, texts = trained_model
+        scorer = TokenWeightScorer.from_sklearn(model, vectorizer)
+        
+        cleaned = [text_processor.clean_text(t) for t in texts[:500]]
+        expected = model.predict_proba(vectorizer.transform(cleaned))
+        
+        assert np.allclose(scorer.predict_proba(cleaned), expected, atol=1e-9)
+    
+    @pytest.mark.parametrize("vectorizer", [
+        CountVectorizer(),
+        TfidfVectorizer(sublinear_tf=True, norm="l1"),
+        TfidfVectorizer(binary=True, stop_words="english"),
+    ])
+    def test_vectorizer_options(self, trained_model, vectorizer):
+        """Test parity across supported vectorizer configurations."""
+        _, _, texts = trained_model
+        labels = [int("free" in t.lower()) for t in texts[:1000]]
+        X = vectorizer.fit_transform(texts[:1000])
+        model = MultinomialNB().fit(X, labels)
+        scorer = TokenWeightScorer.from_sklearn(model, vectorizer)
+        
+        expected = model.predict_proba(vectorizer.transform(texts[1000:1200]))
+        assert np.allclose(scorer.predict_proba(texts[1000:1200]), expected, atol=1e-9)
+    
+    def test_single_class_model(self):
+        """Test that a one-class model yields a single certain probability."""
+        model, vectorizer = model_manager.load_models()
+        scorer = TokenWeightScorer.from_sklearn(model, vectorizer)
+        
+        assert scorer.predict_proba_one("hello there") == [1.0]
+    
+    def test_unsupported_model(self, trained_model):
+        """Test that non-NB models are rejected."""
+        _, vectorizer, texts = trained_model
+        model = LogisticRegression().fit(vectorizer.transform(texts[:50]), [0, 1] * 25)
+        
+        with pytest.raises(ConfigurationError):
+            TokenWeightScorer.from_sklearn(model, vectorizer)
+    
+    def test_unsupported_vectorizer(self, trained_model):
+        """Test that n-gram vectorizers are rejected."""
+        _, _, texts = trained_model
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        model = MultinomialNB().fit(vectorizer.fit_transform(texts[:50]), [0, 1] * 25)
+        
+        with pytest.raises(ConfigurationError):
+            TokenWeightScorer.from_sklearn(model, vectorizer)
+    
+    def test_predictor_lookup_backend(self, trained_model, sample_spam_email):
+        """Test that SpamPredictor results agree across backends."""
+        model, vectorizer, _ = trained_model
+        lookup = SpamPredictor(model, vectorizer, backend="lookup")
+        reference = SpamPredictor(model, vectorizer, backend="sklearn")
+        
+        assert lookup.backend == "lookup"
+        result = lookup.predict(sample_spam_email)
+        expected = reference.predict(sample_spam_email)
+        assert result["is_spam"] == expected["is_spam"]
+        assert result["spam_probability"] == pytest.approx(expected["spam_probability"], abs=1e-9)
+    
+    def test_predictor_unknown_backend(self, trained_model):
+        """Test that an unknown backend name is rejected."""
+        model, vectorizer, _ = trained_model
+        with pytest.raises(ConfigurationError):
+            SpamPredictor(model, vectorizer, backend="gpu")
@@ -0,0 +1,85 @@
+"""
+Unit tests for MicroBatcher.
+"""
+
+import asyncio
+import pytest
+
+from api.services.micro_batcher import MicroBatcher
+from src.utils.exceptions import ValidationError
+
+
+def fake_predict_batch(calls):
+    """Build a predict_batch stub that records each batch it receives."""
+    def predict_batch(texts):
+        calls.append(list(texts))
+        return [
+            {"error": "Email text cannot be empty", "error_type": "ValidationError"}
+            if not text else {"text": text}
+            for text in texts
+        ]
+    return predict_batch
+
+
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    """Tests for MicroBatcher class."""
+    
+    async def test_concurrent_requests_share_a_batch(self):
+        """Test that concurrent submissions are scored together."""
+        calls = []
+        batcher = MicroBatcher(fake_predict_batch(calls), max_batch_size=8, max_wait_ms=20)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit(f"email {i}") for i in range(5)))
+        finally:
+            await batcher.stop()
+        
+        assert [r["text"] for r in results] == [f"email {i}" for i in range(5)]
+        assert len(calls) == 1
+        assert batcher.stats()["avg_batch_size"] == 5
+    
+    async def test_max_batch_size(self):
+        """Test that batches are flushed once full."""
+        calls = []
+        batcher = MicroBatcher(fake_predict_batch(calls), max_batch_size=2, max_wait_ms=50)
+        await batcher.start()
+        try:
+            await asyncio.gather(*(batcher.submit(f"email {i}") for i in range(5)))
+        finally:
+            await batcher.stop()
+        
+        assert [len(batch) for batch in calls] == [2, 2, 1]
+    
+    async def test_validation_error_is_per_request(self):
+        """Test that an invalid item fails only its own caller."""
+        batcher = MicroBatcher(fake_predict_batch([]), max_wait_ms=20)
+        await batcher.start()
+        try:
+            good, bad = await asyncio.gather(
+                batcher.submit("hello"), batcher.submit(""), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+        
+        assert good == {"text": "hello"}
+        assert isinstance(bad, ValidationError)
+    
+    async def test_batch_failure_propagates(self):
+        """Test that a scoring failure is raised to every caller."""
+        def failing(texts):
+            raise RuntimeError("boom")
+        
+        batcher = MicroBatcher(failing, max_wait_ms=5)
+        await batcher.start()
+        try:
+            with pytest.raises(RuntimeError, match="boom"):
+                await batcher.submit("hello")
+        finally:
+            await batcher.stop()
+    
+    async def test_submit_requires_running(self):
+        """Test that submitting to a stopped batcher fails fast."""
+        batcher = MicroBatcher(fake_predict_batch([]))
+        with pytest.raises(RuntimeError):
+            await batcher.submit("hello")
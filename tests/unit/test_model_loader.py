@@ -2,8 +2,15 @@
 Unit tests for ModelManager.
 """
 
+import json
+import pickle
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.config.settings import settings
 from src.models.model_loader import ModelManager, model_manager
+from src.utils.exceptions import ModelLoadError
 
 
 class TestModelManager:
@@ -49,3 +56,172 @@ class TestModelManager:
         
         assert info["model_loaded"] is True
         assert info["vectorizer_loaded"] is True
+    
+    def test_reload_swaps_bundle(self, tmp_path, monkeypatch, trained_model):
+        """Test that reload publishes a new bundle and notifies listeners."""
+        model, vectorizer, _ = trained_model
+        model_path, vectorizer_path = write_artifacts(tmp_path, model, vectorizer)
+        monkeypatch.setattr(settings, "MODEL_PATH", model_path)
+        monkeypatch.setattr(settings, "VECTORIZER_PATH", vectorizer_path)
+        
+        old_bundle = model_manager.bundle
+        seen = []
+        model_manager.add_reload_listener(seen.append)
+        try:
+            new_model, _ = model_manager.reload_models()
+        finally:
+            model_manager.remove_reload_listener(seen.append)
+            model_manager._bundle = old_bundle
+        
+        assert len(new_model.classes_) == 2
+        assert seen and seen[0].model is new_model
+        assert seen[0].fingerprint != old_bundle.fingerprint
+    
+    def test_failed_reload_keeps_current_model(self, tmp_path, monkeypatch):
+        """Test that a corrupt artifact never replaces the served model."""
+        model_manager.load_models()
+        old_bundle = model_manager.bundle
+        
+        corrupt = tmp_path / "model.pkl"
+        corrupt.write_bytes(b"not a pickle")
+        monkeypatch.setattr(settings, "MODEL_PATH", str(corrupt))
+        
+        with pytest.raises(ModelLoadError):
+            model_manager.reload_models()
+        assert model_manager.bundle is old_bundle
+    
+    def test_incompatible_pair_rejected(self, tmp_path, monkeypatch, trained_model):
+        """Test that the canary check rejects a mismatched model/vectorizer."""
+        model, _, texts = trained_model
+        other = TfidfVectorizer(max_features=50).fit(texts[:100])
+        model_path, vectorizer_path = write_artifacts(tmp_path, model, other)
+        monkeypatch.setattr(settings, "MODEL_PATH", model_path)
+        monkeypatch.setattr(settings, "VECTORIZER_PATH", vectorizer_path)
+        
+        old_bundle = model_manager.bundle
+        with pytest.raises(ModelLoadError, match="Canary"):
+            model_manager.reload_models()
+        assert model_manager.bundle is old_bundle
+    
+    def test_reload_from_mapped_artifact(self, tmp_path, monkeypatch, trained_model):
+        """Test that MODEL_PATH may point at a memory-mapped artifact directory."""
+        from src.models.artifact import export_artifact
+        model, vectorizer, _ = trained_model
+        directory = export_artifact(model, vectorizer, tmp_path / "compact")
+        monkeypatch.setattr(settings, "MODEL_PATH", str(directory))
+        monkeypatch.setattr(settings, "VECTORIZER_PATH", str(tmp_path / "missing.pkl"))
+        
+        old_bundle = model_manager.bundle
+        try:
+            model_manager.reload_models()
+            bundle = model_manager.bundle
+        finally:
+            model_manager._bundle = old_bundle
+        
+        assert bundle.vectorizer_path == str(directory)
+        # Mapped arrays are shared page cache, not private memory
+        assert bundle.footprint_bytes < 100_000
+    
+    def test_concurrent_first_load_reads_once(self, monkeypatch):
+        """Test that simultaneous first loads hit the disk only once."""
+        model_manager.load_models()
+        old_bundle = model_manager.bundle
+        monkeypatch.setattr(model_manager, "_bundle", None)
+        
+        calls = []
+        original = model_manager._load_bundle
+        def counting_load(*args):
+            calls.append(args)
+            return original(*args)
+        monkeypatch.setattr(model_manager, "_load_bundle", counting_load)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: model_manager.load_models(), range(8)))
+        monkeypatch.setattr(model_manager, "_bundle", old_bundle)
+        
+        assert len(calls) == 1
+        assert all(result[0] is results[0][0] for result in results)
+
+
+
+class TestModelRegistry:
+    """Tests for multi-version residency in ModelManager."""
+    
+    @pytest.fixture
+    def registry(self, tmp_path, monkeypatch, trained_model):
+        """Register versions 1.0 and 1.1 backed by the trained model."""
+        model, vectorizer, _ = trained_model
+        versions = {}
+        for version in ("1.0", "1.1"):
+            directory = tmp_path / version
+            directory.mkdir()
+            model_path, vectorizer_path = write_artifacts(directory, model, vectorizer)
+            versions[version] = {"model_path": model_path, "vectorizer_path": vectorizer_path}
+        
+        registry_path = tmp_path / "registry.json"
+        registry_path.write_text(json.dumps({"versions": versions, "pins": {"partner-key": "1.0"}}))
+        monkeypatch.setattr(settings, "MODEL_REGISTRY_PATH", str(registry_path))
+        monkeypatch.setattr(model_manager, "_registry", None)
+        monkeypatch.setattr(model_manager, "_versions", {})
+        monkeypatch.setattr(model_manager, "_last_used", {})
+        model_manager.load_models()
+        yield model_manager
+        monkeypatch.setattr(model_manager, "_registry", None)
+    
+    def test_versions_resident_side_by_side(self, registry):
+        """Test that several versions can be loaded at once."""
+        registry.load_models("1.0")
+        registry.load_models("1.1")
+        
+        resident = {entry["version"]: entry for entry in registry.resident_versions()}
+        assert set(resident) == {settings.MODEL_VERSION, "1.0", "1.1"}
+        assert resident[settings.MODEL_VERSION]["is_default"] is True
+        assert all(entry["footprint_bytes"] > 0 for entry in resident.values())
+        assert registry.available_versions()[0] == settings.MODEL_VERSION
+    
+    def test_lru_eviction_over_budget(self, registry, monkeypatch):
+        """Test that the least recently used version is evicted first."""
+        registry.load_models("1.0")
+        footprint = registry.get_bundle("1.0").footprint_bytes
+        default = registry.bundle.footprint_bytes
+        monkeypatch.setattr(settings, "MODEL_MEMORY_BUDGET_MB", (default + footprint * 1.5) / 1024 / 1024)
+        
+        registry.load_models("1.1")
+        
+        versions = {entry["version"] for entry in registry.resident_versions()}
+        assert versions == {settings.MODEL_VERSION, "1.1"}
+    
+    def test_unknown_version(self, registry):
+        """Test that unregistered versions are rejected."""
+        with pytest.raises(ModelLoadError, match="Unknown model version"):
+            registry.load_models("9.9")
+    
+    def test_artifact_entry_without_vectorizer(self, registry, trained_model, tmp_path):
+        """Test that artifact entries need no vectorizer and malformed entries name their version."""
+        from src.models.artifact import export_artifact
+        model, vectorizer, _ = trained_model
+        directory = export_artifact(model, vectorizer, tmp_path / "compact", "2.0")
+        versions = registry._load_registry()["versions"]
+        versions["2.0"] = {"model_path": str(directory)}
+        versions["pickled"] = {"model_path": versions["1.0"]["model_path"]}
+        versions["broken"] = {"vectorizer_path": "vectorizer.pkl"}
+        
+        assert registry.get_bundle("2.0").version == "2.0"
+        with pytest.raises(ModelLoadError, match="pickled needs a vectorizer_path"):
+            registry.load_models("pickled")
+        with pytest.raises(ModelLoadError, match="broken has no model_path"):
+            registry.load_models("broken")
+    
+    def test_api_key_pin(self, registry):
+        """Test that API keys resolve to their pinned version."""
+        assert registry.get_pinned_version("partner-key") == "1.0"
+        assert registry.get_pinned_version("other-key") is None
+
+
+def write_artifacts(directory, model, vectorizer):
+    """Pickle a model/vectorizer pair into ``directory``."""
+    model_path = directory / "model.pkl"
+    vectorizer_path = directory / "vectorizer.pkl"
+    model_path.write_bytes(pickle.dumps(model))
+    vectorizer_path.write_bytes(pickle.dumps(vectorizer))
+    return str(model_path), str(vectorizer_path)
@@ -0,0 +1,138 @@
+"""
+Unit tests for SimHash near-duplicate detection and verdict reuse.
+"""
+
+from api.services.verdict_reuse import VerdictReuse
+from src.preprocessing.text_processor import text_processor
+from src.utils.near_duplicate import NearDuplicateIndex, simhash
+
+
+CAMPAIGN = (
+    "Dear {name}, congratulations! You have been selected to receive a free gift card "
+    "worth 500 dollars. Click the link below to claim your reward before it expires "
+    "tonight. Visit {link} now and enter your details to confirm the delivery address."
+)
+
+
+def _fingerprint(name: str, link: str) -> int:
+    return simhash(text_processor.clean_text(CAMPAIGN.format(name=name, link=link)))
+
+
+class TestSimHash:
+    """Tests for simhash and NearDuplicateIndex."""
+    
+    def test_campaign_variants_are_close(self):
+        """Test that variants of one message land within the default distance."""
+        index = NearDuplicateIndex(max_entries=10)
+        index.add("v1", _fingerprint("John", "http://a.example/x1"), "spam")
+        
+        found = index.find("v1", _fingerprint("Mary", "http://b.example/y2"))
+        
+        assert found is not None
+        assert found[0] == "spam" and found[1] <= index.max_distance
+    
+    def test_unrelated_message_not_found(self):
+        """Test that a different message does not match."""
+        index = NearDuplicateIndex(max_entries=10)
+        index.add("v1", _fingerprint("John", "http://a.example"), "spam")
+        other = simhash(text_processor.clean_text(
+            "Hi team, the quarterly planning meeting moved to Thursday afternoon in room four, "
+            "please bring the updated budget figures and the hiring plan."
+        ))
+        
+        assert index.find("v1", other) is None
+    
+    def test_short_messages_not_fingerprinted(self):
+        """Test that messages below the token minimum give no fingerprint."""
+        assert simhash("see you at lunch") is None
+    
+    def test_scope_and_eviction(self):
+        """Test that scopes are isolated and the oldest entry is evicted."""
+        index = NearDuplicateIndex(max_entries=2, max_distance=3)
+        index.add("v1", 0b1, "a")
+        index.add("v2", 0b1, "b")
+        assert index.find("v1", 0b11)[0] == "a"
+        assert index.find("v2", 0b11)[0] == "b"
+        
+        index.add("v1", 0xFFFF << 48, "c")
+        
+        assert len(index) == 2
+        assert index.find("v1", 0b1) is None
+        assert index.find("v1", 0xFFFF << 48) == ("c", 0)
+
+
+class TestVerdictReuse:
+    """Tests for VerdictReuse."""
+    
+    def _result(self, is_spam=True, confidence=0.99):
+        return {"is_spam": is_spam, "spam_probability": confidence, "confidence": confidence}
+    
+    def test_reuses_confident_verdict(self):
+        """Test that a near-duplicate gets the remembered verdict."""
+        reuse = VerdictReuse(max_entries=10, verify_rate=0.0)
+        first = _fingerprint("John", "http://a.example/1")
+        second = _fingerprint("Mary", "http://b.example/2")
+        
+        reused, ticket = reuse.lookup(first, "v1")
+        assert reused is None
+        reuse.record(ticket, self._result())
+        reused, _ = reuse.lookup(second, "v1")
+        
+        assert reused["is_spam"] is True
+        assert reuse.lookup(second, "v2")[0] is None
+        assert reuse.stats()["hits"] == 1 and reuse.stats()["lookups"] == 3
+    
+    def test_low_confidence_not_reused(self):
+        """Test that uncertain verdicts are not remembered."""
+        reuse = VerdictReuse(max_entries=10, min_confidence=0.95, verify_rate=0.0)
+        fingerprint = _fingerprint("John", "http://a.example")
+        
+        _, ticket = reuse.lookup(fingerprint, "v1")
+        reuse.record(ticket, self._result(confidence=0.6))
+        
+        assert reuse.lookup(fingerprint, "v1")[0] is None
+    
+    def test_sampled_verification_counts_disagreements(self):
+        """Test that verified matches are scored and disagreements counted."""
+        reuse = VerdictReuse(max_entries=10, verify_rate=1.0)
+        fingerprint = _fingerprint("John", "http://a.example")
+        _, ticket = reuse.lookup(fingerprint, "v1")
+        reuse.record(ticket, self._result())
+        
+        reused, ticket = reuse.lookup(fingerprint, "v1")
+        assert reused is None and ticket.neighbour is not None
+        reuse.record(ticket, self._result(is_spam=False))
+        
+        stats = reuse.stats()
+        assert stats["verified"] == 1 and stats["disagreements"] == 1
+        assert stats["disagreement_rate"] == 1.0
+    
+    def test_disabled(self):
+        """Test that a zero-size index hands no reuse to scoring jobs."""
+        assert VerdictReuse(max_entries=0).scoped("v1") is None
+        assert VerdictReuse(max_entries=10).scoped("v1").scope == "v1"
+    
+    def test_predictor_reuses_inside_the_job(self, trained_model):
+        """Test that the predictor looks up, skips scoring for and records near-duplicates."""
+        from src.models.predictor import SpamPredictor
+        
+        model, vectorizer, _ = trained_model
+        predictor = SpamPredictor(model, vectorizer)
+        reuse = VerdictReuse(max_entries=10, min_confidence=0.0, verify_rate=0.0)
+        first = CAMPAIGN.format(name="John", link="http://a.example/1")
+        second = CAMPAIGN.format(name="Mary", link="http://b.example/2")
+        
+        scored = predictor.predict(first, reuse=reuse.scoped("v1"))
+        batches = []
+        score_texts = predictor._score_texts
+        predictor._score_texts = lambda texts, cleaned: batches.append(texts) or score_texts(texts, cleaned)
+        reused, fresh = predictor.predict_batch(
+            [second, "Are we still on for lunch tomorrow at noon with the team?"],
+            fingerprint_spam=True, reuse=reuse.scoped("v1")
+        )
+        
+        assert reused["spam_probability"] == scored["spam_probability"]
+        assert reused["text_stats"] == text_processor.get_text_stats(second)
+        assert batches == [["Are we still on for lunch tomorrow at noon with the team?"]]
+        assert reuse.stats()["hits"] == 1 and len(reuse.index) == 2
+        assert ("simhash" in reused) == reused["is_spam"] and "simhash" not in fresh
@@ -3,11 +3,19 @@ Unit tests for SpamPredictor.
 """
 
 import pytest
+import numpy as np
 from src.models.model_loader import model_manager
 from src.models.predictor import SpamPredictor
 from src.utils.exceptions import ValidationError
 
 
+class StubTransformer:
+    """Transformer service returning fixed [ham, spam] probabilities."""
+    
+    def predict_proba(self, texts):
+        return np.array([[0.1, 0.9] if "prize" in text else [0.8, 0.2] for text in texts])
+
+
 class TestSpamPredictor:
     """Tests for SpamPredictor class."""
     
@@ -17,9 +25,11 @@ class TestSpamPredictor:
         model, vectorizer = model_manager.load_models()
         return SpamPredictor(model, vectorizer)
     
-    def test_predict_spam(self, predictor, sample_spam_email):
+    def test_predict_spam(self, trained_model, sample_spam_email):
         """Test prediction on spam email."""
-        result = predictor.predict(sample_spam_email)
+        # The checked-in model was fitted on ham only
+        model, vectorizer, _ = trained_model
+        result = SpamPredictor(model, vectorizer).predict(sample_spam_email)
         
         assert "is_spam" in result
         assert "confidence" in result
@@ -75,3 +85,94 @@ class TestSpamPredictor:
         
         prob_sum = result["spam_probability"] + result["ham_probability"]
         assert abs(prob_sum - 1.0) < 0.01  # Allow small floating point error
+    
+    def test_sparse_scoring_matches_sklearn(self, trained_model):
+        """Test that sparse NB scoring reproduces sklearn's predict_proba."""
+        model, vectorizer, texts = trained_model
+        predictor = SpamPredictor(model, vectorizer)
+        
+        X = vectorizer.transform(texts[:200])
+        expected = model.predict_proba(X)
+        actual = predictor._predict_proba(X)
+        
+        assert np.allclose(actual, expected, atol=1e-9)
+    
+    def test_predict_batch_matches_predict(self, trained_model):
+        """Test that batch results agree with single predictions."""
+        model, vectorizer, texts = trained_model
+        predictor = SpamPredictor(model, vectorizer)
+        
+        batch = predictor.predict_batch(texts[:50])
+        
+        assert len(batch) == 50
+        for text, result in zip(texts[:50], batch):
+            single = predictor.predict(text)
+            assert result["is_spam"] == single["is_spam"]
+            assert result["spam_probability"] == pytest.approx(single["spam_probability"])
+            assert result["text_stats"] == single["text_stats"]
+    
+    def test_predict_batch_duplicates(self, predictor):
+        """Test that duplicate texts get identical, independent results."""
+        results = predictor.predict_batch(["Free money", "Hello", "Free money"])
+        
+        assert results[0] == results[2]
+        assert results[0] is not results[2]
+    
+    def test_predict_batch_invalid_items(self, predictor):
+        """Test that invalid items are reported without aborting the batch."""
+        results = predictor.predict_batch(["Valid email", "", None, "x" * 20000])
+        
+        assert "is_spam" in results[0]
+        for result in results[1:]:
+            assert result["error_type"] == "ValidationError"
+            assert result["error"]
+    
+    def test_hashing_pipeline_served(self, trained_model):
+        """Test that a vocabulary-free hashing model is served like TF-IDF."""
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from src.preprocessing.featurizer import HashingFeaturizer
+        from src.preprocessing.text_processor import text_processor
+        
+        model, tfidf, texts = trained_model
+        cleaned = text_processor.clean_texts(texts)
+        labels = model.predict(tfidf.transform(cleaned))
+        vectorizer = HashingVectorizer(n_features=2 ** 14, alternate_sign=False)
+        hashed_model = MultinomialNB(alpha=0.01).fit(vectorizer.transform(cleaned), labels)
+        predictor = SpamPredictor(hashed_model, vectorizer)
+        
+        assert isinstance(predictor.featurizer, HashingFeaturizer)
+        results = predictor.predict_batch(texts[:20])
+        np.testing.assert_allclose(
+            [result["spam_probability"] for result in results],
+            hashed_model.predict_proba(vectorizer.transform(cleaned[:20]))[:, 1]
+        )
+    
+    def test_transformer_verdict_ignores_nb_classes(self, monkeypatch):
+        """Test that transformer labels come from its own probabilities, not the NB model's classes."""
+        import src.services.transformer_worker as transformer_worker
+        monkeypatch.setattr(transformer_worker, "create_transformer_service", StubTransformer)
+        # The checked-in NB model only knows class 0
+        model, vectorizer = model_manager.load_models()
+        predictor = SpamPredictor(model, vectorizer, backend="transformer")
+        spam = "Claim your prize now, you have been selected as our lucky winner today"
+        
+        single = predictor.predict(spam)
+        batch = predictor.predict_batch([spam, "Lunch at noon tomorrow?"])
+        
+        assert single["is_spam"] is True and single["spam_probability"] == 0.9
+        assert [result["is_spam"] for result in batch] == [True, False]
+        assert batch[1]["ham_probability"] == 0.8 and batch[1]["confidence"] == 0.8
+    
+    def test_spam_fingerprint_only_on_request(self, trained_model, sample_spam_email, sample_ham_email):
+        """Test that the campaign fingerprint is added to spam verdicts only when asked for."""
+        model, vectorizer, _ = trained_model
+        predictor = SpamPredictor(model, vectorizer)
+        
+        plain = predictor.predict_batch([sample_spam_email, sample_ham_email])
+        spam, ham = predictor.predict_batch([sample_spam_email, sample_ham_email], fingerprint_spam=True)
+        
+        assert all("simhash" not in result for result in plain)
+        assert "simhash" not in predictor.predict(sample_spam_email)
+        assert spam["is_spam"] and "simhash" in spam and "simhash" not in ham
+        assert predictor.predict(sample_spam_email, fingerprint_spam=True)["simhash"] == spam["simhash"]
@@ -0,0 +1,97 @@
+"""
+Unit tests for reduced-precision artifacts and their promotion gate.
+"""
+
+import numpy as np
+import pytest
+
+from src.config.settings import settings
+from src.models.artifact import export_artifact, load_artifact, quantize_int8
+from src.models.model_loader import model_manager
+from src.models.predictor import SpamPredictor
+from src.models.quantization import promote_quantized, validate_quantized
+from src.preprocessing.text_processor import text_processor
+from src.utils.exceptions import ModelLoadError
+
+
+@pytest.fixture(scope="module")
+def holdout(trained_model):
+    """Cleaned emails used to validate quantized artifacts."""
+    _, _, texts = trained_model
+    return text_processor.clean_texts(texts[:1000])
+
+
+class TestQuantization:
+    """Tests for float32/int8 artifacts."""
+    
+    def test_int8_error_bound(self):
+        """Test that dequantized weights are within half a step of the originals."""
+        weights = np.random.default_rng(0).uniform(-12, -3, size=(500, 2))
+        quantized, scale, offset = quantize_int8(weights)
+        
+        assert quantized.dtype == np.int8
+        assert np.abs(quantized * scale + offset - weights).max() <= scale.max() / 2 + 1e-12
+    
+    @pytest.mark.parametrize("precision, tolerance", [("float32", 1e-4), ("int8", 1e-2)])
+    def test_reduced_precision_tracks_reference(self, precision, tolerance, tmp_path, trained_model, holdout):
+        """Test that reduced-precision artifacts stay close to the full model."""
+        model, vectorizer, _ = trained_model
+        compact_model, compact_vectorizer, meta = load_artifact(
+            export_artifact(model, vectorizer, tmp_path / precision, precision=precision)
+        )
+        
+        assert meta["precision"] == precision
+        assert compact_model.precision == precision
+        report = validate_quantized(model, vectorizer, compact_model, compact_vectorizer, holdout)
+        assert report["max_deviation"] < tolerance
+        assert report["label_flip_rate"] <= 0.001
+    
+    def test_predictor_scores_int8_artifact(self, tmp_path, trained_model, holdout):
+        """Test that SpamPredictor serves int8 weights through the model."""
+        model, vectorizer, texts = trained_model
+        compact_model, compact_vectorizer, _ = load_artifact(
+            export_artifact(model, vectorizer, tmp_path / "int8", precision="int8")
+        )
+        predictor = SpamPredictor(compact_model, compact_vectorizer)
+        
+        assert predictor._nb_weights is None
+        results = predictor.predict_batch(texts[:20])
+        expected = model.predict_proba(vectorizer.transform(holdout[:20]))[:, 1]
+        np.testing.assert_allclose([r["spam_probability"] for r in results], expected, atol=1e-2)
+    
+    def test_promotion_records_validation(self, tmp_path, trained_model, holdout):
+        """Test that a passing artifact is published with its report."""
+        model, vectorizer, _ = trained_model
+        report = promote_quantized(model, vectorizer, holdout, tmp_path / "q", "int8")
+        
+        assert report["passed"] and report["promoted"]
+        assert load_artifact(tmp_path / "q")[2]["validation"]["passed"] is True
+        assert [path.name for path in tmp_path.iterdir()] == ["q"]
+    
+    def test_promotion_rejects_over_budget(self, tmp_path, trained_model, holdout):
+        """Test that an artifact outside the budget is not published."""
+        model, vectorizer, _ = trained_model
+        report = promote_quantized(model, vectorizer, holdout, tmp_path / "q", "int8", max_deviation=1e-9)
+        
+        assert not report["passed"] and not report["promoted"]
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_rejection_removes_stale_artifact(self, tmp_path, trained_model, holdout):
+        """Test that a rejected candidate removes the artifact of an earlier model."""
+        model, vectorizer, _ = trained_model
+        promote_quantized(model, vectorizer, holdout, tmp_path / "q", "int8")
+        report = promote_quantized(model, vectorizer, holdout, tmp_path / "q", "int8", max_deviation=1e-9)
+        
+        assert report["removed_stale"] is True
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_manager_refuses_unvalidated_artifact(self, tmp_path, monkeypatch, trained_model):
+        """Test that ModelManager only serves validated reduced-precision artifacts."""
+        model, vectorizer, _ = trained_model
+        directory = export_artifact(model, vectorizer, tmp_path / "int8", precision="int8")
+        monkeypatch.setattr(settings, "MODEL_PATH", str(directory))
+        
+        old_bundle = model_manager.bundle
+        with pytest.raises(ModelLoadError, match="quantization validation"):
+            model_manager.reload_models()
+        assert model_manager.bundle is old_bundle
@@ -0,0 +1,47 @@
+"""
+Unit tests for the bounded result cache.
+"""
+
+from src.utils.result_cache import ResultCache, fingerprint
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+        assert (cache.hits, cache.misses) == (3, 1)
+    
+    def test_ttl_expiry(self, monkeypatch):
+        """Test that entries expire after their TTL."""
+        now = [100.0]
+        monkeypatch.setattr("src.utils.result_cache.time.monotonic", lambda: now[0])
+        cache = ResultCache(max_entries=10, ttl_seconds=5)
+        cache.put("a", 1)
+        
+        now[0] += 4
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_disabled(self):
+        """Test that a zero-size cache stores nothing."""
+        cache = ResultCache(max_entries=0)
+        cache.put("a", 1)
+        
+        assert cache.get("a") is None
+    
+    def test_fingerprint_parts(self):
+        """Test that extra parameters change the fingerprint."""
+        assert fingerprint("free money", 5) != fingerprint("free money", 10)
+        assert fingerprint("free money", 5) == fingerprint("free money", 5)
@@ -0,0 +1,89 @@
+"""
+Unit tests for the CPU thread and affinity governor.
+"""
+
+import os
+
+import pytest
+
+from src.config import runtime
+from src.config.settings import settings
+
+
+@pytest.fixture
+def deployment(monkeypatch):
+    """A 16-core box with 2 uvicorn workers of 4 scoring threads each."""
+    monkeypatch.setattr(settings, "CPU_COUNT", 16)
+    monkeypatch.setattr(settings, "API_WORKERS", 2)
+    monkeypatch.setattr(settings, "INFERENCE_WORKERS", 4)
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "sklearn")
+    monkeypatch.setattr(settings, "CPU_THREADS_PER_WORKER", 0)
+    monkeypatch.setattr(settings, "CPU_AFFINITY", False)
+
+
+@pytest.fixture
+def applied_limits(monkeypatch):
+    """Record threadpoolctl limits instead of clamping the test process, and forget them after."""
+    applied = []
+    monkeypatch.setattr(runtime, "threadpool_limits", lambda limits=None: applied.append(limits))
+    monkeypatch.setattr(runtime, "_applied", {})
+    return applied
+
+
+class TestRuntimeLimits:
+    """Tests for the runtime thread plan."""
+
+    def test_cores_split_between_scoring_workers(self, deployment):
+        """Test that every scoring worker gets an even share of the cores."""
+        assert runtime.scoring_workers() == 8
+        assert runtime.threads_per_worker() == 2
+
+    def test_transformer_workers_are_the_scoring_workers(self, deployment, monkeypatch):
+        """Test that transformer worker processes replace executor threads in the plan."""
+        monkeypatch.setattr(settings, "INFERENCE_BACKEND", "transformer")
+        monkeypatch.setattr(settings, "TRANSFORMER_WORKERS", 1)
+
+        assert runtime.scoring_workers() == 2
+        assert runtime.threads_per_worker() == 8
+
+    def test_explicit_threads_and_oversubscribed_box(self, deployment, monkeypatch):
+        """Test the explicit override and the one-thread floor."""
+        monkeypatch.setattr(settings, "CPU_COUNT", 4)
+        assert runtime.threads_per_worker() == 1
+
+        monkeypatch.setattr(settings, "CPU_THREADS_PER_WORKER", 3)
+        assert runtime.threads_per_worker() == 3
+
+    def test_affinity_slices(self, deployment, monkeypatch):
+        """Test that each uvicorn worker is pinned to its own cores."""
+        assert runtime._affinity_slice(0) is None
+
+        monkeypatch.setattr(settings, "CPU_AFFINITY", True)
+        monkeypatch.setattr(runtime.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+        monkeypatch.setattr(runtime.os, "sched_setaffinity", lambda pid, cores: None, raising=False)
+
+        assert runtime._affinity_slice(0) == [0, 1, 2, 3]
+        assert runtime._affinity_slice(1) == [4, 5, 6, 7]
+
+    def test_apply_keeps_operator_environment(self, deployment, applied_limits, monkeypatch):
+        """Test that thread variables set by the operator win and are reported."""
+        for name in runtime.THREAD_ENV_VARS:
+            monkeypatch.setenv(name, "1")
+
+        info = runtime.apply_runtime_limits()
+
+        assert info["threads_per_worker"] == 1
+        assert os.environ["OPENBLAS_NUM_THREADS"] == "1"
+        assert applied_limits == [1]
+        assert info["cpu_count"] == 16 and info["scoring_workers"] == 8
+
+    @pytest.mark.parametrize("value, expected", [("4,2", 4), (" 3 ", 3), ("auto", 2), ("0", 2)])
+    def test_nested_or_invalid_omp_threads(self, deployment, applied_limits, monkeypatch, value, expected):
+        """Test that a nested OpenMP list uses its outer count and bad values fall back."""
+        for name in runtime.THREAD_ENV_VARS:
+            monkeypatch.setenv(name, "1")
+        monkeypatch.setenv("OMP_NUM_THREADS", value)
+
+        info = runtime.apply_runtime_limits()
+
+        assert info["threads_per_worker"] == expected and applied_limits == [expected]
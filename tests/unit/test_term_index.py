@@ -0,0 +1,54 @@
+"""
+Unit tests for the packed term index.
+"""
+
+import numpy as np
+import pytest
+
+from src.preprocessing.term_index import TermIndex
+
+
+class TestTermIndex:
+    """Tests for TermIndex."""
+    
+    def test_matches_fitted_vocabulary(self, trained_model):
+        """Test that every term maps to the same id as the vectorizer dict."""
+        _, vectorizer, _ = trained_model
+        vocabulary = vectorizer.vocabulary_
+        index = TermIndex.from_vocabulary(vocabulary)
+        terms = list(vocabulary)
+        
+        np.testing.assert_array_equal(index.lookup(terms), [vocabulary[term] for term in terms])
+        assert len(index) == len(vocabulary)
+        assert dict(index.items()) == vocabulary
+    
+    def test_edge_case_terms(self):
+        """Test shared prefixes, non-ASCII, NUL bytes and out-of-vocabulary tokens."""
+        vocabulary = {
+            "congratulations": 0, "congratulation": 1, "congratu": 2, "congrat": 3,
+            "ab": 4, "ab\0": 5, "café": 6, "日本語のテキスト": 7, "x": 8
+        }
+        index = TermIndex.from_vocabulary(vocabulary)
+        tokens = list(vocabulary) + ["congratulationss", "congratux", "a", "ab\0\0", "cafe", "", "日本"]
+        expected = [vocabulary.get(token, -1) for token in tokens]
+        
+        np.testing.assert_array_equal(index.lookup(tokens), expected)
+    
+    def test_mapping_interface(self):
+        """Test dict-style access."""
+        index = TermIndex.from_vocabulary({"free": 1, "win": 0})
+        
+        assert index["win"] == 0
+        assert index.get("lose") is None
+        assert index.get(3, -1) == -1
+        assert "free" in index and "lose" not in index
+        assert list(index) == ["free", "win"]
+        with pytest.raises(KeyError):
+            index["lose"]
+    
+    def test_empty_index(self):
+        """Test that an empty index matches nothing."""
+        index = TermIndex.from_vocabulary({})
+        
+        np.testing.assert_array_equal(index.lookup(["free"]), [-1])
+        assert len(index) == 0
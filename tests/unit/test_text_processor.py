@@ -2,10 +2,28 @@
 Unit tests for TextProcessor.
 """
 
+import re
 import pytest
+from pathlib import Path
 from src.preprocessing.text_processor import TextProcessor, text_processor
 
 
+def legacy_clean_text(text):
+    """Reference three-pass implementation the fused cleaner must reproduce."""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'http[s]?://\S+|www\.\S+', 'URL', text)
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'EMAIL', text)
+    text = re.sub(r'\d{10}|\d{3}[-.\s]?\d{3}[-.\s]?\d{4}', 'PHONE', text)
+    return ' '.join(text.split())
+
+
+def legacy_uppercase_ratio(text):
+    """Reference per-character uppercase ratio."""
+    return sum(1 for c in text if c.isupper()) / len(text) * 100 if text else 0
+
+
 class TestTextProcessor:
     """Tests for TextProcessor class."""
     
@@ -88,3 +106,37 @@ class TestTextProcessor:
         assert stats["word_count"] == 0
         assert stats["char_count"] == 0
         assert stats["avg_word_length"] == 0
+    
+    def test_clean_text_matches_legacy_on_corpus(self):
+        """Test byte-for-byte parity with the three-pass cleaner over spam.csv."""
+        from src.training.train import load_data, prepare_data
+        df = prepare_data(load_data(str(Path(__file__).parents[2] / "spam.csv")))
+        texts = df['text'].astype(str).tolist()
+        
+        assert text_processor.clean_texts(texts) == [legacy_clean_text(t) for t in texts]
+        for text in texts:
+            assert text_processor.get_text_stats(text)["uppercase_ratio"] == legacy_uppercase_ratio(text)
+            assert text_processor.process(text) == (legacy_clean_text(text), text_processor.get_text_stats(text))
+    
+    @pytest.mark.parametrize("text", [
+        "visit www.shop.com or call 5551234567 now",
+        "Mail sales@www.shop.com today",
+        "Call 555 123 4567abc@x.com",
+        "xwww.a@b.com and http://x.y/z@q.com",
+        "5551234567http://spam.example 123.456.7890",
+        "ÉNORME PRIX café 555-123-4567",
+        "  tabs\tand\nnewlines\u00a0here  ",
+    ])
+    def test_clean_text_matches_legacy_edge_cases(self, text):
+        """Test parity where placeholder patterns touch or overlap."""
+        assert text_processor.clean_text(text) == legacy_clean_text(text)
+        assert text_processor.get_text_stats(text)["uppercase_ratio"] == legacy_uppercase_ratio(text)
+        assert text_processor.process(text) == (legacy_clean_text(text), text_processor.get_text_stats(text))
+    
+    def test_process_returns_cleaned_text_and_stats(self):
+        """Test that process combines clean_text and get_text_stats."""
+        text = "WIN a prize at http://spam.example"
+        cleaned, stats = text_processor.process(text)
+        
+        assert cleaned == text_processor.clean_text(text)
+        assert stats == text_processor.get_text_stats(text)
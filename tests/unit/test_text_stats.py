@@ -0,0 +1,46 @@
+"""
+Unit tests for vectorized batch text statistics.
+"""
+
+import pytest
+from pathlib import Path
+
+from src.preprocessing.text_processor import text_processor
+from src.preprocessing.text_stats import batch_text_stats
+
+
+class TestBatchTextStats:
+    """Tests for batch_text_stats."""
+    
+    def test_matches_single_text_stats_on_corpus(self):
+        """Test that batch stats equal get_text_stats for every spam.csv row."""
+        from src.training.train import load_data, prepare_data
+        df = prepare_data(load_data(str(Path(__file__).parents[2] / "spam.csv")))
+        texts = df['text'].astype(str).tolist()
+        
+        assert batch_text_stats(texts) == [text_processor.get_text_stats(t) for t in texts]
+    
+    def test_matches_single_text_stats_edge_cases(self):
+        """Test empty, whitespace-only, Unicode and astral inputs."""
+        texts = [
+            "",
+            "   ",
+            "Hello World Test",
+            "\tLeading and trailing\n ",
+            "",
+            "ÉNORME Ünïcödé ΣΑΣ straße",
+            "𝐁𝐎𝐋𝐃 capitals and emoji 🎉",
+            "no break em　ideographic",
+            "x",
+            "ASCII\x1cfile\x1fseparators\x0bVT\x0cFF",
+        ]
+        assert batch_text_stats(texts) == [text_processor.get_text_stats(t) for t in texts]
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        assert batch_text_stats([]) == []
+    
+    def test_text_processor_entry_point(self):
+        """Test that TextProcessor exposes the batch computation."""
+        texts = ["WIN NOW", "see you soon"]
+        assert text_processor.get_text_stats_batch(texts) == batch_text_stats(texts)
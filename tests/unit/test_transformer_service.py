@@ -0,0 +1,288 @@
+"""
+Unit tests for TransformerService batching and the transformer worker pool.
+
+The service tests need torch and transformers; the model itself is never
+downloaded. The worker pool runs a stub service instead.
+"""
+
+import importlib.util
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.models.model_loader import model_manager
+from src.models.predictor import SpamPredictor
+from src.utils.exceptions import ConfigurationError
+
+
+HAS_TORCH = importlib.util.find_spec("torch") is not None and importlib.util.find_spec("transformers") is not None
+
+
+class StubService:
+    """Worker-side stand-in for TransformerService; module-level so spawned workers can import it."""
+    
+    backend = "stub"
+    batch_size = 8
+    
+    def load_model(self):
+        pass
+    
+    def predict_proba(self, texts):
+        """Rows of [ham, spam, texts in this forward pass]; some texts misbehave."""
+        if "crash" in texts:
+            os._exit(1)
+        if "hang" in texts:
+            time.sleep(60)
+        if "fail" in texts:
+            raise ValueError("bad input")
+        spam = np.array([len(text) / 100 for text in texts])
+        return np.column_stack([1 - spam, spam, np.full(len(texts), len(texts))])
+
+
+@pytest.mark.skipif(not HAS_TORCH, reason="torch and transformers not installed")
+class TestLengthBuckets:
+    """Tests for TransformerService length bucketing."""
+    
+    @pytest.fixture
+    def service(self):
+        from src.services.transformer_service import TransformerService
+        return TransformerService(batch_size=3, max_batch_tokens=100)
+    
+    def test_buckets_cover_every_position_once(self, service):
+        """Test that bucketing is a partition sorted by length."""
+        lengths = [50, 5, 7, 30, 6, 8, 40]
+        buckets = service._length_buckets(lengths)
+        
+        assert sorted(sum(buckets, [])) == list(range(len(lengths)))
+        flat = [lengths[position] for bucket in buckets for position in bucket]
+        assert flat == sorted(lengths)
+        assert buckets[0] == [1, 4, 2]
+    
+    def test_buckets_respect_token_budget(self, service):
+        """Test that no bucket pads past the token budget, except a lone long text."""
+        lengths = [30, 30, 30, 30, 120]
+        buckets = service._length_buckets(lengths)
+        
+        for bucket in buckets:
+            width = max(lengths[position] for position in bucket)
+            assert len(bucket) <= 3
+            assert len(bucket) == 1 or len(bucket) * width <= 100
+        assert buckets[-1] == [4]
+
+
+@pytest.mark.skipif(HAS_TORCH, reason="torch and transformers installed")
+def test_transformer_backend_requires_torch():
+    """Test that selecting the transformer backend without torch is a configuration error."""
+    model, vectorizer = model_manager.load_models()
+    
+    with pytest.raises(ConfigurationError):
+        SpamPredictor(model, vectorizer, backend="transformer")
+
+
+@pytest.mark.skipif(not HAS_TORCH, reason="torch and transformers not installed")
+class TestBackendParity:
+    """Tests for the transformer backend parity gate."""
+    
+    def test_parity_bounds_drift_and_flips(self):
+        """Test that drift within budget passes and a label flip fails."""
+        import numpy as np
+        from src.services.transformer_backends import check_parity
+        
+        def reference(texts):
+            return np.tile([[0.2, 0.8]], (len(texts), 1))
+        
+        close = check_parity(reference, lambda texts: reference(texts) + [[0.01, -0.01]], max_drift=0.02)
+        flipped = check_parity(reference, lambda texts: reference(texts)[:, ::-1], max_drift=1.0)
+        
+        assert close["passed"] and close["max_drift"] == pytest.approx(0.01)
+        assert not flipped["passed"] and flipped["label_flip_rate"] == 1.0
+    
+    def test_unknown_backend_rejected(self):
+        """Test that an unknown backend name is a configuration error."""
+        from src.services.transformer_backends import load_runner
+        
+        with pytest.raises(ConfigurationError):
+            load_runner(None, None, "tensorrt", "/tmp")
+
+    
+    def test_int8_quantizes_without_disk_cache(self, tmp_path):
+        """Test that the int8 backend quantizes the Linear layers and writes nothing."""
+        import torch
+        from types import SimpleNamespace
+        from src.services.transformer_backends import load_runner
+        
+        class TinyClassifier(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.classifier = torch.nn.Linear(4, 2)
+            
+            def forward(self, input_ids):
+                return SimpleNamespace(logits=self.classifier(input_ids.float()))
+        
+        runner = load_runner(TinyClassifier().eval(), None, "int8", tmp_path)
+        logits = runner({"input_ids": torch.ones(3, 4, dtype=torch.long)})
+        
+        assert logits.shape == (3, 2)
+        assert list(tmp_path.iterdir()) == []
+
+    
+    def test_concurrent_exports_use_separate_temporaries(self, tmp_path):
+        """Test that two threads exporting the same file do not share a temporary."""
+        import threading
+        from src.services.transformer_backends import _write_atomic
+        
+        barrier = threading.Barrier(2)
+        temporaries = []
+        
+        def write(target):
+            temporaries.append(target)
+            barrier.wait()
+            with open(target, "w") as f:
+                f.write("export")
+        
+        threads = [threading.Thread(target=_write_atomic, args=(tmp_path / "model.pt", write)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(set(temporaries)) == 2
+        assert [path.name for path in tmp_path.iterdir()] == ["model.pt"]
+    
+    def test_concurrent_load_validates_before_publishing(self, monkeypatch):
+        """Test that concurrent first requests load once and never see a rejected backend."""
+        import threading
+        import numpy as np
+        from src.services import transformer_service
+        
+        loads = []
+        
+        class FakeModel:
+            name_or_path = "fake"
+            
+            def eval(self):
+                return self
+        
+        def load_runner(model, tokenizer, backend, cache_dir):
+            loads.append(backend)
+            return backend
+        
+        monkeypatch.setattr(transformer_service.AutoTokenizer, "from_pretrained", lambda name: object())
+        monkeypatch.setattr(transformer_service.AutoModelForSequenceClassification, "from_pretrained", lambda name: FakeModel())
+        monkeypatch.setattr(transformer_service, "load_runner", load_runner)
+        service = transformer_service.TransformerService(backend="int8")
+        # The int8 candidate drifts far from eager, so parity rejects it
+        monkeypatch.setattr(
+            service, "_predict_proba_with",
+            lambda runner, texts: np.tile([[0.9, 0.1]] if runner == "eager" else [[0.1, 0.9]], (len(texts), 1))
+        )
+        
+        threads = [threading.Thread(target=service.load_model) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert loads == ["eager", "int8"]
+        assert service._runner == "eager" and service.backend == "eager"
+        assert not service.parity["passed"]
+
+class TestTransformerWorkerPool:
+    """Tests for the out-of-process transformer handle (no torch needed)."""
+    
+    def test_factory_shares_one_pool(self, monkeypatch):
+        """Test that TRANSFORMER_WORKERS > 0 selects one shared, lazily started pool."""
+        from src.config.settings import settings
+        from src.services import transformer_worker
+        
+        monkeypatch.setattr(settings, "TRANSFORMER_WORKERS", 2)
+        monkeypatch.setattr(transformer_worker, "_shared_pool", None)
+        pool = transformer_worker.create_transformer_service()
+        
+        assert isinstance(pool, transformer_worker.TransformerWorkerPool)
+        assert transformer_worker.create_transformer_service() is pool
+        assert pool.workers == 2 and pool.stats()["alive"] == 0
+    
+    def test_closed_pool_rejects_requests(self):
+        """Test that a closed pool fails requests instead of blocking."""
+        from src.services.transformer_worker import TransformerWorkerPool
+        from src.utils.exceptions import PredictionError
+        
+        pool = TransformerWorkerPool(workers=1)
+        pool.close()
+        
+        with pytest.raises(PredictionError):
+            pool.predict_proba(["hello"])
+        assert pool.predict_proba([]).shape == (0, 2)
+    
+    def test_process_executor_rejected(self, monkeypatch):
+        """Test that transformer workers cannot be multiplied by executor processes."""
+        from src.config.settings import settings
+        from src.services import transformer_worker
+        
+        monkeypatch.setattr(settings, "TRANSFORMER_WORKERS", 2)
+        monkeypatch.setattr(settings, "INFERENCE_EXECUTOR", "process")
+        
+        with pytest.raises(ConfigurationError):
+            transformer_worker.create_transformer_service()
+
+
+class TestTransformerWorkerLoop:
+    """Tests for the worker processes, serving StubService."""
+    
+    @pytest.fixture
+    def pool(self):
+        from src.services.transformer_worker import TransformerWorkerPool
+        
+        pool = TransformerWorkerPool(
+            workers=1,
+            timeout_seconds=30,
+            health_timeout_seconds=1,
+            batch_wait_ms=200,
+            service_factory=StubService
+        )
+        assert pool.ping(timeout=30)
+        yield pool
+        pool.close()
+    
+    def test_batch_fan_out(self, pool):
+        """Test that queued requests share one forward pass and each gets its own rows."""
+        futures = [pool._submit("predict", texts) for texts in (["a" * 10, "b" * 20], ["c" * 30], ["d" * 40])]
+        rows = [pool._wait(future) for future in futures]
+        
+        np.testing.assert_allclose(np.concatenate(rows)[:, 1], [0.1, 0.2, 0.3, 0.4])
+        assert [len(row) for row in rows] == [2, 1, 1]
+        # All four texts went through one forward pass
+        assert set(np.concatenate(rows)[:, 2]) == {4}
+        assert pool.predict_batch(["e" * 90])[0]["is_spam"] is True
+    
+    def test_request_error_fails_only_its_batch(self, pool):
+        """Test that a scoring error fails the request and the worker keeps serving."""
+        from src.utils.exceptions import PredictionError
+        
+        with pytest.raises(PredictionError, match="bad input"):
+            pool.predict_proba(["fail"])
+        assert pool.predict_proba(["x" * 50])[0, 1] == pytest.approx(0.5)
+        assert pool.stats()["restarts"] == 0
+    
+    def test_crashed_worker_restarted(self, pool):
+        """Test that a worker crash fails its in-flight request and the slot is restarted."""
+        from src.utils.exceptions import PredictionError
+        
+        with pytest.raises(PredictionError, match="exited"):
+            pool.predict_proba(["crash"])
+        
+        assert pool.predict_proba(["x" * 50])[0, 1] == pytest.approx(0.5)
+        assert pool.stats()["restarts"] == 1
+    
+    def test_hung_worker_killed(self, pool):
+        """Test that a worker whose heartbeat stops is killed and its request failed."""
+        from src.utils.exceptions import PredictionError
+        
+        with pytest.raises(PredictionError, match="hung"):
+            pool.predict_proba(["hang"])
+        
+        assert pool.predict_proba(["x" * 50])[0, 1] == pytest.approx(0.5)
+        assert pool.stats()["restarts"] == 1